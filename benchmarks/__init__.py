@@ -0,0 +1 @@
+"""Benchmarks de ponta a ponta contra um Instagram falso local."""
@@ -0,0 +1,132 @@
+"""
+Benchmark de ponta a ponta dos scripts contra o Instagram falso.
+
+Para cada ponto de entrada e cada tamanho de conta, roda um subprocesso
+limpo (``benchmarks.worker``) e mostra tempo real, tempo simulado
+(real + esperas do relógio virtual), ações/hora e pico de memória
+(``tracemalloc``).
+
+Uso::
+
+    python -m benchmarks
+    python -m benchmarks --entries main,pipeline --sizes 1000,10000 --throttle-rate 0.02
+    python -m benchmarks --json bench_results.json
+    python -m benchmarks --entries pipeline --sizes 100000 --profile perfis/
+    python -m benchmarks --entries main --sizes 10000 --throttle-rate 0.02 --record cassetes/
+    python -m benchmarks --replay cassetes/main-10000.jsonl.gz --replay-speed 10
+
+Com ``--record DIR`` cada caso grava as chamadas num cassete
+(``core.cassette``); com ``--replay CASSETE`` todas as entradas recebem
+as mesmas respostas (e limitações) gravadas, para comparar versões pelo
+ritmo e pelas ações/hora sem a sorte do Instagram falso.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.worker import ENTRY_POINTS, REPO_ROOT
+
+DEFAULT_SIZES = "1000,10000,100000,1000000"
+
+
+def run_one(entry, size, args):
+    """Roda um caso num subprocesso e retorna o dict de métricas"""
+    env = dict(os.environ)
+    env.update({
+        "FAKE_IG_FOLLOWING": str(size),
+        "FAKE_IG_FOLLOWERS": str(size),
+        "FAKE_IG_MUTUAL": str(args.mutual),
+        "FAKE_IG_LATENCY_MS": str(args.latency_ms),
+        "FAKE_IG_THROTTLE_RATE": str(args.throttle_rate),
+        "FAKE_IG_THROTTLE_KIND": args.throttle_kind,
+        "BENCH_TRACE_MEMORY": "0" if args.no_memory else "1",
+        "PROFILE": "1" if args.profile else "",
+        "PYTHONPATH": REPO_ROOT + os.pathsep + env.get("PYTHONPATH", ""),
+    })
+    if args.replay:
+        env["BENCH_REPLAY"] = os.path.abspath(args.replay)
+        env["BENCH_REPLAY_SPEED"] = str(args.replay_speed)
+    if args.record:
+        os.makedirs(args.record, exist_ok=True)
+        env["CASSETTE_RECORD"] = os.path.join(os.path.abspath(args.record),
+                                              f"{entry}-{size}.jsonl.gz")
+    if args.profile:
+        env["PROFILE_FILE"] = os.path.join(os.path.abspath(args.profile), f"{entry}-{size}.json")
+    with tempfile.TemporaryDirectory(prefix="bench_") as workdir:
+        output = os.path.join(workdir, "result.json")
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.worker", entry, output],
+            cwd=workdir, env=env, capture_output=True, text=True,
+        )
+        if proc.returncode != 0 or not os.path.exists(output):
+            tail = (proc.stderr or proc.stdout).strip().splitlines()[-1:] or ["sem saída"]
+            return {"entry": entry, "error": tail[0]}
+        with open(output, "r", encoding="utf-8") as f:
+            result = json.load(f)
+    result["size"] = size
+    return result
+
+
+def format_row(result):
+    if result.get("error"):
+        return f"{result['entry']:<15} {result['size']:>9}  ❌ {result['error']}"
+    memory = "-" if result["peak_memory_mb"] is None else f"{result['peak_memory_mb']:.1f}"
+    return (f"{result['entry']:<15} {result['size']:>9} {result['wall_seconds']:>9.2f} "
+            f"{result['simulated_seconds']:>11.0f} {result['actions']:>7} "
+            f"{result['actions_per_hour']:>9.0f} {memory:>9} {result['requests']:>8} "
+            f"{result['throttled']:>6}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dos scripts contra o Instagram falso")
+    parser.add_argument("--entries", default=",".join(ENTRY_POINTS),
+                        help=f"Pontos de entrada ({', '.join(ENTRY_POINTS)})")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Contas seguidas em cada caso")
+    parser.add_argument("--mutual", type=float, default=0.7, help="Fração que segue de volta")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Latência por chamada")
+    parser.add_argument("--throttle-rate", type=float, default=0, help="Chance de limitação por chamada")
+    parser.add_argument("--throttle-kind", default="please_wait",
+                        choices=["please_wait", "client_error", "feedback"])
+    parser.add_argument("--no-memory", action="store_true", help="Sem tracemalloc (mais rápido)")
+    parser.add_argument("--json", help="Grava os resultados neste arquivo")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="Modo --profile dos scripts; um relatório por caso em DIR")
+    parser.add_argument("--record", metavar="DIR",
+                        help="Grava as chamadas de cada caso num cassete em DIR")
+    parser.add_argument("--replay", metavar="CASSETE",
+                        help="Reproduz o cassete em vez do Instagram falso")
+    parser.add_argument("--replay-speed", type=float, default=1.0,
+                        help="Velocidade da reprodução (1 = gravada, 0 = sem espera)")
+    args = parser.parse_args(argv)
+    if args.replay and args.record:
+        parser.error("--record e --replay não podem ser usados juntos")
+
+    entries = [entry.strip() for entry in args.entries.split(",") if entry.strip()]
+    unknown = [entry for entry in entries if entry not in ENTRY_POINTS]
+    if unknown:
+        parser.error(f"Pontos de entrada desconhecidos: {', '.join(unknown)}")
+    # O tamanho da conta vem do cassete
+    sizes = [0] if args.replay else [int(size) for size in args.sizes.split(",")]
+
+    print(f"{'entrada':<15} {'seguindo':>9} {'real (s)':>9} {'simulado (s)':>11} "
+          f"{'ações':>7} {'ações/h':>9} {'pico (MB)':>9} {'requisições':>8} {'limit.':>6}")
+    results = []
+    for entry in entries:
+        for size in sizes:
+            result = run_one(entry, size, args)
+            result["size"] = size
+            results.append(result)
+            print(format_row(result), flush=True)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    return 1 if any(result.get("error") for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,353 @@
+"""
+Substituto local do ``instagrapi.Client`` para benchmarks.
+
+Implementa só a parte da API usada pelos scripts (login e sessão,
+listas de seguidores/seguindo, inclusive por página, perfis
+(``user_info``, ``user_medias``) e ``user_unfollow``) em cima de um
+"servidor" em memória compartilhado por todos os clientes do processo. A conta falsa tem tamanho configurável,
+latência por chamada e limitações injetadas (``PleaseWaitFewMinutes``,
+``ClientError`` ou ``FeedbackRequired``) com uma taxa fixa.
+
+A configuração vem de variáveis de ambiente, para valer também dentro de
+subprocessos e dos processos do orquestrador:
+
+- ``FAKE_IG_FOLLOWING``: contas seguidas (padrão 1000)
+- ``FAKE_IG_FOLLOWERS``: seguidores (padrão = FAKE_IG_FOLLOWING)
+- ``FAKE_IG_MUTUAL``: fração dos seguidos que seguem de volta (padrão 0.7)
+- ``FAKE_IG_LATENCY_MS``: latência real de cada chamada (padrão 0)
+- ``FAKE_IG_THROTTLE_RATE``: probabilidade de limitação por chamada (padrão 0)
+- ``FAKE_IG_THROTTLE_KIND``: ``please_wait``, ``client_error`` ou ``feedback``
+- ``FAKE_IG_SEED``: semente do sorteio das limitações
+
+``install()`` registra este módulo como ``instagrapi`` em ``sys.modules``,
+para rodar os scripts sem alterar nenhum import.
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+import types
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+# Latência simula rede: dorme de verdade mesmo com o relógio virtual ativo
+_real_sleep = time.sleep
+
+FIRST_PK = 10_000_000
+OWNER_PK = 1
+
+
+# =========================
+# ❗ EXCEÇÕES (mesma hierarquia do instagrapi)
+# =========================
+class ClientError(Exception):
+    pass
+
+
+class ClientConnectionError(ClientError):
+    pass
+
+
+class ClientThrottledError(ClientError):
+    pass
+
+
+class PleaseWaitFewMinutes(ClientError):
+    pass
+
+
+class FeedbackRequired(ClientError):
+    pass
+
+
+class PrivateError(ClientError):
+    pass
+
+
+class LoginRequired(PrivateError):
+    pass
+
+
+class ChallengeRequired(PrivateError):
+    EMAIL = "email"
+    SMS = "sms"
+
+
+UserShort = namedtuple("UserShort", "pk username full_name")
+UserInfo = namedtuple("UserInfo", "pk username full_name follower_count following_count "
+                                  "media_count is_private is_verified is_business")
+Media = namedtuple("Media", "pk taken_at")
+
+THROTTLE_KINDS = {
+    "please_wait": lambda: PleaseWaitFewMinutes("Please wait a few minutes before you try again."),
+    "client_error": lambda: ClientError("Please wait a few minutes before you try again."),
+    "feedback": lambda: FeedbackRequired("feedback_required"),
+}
+
+
+# =========================
+# 🗄️ SERVIDOR EM MEMÓRIA
+# =========================
+class FakeBackend:
+    """
+    Conta falsa: seguidos com pk ``FIRST_PK..FIRST_PK+following-1``; os
+    primeiros ``mutual * following`` também são seguidores e o restante
+    dos seguidores são fãs que você não segue.
+    """
+
+    def __init__(self, following=1000, followers=None, mutual=0.7, latency=0.0,
+                 throttle_rate=0.0, throttle_kind="please_wait", seed=0):
+        if throttle_kind not in THROTTLE_KINDS:
+            raise ValueError(f"Tipo de limitação desconhecido: {throttle_kind}")
+        self.following_count = following
+        self.followers_count = following if followers is None else followers
+        self.mutual_count = min(int(following * mutual), self.followers_count)
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.throttle_kind = throttle_kind
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.unfollowed = set()
+        self.calls = {}
+        self.throttled = 0
+
+    @classmethod
+    def from_env(cls, environ=None):
+        environ = os.environ if environ is None else environ
+        following = int(environ.get("FAKE_IG_FOLLOWING", 1000))
+        followers = environ.get("FAKE_IG_FOLLOWERS")
+        return cls(
+            following=following,
+            followers=int(followers) if followers else None,
+            mutual=float(environ.get("FAKE_IG_MUTUAL", 0.7)),
+            latency=float(environ.get("FAKE_IG_LATENCY_MS", 0)) / 1000,
+            throttle_rate=float(environ.get("FAKE_IG_THROTTLE_RATE", 0)),
+            throttle_kind=environ.get("FAKE_IG_THROTTLE_KIND", "please_wait"),
+            seed=int(environ.get("FAKE_IG_SEED", 0)),
+        )
+
+    def call(self, name, can_throttle=True):
+        """Conta a chamada, aplica a latência e sorteia uma limitação"""
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+            throttled = can_throttle and self.throttle_rate > 0 and self._rng.random() < self.throttle_rate
+            if throttled:
+                self.throttled += 1
+        if self.latency > 0:
+            _real_sleep(self.latency)
+        if throttled:
+            raise THROTTLE_KINDS[self.throttle_kind]()
+
+    @property
+    def requests(self):
+        return sum(self.calls.values())
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "calls": dict(self.calls),
+            "throttled": self.throttled,
+            "unfollowed": len(self.unfollowed),
+        }
+
+    # Listas geradas sob demanda, em ordem crescente de pk
+    def _pks(self, kind, start=0):
+        if kind == "following":
+            for pk in range(max(start, FIRST_PK), FIRST_PK + self.following_count):
+                if pk not in self.unfollowed:
+                    yield pk
+        else:
+            yield from range(max(start, FIRST_PK), FIRST_PK + self.mutual_count)
+            fans_start = FIRST_PK + self.following_count
+            fans_end = fans_start + self.followers_count - self.mutual_count
+            yield from range(max(start, fans_start), fans_end)
+
+    def page(self, kind, cursor, amount):
+        """Retorna (usuários a partir do pk `cursor`, próximo cursor ou None)"""
+        users = []
+        for pk in self._pks(kind, cursor):
+            if len(users) >= amount:
+                return users, pk
+            users.append(_user(pk))
+        return users, None
+
+    def all_users(self, kind, amount=0):
+        users = {}
+        for pk in self._pks(kind):
+            users[str(pk)] = _user(pk)
+            if amount and len(users) >= amount:
+                break
+        return users
+
+
+def _user(pk):
+    return UserShort(str(pk), f"user{pk}", "")
+
+
+def _info(pk):
+    # Perfil determinístico a partir do pk
+    return UserInfo(str(pk), f"user{pk}", "", pk % 5000, pk % 700, pk % 40,
+                    pk % 3 == 0, pk % 50 == 0, pk % 7 == 0)
+
+
+_backend = None
+
+
+def get_backend():
+    """Servidor compartilhado do processo (criado a partir do ambiente)"""
+    global _backend
+    if _backend is None:
+        _backend = FakeBackend.from_env()
+    return _backend
+
+
+def configure(**kwargs):
+    """Troca o servidor do processo por um novo com os parâmetros dados"""
+    global _backend
+    _backend = FakeBackend(**kwargs)
+    return _backend
+
+
+# =========================
+# 🤖 CLIENTE
+# =========================
+class Client:
+    """Mesma interface usada pelos scripts do ``instagrapi.Client``"""
+
+    def __init__(self, settings=None, proxy=None, delay_range=None, **kwargs):
+        self.backend = get_backend()
+        self.delay_range = delay_range
+        self.challenge_code_handler = None
+        self.settings = {}
+        self.logged_in = False
+        if settings:
+            self.set_settings(settings)
+
+    @property
+    def user_id(self):
+        return str(OWNER_PK) if self.logged_in else None
+
+    def _request(self, name, can_throttle=True):
+        if self.delay_range:
+            time.sleep(random.uniform(*self.delay_range))
+        self.backend.call(name, can_throttle)
+
+    # 🔐 Sessão
+    def login(self, username, password, relogin=False, verification_code=""):
+        self._request("login", can_throttle=False)
+        self.settings.setdefault("uuids", {"uuid": f"fake-{username}"})
+        self.settings["authorization_data"] = {"ds_user_id": str(OWNER_PK), "sessionid": "fake"}
+        self.settings["username"] = username
+        self.logged_in = True
+        return True
+
+    def get_settings(self):
+        return json.loads(json.dumps(self.settings))
+
+    def set_settings(self, settings):
+        self.settings = json.loads(json.dumps(settings))
+        self.logged_in = "authorization_data" in self.settings
+        return True
+
+    def load_settings(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            self.set_settings(json.load(f))
+        return self.settings
+
+    def dump_settings(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.settings, f, indent=4)
+        return True
+
+    def set_uuids(self, uuids):
+        self.settings["uuids"] = dict(uuids)
+        return True
+
+    def set_user_agent(self, user_agent=""):
+        self.settings["user_agent"] = user_agent
+        return True
+
+    def set_proxy(self, dsn):
+        return True
+
+    def _require_login(self):
+        if not self.logged_in:
+            raise LoginRequired("login_required")
+
+    def account_info(self):
+        self._request("account_info", can_throttle=False)
+        self._require_login()
+        return {"pk": str(OWNER_PK), "username": self.settings.get("username")}
+
+    def get_timeline_feed(self):
+        self._request("get_timeline_feed", can_throttle=False)
+        self._require_login()
+        return {"feed_items": [], "num_results": 0}
+
+    # 👥 Listas
+    def user_followers(self, user_id, use_cache=True, amount=0):
+        self._require_login()
+        self._request("user_followers")
+        return self.backend.all_users("followers", amount)
+
+    def user_following(self, user_id, use_cache=True, amount=0):
+        self._require_login()
+        self._request("user_following")
+        return self.backend.all_users("following", amount)
+
+    def _chunk(self, kind, max_amount, max_id):
+        self._require_login()
+        self._request(f"user_{kind}_v1_chunk")
+        cursor = int(max_id) if max_id else 0
+        users, next_cursor = self.backend.page(kind, cursor, max_amount or 200)
+        return users, "" if next_cursor is None else str(next_cursor)
+
+    def user_followers_v1_chunk(self, user_id, max_amount=0, max_id=""):
+        return self._chunk("followers", max_amount, max_id)
+
+    def user_following_v1_chunk(self, user_id, max_amount=0, max_id=""):
+        return self._chunk("following", max_amount, max_id)
+
+    def user_info(self, user_id):
+        self._require_login()
+        self._request("user_info")
+        return _info(int(user_id))
+
+    def user_medias(self, user_id, amount=0):
+        self._require_login()
+        self._request("user_medias")
+        pk = int(user_id)
+        if not pk % 40:
+            return []
+        taken_at = datetime.now() - timedelta(days=pk % 400)
+        return [Media(f"{pk}_1", taken_at)][:amount or None]
+
+    # 🚫 Ações
+    def user_unfollow(self, user_id):
+        self._require_login()
+        self._request("user_unfollow")
+        with self.backend._lock:
+            self.backend.unfollowed.add(int(user_id))
+        return True
+
+
+# =========================
+# 🔌 INSTALAÇÃO
+# =========================
+def install():
+    """Registra o cliente falso como ``instagrapi``/``instagrapi.exceptions``"""
+    package = types.ModuleType("instagrapi")
+    package.Client = Client
+    package.__path__ = []
+
+    exceptions = types.ModuleType("instagrapi.exceptions")
+    for cls in (ClientError, ClientConnectionError, ClientThrottledError, PleaseWaitFewMinutes,
+                FeedbackRequired, PrivateError, LoginRequired, ChallengeRequired):
+        setattr(exceptions, cls.__name__, cls)
+    package.exceptions = exceptions
+
+    sys.modules["instagrapi"] = package
+    sys.modules["instagrapi.exceptions"] = exceptions
+    return package
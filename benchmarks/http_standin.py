@@ -0,0 +1,158 @@
+"""
+Servidor HTTP local para exercitar ``core.transport`` sem o Instagram.
+
+Responde JSON a qualquer caminho, com keep-alive (HTTP/1.1), e simula
+as falhas que interessam ao transporte:
+
+- ``/slow?delay=SEGUNDOS``: demora para responder (tempo limite de leitura);
+- ``/flaky/<chave>``: a primeira requisição de cada chave derruba a
+  conexão com um RST sem responder; as seguintes respondem normalmente;
+- ``/status/<código>``: responde com o código pedido.
+
+``python -m benchmarks.http_standin`` roda uma verificação completa:
+reuso de conexões, nova tentativa após reset, nenhuma nova tentativa após
+tempo limite de leitura ou erro HTTP, e os tempos medidos por requisição.
+"""
+import json
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status=200, data=None):
+        body = json.dumps(data or {"status": "ok"}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _reset(self):
+        # SO_LINGER 0: o close manda RST em vez de FIN
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        self.connection.close()
+        self.close_connection = True
+
+    def _handle(self):
+        server = self.server
+        url = urlsplit(self.path)
+        with server.lock:
+            server.hits[url.path] += 1
+            hits = server.hits[url.path]
+            server.connections.add(self.client_address)
+        if self.headers.get("Content-Length"):
+            self.rfile.read(int(self.headers["Content-Length"]))
+
+        if url.path.startswith("/flaky/") and hits == 1:
+            return self._reset()
+        if url.path == "/slow":
+            time.sleep(float(parse_qs(url.query).get("delay", ["1"])[0]))
+        if url.path.startswith("/status/"):
+            return self._reply(int(url.path.rsplit("/", 1)[1]), {"status": "fail"})
+        self._reply()
+
+    do_GET = _handle
+    do_POST = _handle
+
+
+class HttpStandIn:
+    """Servidor em 127.0.0.1 numa porta livre, rodando numa thread"""
+
+    def __init__(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.daemon_threads = True
+        # Conexões derrubadas de propósito (ou pelo cliente, no tempo limite) não são erro
+        self.server.handle_error = lambda request, client_address: None
+        self.server.lock = threading.Lock()
+        self.server.hits = Counter()
+        self.server.connections = set()
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    @property
+    def hits(self):
+        return self.server.hits
+
+    @property
+    def connections(self):
+        """Conexões TCP distintas recebidas (porta de origem do cliente)"""
+        return len(self.server.connections)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# =========================
+# ✅ VERIFICAÇÃO
+# =========================
+def main():
+    from core.transport import Transport
+
+    timings = []
+    failures = []
+
+    def check(condition, message):
+        print(f"{'✅' if condition else '❌'} {message}")
+        if not condition:
+            failures.append(message)
+
+    with HttpStandIn() as standin:
+        transport = Transport(pool_size=4, connect_timeout=1, read_timeout=0.5, retries=2)
+        transport.observers.append(timings.append)
+        session = transport.session()
+
+        for _ in range(20):
+            session.get(f"{standin.url}/api/v1/feed").raise_for_status()
+        session.post(f"{standin.url}/api/v1/friendships/destroy/1/", data={"a": "b"})
+        check(standin.connections == 1,
+              f"21 requisições em {standin.connections} conexão(ões) (keep-alive)")
+        reused = sum(1 for timing in timings if timing.reused)
+        check(reused == 20, f"{reused}/21 requisições reaproveitaram a conexão")
+
+        response = session.post(f"{standin.url}/flaky/unfollow")
+        check(response.ok and standin.hits["/flaky/unfollow"] == 2 and timings[-1].retries == 1,
+              f"Reset de conexão: {standin.hits['/flaky/unfollow']} tentativas, status {response.status_code}")
+
+        try:
+            session.get(f"{standin.url}/slow?delay=1")
+            timed_out = False
+        except Exception as e:  # requests.exceptions.ReadTimeout / ConnectionError
+            timed_out = "Timeout" in type(e).__name__ or "timed out" in str(e)
+        check(timed_out and standin.hits["/slow"] == 1,
+              f"Tempo limite de leitura sem nova tentativa ({standin.hits['/slow']} chamada)")
+
+        response = session.get(f"{standin.url}/status/503")
+        check(response.status_code == 503 and standin.hits["/status/503"] == 1,
+              "Erro HTTP devolvido sem nova tentativa")
+
+        first = timings[0]
+        check(first.dns is not None and first.connect is not None and first.ttfb > 0,
+              f"Primeira requisição: DNS {first.dns * 1000:.2f} ms, conexão "
+              f"{first.connect * 1000:.2f} ms, primeiro byte {first.ttfb * 1000:.2f} ms")
+        transport.close()
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
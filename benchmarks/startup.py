@@ -0,0 +1,89 @@
+"""
+Tempo de partida dos comandos e imports que não deveriam tocar no Instagram.
+
+Cada comando roda em um subprocesso limpo várias vezes e a mediana, do
+começo ao fim (interpretador incluído), é comparada com o orçamento
+(``--budget-ms``). A de ``python -c pass`` aparece ao lado, para separar
+o custo dos nossos imports. Antes de medir, o bytecode do repositório é
+compilado (como numa instalação), senão cada execução recompilaria os
+módulos editados. Também confere que o ``instagrapi`` não foi importado.
+
+Uso::
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 10 --budget-ms 150
+"""
+import argparse
+import compileall
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.worker import REPO_ROOT
+
+# Ao final de cada comando, confirma que o instagrapi ficou de fora
+_GUARD = "import sys; assert 'instagrapi' not in sys.modules, 'instagrapi importado'"
+
+COMMANDS = {
+    "Insta.py stats": "import runpy, sys; sys.argv = ['Insta.py', 'stats']; "
+                      f"runpy.run_path({os.path.join(REPO_ROOT, 'Insta.py')!r}, run_name='__main__')",
+    "Insta.py plan": "import runpy, sys; sys.argv = ['Insta.py', 'plan']; "
+                     f"runpy.run_path({os.path.join(REPO_ROOT, 'Insta.py')!r}, run_name='__main__')",
+    "import src.unfollower": "import src.unfollower",
+    "import core.pipeline": "import core.pipeline",
+    "import main": "import main",
+}
+
+
+def time_command(code, runs, workdir):
+    """Mediana (ms) de `runs` execuções; levanta RuntimeError se o comando falhar"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = REPO_ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-c", f"{code}\n{_GUARD}"],
+            cwd=workdir, env=env, capture_output=True, text=True,
+        )
+        timings.append((time.perf_counter() - started) * 1000)
+        if proc.returncode != 0:
+            tail = proc.stderr.strip().splitlines()[-1:] or ["sem saída"]
+            raise RuntimeError(tail[0])
+    return statistics.median(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tempo de partida dos comandos offline")
+    parser.add_argument("--runs", type=int, default=5, help="execuções por comando")
+    parser.add_argument("--budget-ms", type=float, default=100,
+                        help="orçamento da mediana por comando")
+    args = parser.parse_args(argv)
+
+    compileall.compile_dir(REPO_ROOT, quiet=1)
+
+    # Tempo do interpretador sozinho, para separar o custo dos nossos imports
+    with tempfile.TemporaryDirectory(prefix="startup_") as workdir:
+        baseline = time_command("pass", args.runs, workdir)
+        print(f"{'python (vazio)':<24} {baseline:>8.1f} ms")
+
+        failed = False
+        for name, code in COMMANDS.items():
+            try:
+                elapsed = time_command(code, args.runs, workdir)
+            except RuntimeError as e:
+                print(f"{name:<24} ❌ {e}")
+                failed = True
+                continue
+            status = "✅" if elapsed <= args.budget_ms else "❌"
+            failed = failed or elapsed > args.budget_ms
+            print(f"{name:<24} {elapsed:>8.1f} ms (+{elapsed - baseline:.1f} ms) {status}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+Executa um único caso de benchmark no processo atual.
+
+Chamado pelo ``python -m benchmarks`` em um subprocesso por caso (memória
+e módulos limpos), dentro de um diretório temporário. Antes de importar
+qualquer script, instala o cliente falso como ``instagrapi`` e um relógio
+virtual: ``time.sleep`` só avança o tempo, então os intervalos entre
+ações e as pausas por limitação entram no cálculo de ações/hora sem
+esperar de verdade.
+
+Com ``BENCH_REPLAY=<cassete>`` o ``instagrapi`` é o cassete gravado
+(``core.cassette``) em vez do Instagram falso, reproduzido a
+``BENCH_REPLAY_SPEED``; com ``CASSETTE_RECORD=<arquivo>`` as chamadas da
+execução são gravadas.
+
+Uso interno::
+
+    python -m benchmarks.worker <entrada> <resultado.json>
+"""
+import importlib.util
+import json
+import os
+import runpy
+import sys
+import threading
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class VirtualTime:
+    """Substitui ``time.sleep``/``time.monotonic``/``time.time`` por um relógio virtual"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.slept = 0.0
+        self._originals = None
+
+    def install(self):
+        self._originals = (time.sleep, time.monotonic, time.time)
+        real_monotonic = time.monotonic
+        real_time = time.time
+
+        def sleep(seconds):
+            if seconds > 0:
+                with self._lock:
+                    self.slept += seconds
+
+        time.sleep = sleep
+        time.monotonic = lambda: real_monotonic() + self.slept
+        time.time = lambda: real_time() + self.slept
+
+    def uninstall(self):
+        if self._originals:
+            time.sleep, time.monotonic, time.time = self._originals
+            self._originals = None
+
+
+# =========================
+# 🚪 PONTOS DE ENTRADA
+# =========================
+def _run_script(relative_path):
+    try:
+        runpy.run_path(os.path.join(REPO_ROOT, relative_path), run_name="__main__")
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            raise RuntimeError(f"{relative_path} saiu com código {e.code}")
+
+
+def run_main():
+    os.environ.update({"IG_USERNAME": "bench", "IG_PASSWORD": "bench", "IG_SESSION": "{}"})
+    _run_script("main.py")
+
+
+def run_insta_unfollow():
+    os.environ.update({"INSTA_USERNAME": "bench", "INSTA_PASSWORD": "bench"})
+    _run_script("insta-unfollow.py")
+
+
+def run_src_unfollower():
+    os.environ.update({"INSTAGRAM_USERNAME": "bench", "INSTAGRAM_PASSWORD": "bench"})
+    _run_script(os.path.join("src", "unfollower.py"))
+
+
+def _start_profiler(default_path):
+    # Os scripts leem PROFILE=1 sozinhos; aqui é para as entradas chamadas como função
+    from core.profiling import start_profiler
+    return start_profiler(default_path, argv=[])
+
+
+def run_insta():
+    # Insta.py tem as credenciais no próprio arquivo: roda só o job automático
+    spec = importlib.util.spec_from_file_location("Insta", os.path.join(REPO_ROOT, "Insta.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.USERNAME = module.PASSWORD = "bench"
+    module.CASSETTE_RECORD = os.getenv("CASSETTE_RECORD", "")
+    module._profiler = _start_profiler(module.PROFILE_FILE)
+    module.auto_unfollow_job()
+    if module._profiler is not None:
+        module._profiler.finish()
+
+
+def run_pipeline():
+    from core.pipeline import account_settings, load_factory, run_account
+
+    profiler = _start_profiler("profile_report.json")
+    account = account_settings({"username": "bench", "password": "bench",
+                                "record_file": os.getenv("CASSETTE_RECORD") or None})
+    try:
+        report = run_account(account, load_factory("instagrapi:Client"), profiler=profiler)
+    finally:
+        if profiler is not None:
+            profiler.finish()
+    if report["status"] != "ok":
+        raise RuntimeError(report["error"])
+
+
+ENTRY_POINTS = {
+    "main": run_main,
+    "insta-unfollow": run_insta_unfollow,
+    "src": run_src_unfollower,
+    "insta": run_insta,
+    "pipeline": run_pipeline,
+}
+
+
+def run_case(entry, trace_memory=True):
+    """Roda `entry` e retorna as métricas em dict"""
+    from benchmarks import fake_instagram
+
+    replay = os.getenv("BENCH_REPLAY")
+    if replay:
+        from core import cassette
+        player = cassette.install(replay, float(os.getenv("BENCH_REPLAY_SPEED", "1")))
+    else:
+        fake_instagram.install()
+    clock = VirtualTime()
+    clock.install()
+
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    error = None
+    try:
+        ENTRY_POINTS[entry]()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    wall = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+    peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    if trace_memory:
+        tracemalloc.stop()
+    clock.uninstall()
+
+    if replay:
+        stats = {"unfollowed": player.stats["user_unfollow"], "requests": player.stats["replayed"],
+                 "throttled": player.stats["throttled"]}
+    else:
+        stats = fake_instagram.get_backend().stats()
+    simulated = wall + clock.slept
+    actions = stats["unfollowed"]
+    return {
+        "entry": entry,
+        "error": error,
+        "wall_seconds": round(wall, 4),
+        "cpu_seconds": round(cpu, 4),
+        "simulated_seconds": round(simulated, 2),
+        "actions": actions,
+        "actions_per_hour": round(actions / simulated * 3600, 1) if simulated > 0 else 0.0,
+        "peak_memory_mb": round(peak / 1024 / 1024, 2) if peak is not None else None,
+        "requests": stats["requests"],
+        "throttled": stats["throttled"],
+    }
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    entry, output = argv[0], argv[1]
+    trace_memory = os.getenv("BENCH_TRACE_MEMORY", "1") == "1"
+
+    sys.path.insert(0, REPO_ROOT)
+    result = run_case(entry, trace_memory)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+Arquivo diário de seguidores/seguindo para análise de churn.
+
+Cada execução grava os IDs das duas listas numa partição do dia
+(``snapshots/2026-10-18.ids``; a última execução do dia prevalece). Cada
+lista é uma coluna de int64 ordenados, gravada como diferenças entre IDs
+vizinhos (ver ``core.idset.to_deltas``) e comprimida com zlib. Um
+cabeçalho JSON guarda o tamanho de cada coluna, então uma consulta que
+só precisa dos seguidores não descomprime a coluna "seguindo".
+
+As consultas (``churn``, ``changes``, ``retention``, ``followed_back``)
+percorrem as partições em ordem, uma por vez, e fazem as diferenças
+com as operações vetorizadas de ``core.idset``: um ano de partições
+diárias é uma passada linear, sem montar objetos de usuário.
+
+No modo incremental as remoções só aparecem nas resincronizações
+completas (ver ``core.snapshot``), então os "perdidos" se concentram
+nesses dias.
+"""
+import json
+import os
+import zlib
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+from core.idset import to_id_array, to_deltas, iter_deltas, from_deltas, subtract, intersect
+
+ARCHIVE_DIR = "snapshots"
+COLUMNS = ("followers", "following")
+
+_MAGIC = b"IGIDS1\n"
+_SUFFIX = ".ids"
+
+DaySnapshot = namedtuple("DaySnapshot", ["day", "followers", "following"])
+ChurnRow = namedtuple("ChurnRow", ["day", "followers", "gained", "lost", "churn_rate"])
+RetentionPoint = namedtuple("RetentionPoint", ["day", "retained", "rate"])
+
+
+def _day(value):
+    """'AAAA-MM-DD' a partir de str, date ou datetime (None continua None)"""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.isoformat()
+
+
+def days_ago(days):
+    """Data de `days` dias atrás, no formato das partições"""
+    return (date.today() - timedelta(days=days)).isoformat()
+
+
+def _encode_column(ids, presorted=False):
+    """(quantidade de IDs, diferenças comprimidas) de uma coluna"""
+    if not presorted:
+        ids = to_id_array(ids)
+        return len(ids), zlib.compress(to_deltas(ids))
+    compressor = zlib.compressobj()
+    count = 0
+    parts = []
+    for chunk in iter_deltas(ids):
+        count += len(chunk) // 8
+        parts.append(compressor.compress(chunk))
+    parts.append(compressor.flush())
+    return count, b"".join(parts)
+
+
+# =========================
+# 📁 PARTIÇÕES EM DISCO
+# =========================
+class SnapshotArchive:
+    """Partições diárias com as colunas de IDs de seguidores e seguindo"""
+
+    def __init__(self, directory=ARCHIVE_DIR):
+        self.directory = directory
+
+    def _path(self, day):
+        return os.path.join(self.directory, f"{day}{_SUFFIX}")
+
+    def save(self, followers, following, day=None, presorted=False):
+        """
+        Grava (ou substitui) a partição do dia de forma atômica.
+        Com ``presorted=True`` as listas já vêm em ordem crescente e sem
+        repetição (ex.: os spools do modo streaming) e são codificadas em
+        blocos, sem montar a coluna inteira na memória.
+        """
+        day = _day(day) or date.today().isoformat()
+        encoded = [_encode_column(ids, presorted) for ids in (followers, following)]
+        header = {
+            "day": day,
+            "saved_at": datetime.now().isoformat(),
+            "columns": [[name, count, len(blob)]
+                        for name, (count, blob) in zip(COLUMNS, encoded)],
+        }
+        blobs = [blob for _, blob in encoded]
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(day)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_MAGIC)
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            for blob in blobs:
+                f.write(blob)
+        os.replace(tmp_path, path)
+        return path
+
+    def days(self, start=None, end=None):
+        """Dias com partição no intervalo [start, end], em ordem"""
+        start, end = _day(start), _day(end)
+        if not os.path.isdir(self.directory):
+            return []
+        found = sorted(name[:-len(_SUFFIX)] for name in os.listdir(self.directory)
+                       if name.endswith(_SUFFIX))
+        return [day for day in found
+                if (start is None or day >= start) and (end is None or day <= end)]
+
+    def load(self, day, columns=COLUMNS):
+        """``DaySnapshot`` do dia; colunas não pedidas ficam None"""
+        day = _day(day)
+        values = {}
+        with open(self._path(day), "rb") as f:
+            if f.readline() != _MAGIC:
+                raise ValueError(f"Partição inválida: {self._path(day)}")
+            header = json.loads(f.readline())
+            for name, _, size in header["columns"]:
+                if name in columns:
+                    values[name] = from_deltas(zlib.decompress(f.read(size)))
+                else:
+                    f.seek(size, os.SEEK_CUR)
+        return DaySnapshot(day, values.get("followers"), values.get("following"))
+
+    def iter_days(self, start=None, end=None, columns=COLUMNS):
+        """Carrega as partições do intervalo uma a uma"""
+        for day in self.days(start, end):
+            yield self.load(day, columns)
+
+    # =========================
+    # 📊 CONSULTAS
+    # =========================
+    def churn(self, start=None, end=None):
+        """
+        Um ``ChurnRow`` por partição do intervalo (a primeira é a base):
+        seguidores ganhos e perdidos desde a partição anterior e a taxa
+        de churn (perdidos / seguidores da anterior).
+        """
+        rows = []
+        previous = None
+        for snapshot in self.iter_days(start, end, ("followers",)):
+            current = snapshot.followers
+            if previous is not None:
+                lost = len(subtract(previous, current))
+                rows.append(ChurnRow(
+                    snapshot.day,
+                    len(current),
+                    len(subtract(current, previous)),
+                    lost,
+                    lost / len(previous) if len(previous) else 0.0,
+                ))
+            previous = current
+        return rows
+
+    def changes(self, start=None, end=None, column="followers"):
+        """(ganhos, perdidos) entre a primeira e a última partição do intervalo"""
+        days = self.days(start, end)
+        if len(days) < 2:
+            empty = to_id_array(())
+            return empty, empty
+        first = getattr(self.load(days[0], (column,)), column)
+        last = getattr(self.load(days[-1], (column,)), column)
+        return subtract(last, first), subtract(first, last)
+
+    def retention(self, cohort_day=None, end=None, kind="mutuals"):
+        """
+        Curva de retenção de uma coorte: os mútuos (ou seguidores, com
+        ``kind="followers"``) de `cohort_day` (a primeira partição por
+        padrão) e quantos continuam assim em cada partição seguinte.
+        """
+        if kind not in ("mutuals", "followers"):
+            raise ValueError(f"Tipo de retenção desconhecido: {kind}")
+        days = self.days(cohort_day, end)
+        if not days:
+            return []
+
+        columns = COLUMNS if kind == "mutuals" else ("followers",)
+        cohort = None
+        points = []
+        for snapshot in self.iter_days(days[0], days[-1], columns):
+            current = snapshot.followers
+            if kind == "mutuals":
+                current = intersect(current, snapshot.following)
+            retained = current if cohort is None else intersect(cohort, current)
+            if cohort is None:
+                cohort = current
+            points.append(RetentionPoint(snapshot.day, len(retained),
+                                         len(retained) / len(cohort) if len(cohort) else 0.0))
+        return points
+
+    def followed_back(self, user_ids, day=None):
+        """
+        Quais de `user_ids` (ex.: contas deixadas de seguir, ver
+        ``HistoryStore.unfollowed_ids``) aparecem entre os seguidores da
+        partição de `day` (a mais recente por padrão).
+        """
+        days = self.days(end=day)
+        if not days:
+            return to_id_array(())
+        return intersect(to_id_array(user_ids), self.load(days[-1], ("followers",)).followers)
+
+
+def archive_lists(directory, followers, following, day=None, presorted=False):
+    """Grava as listas da execução (IDs, str ou int) na partição do dia"""
+    return SnapshotArchive(directory).save(followers, following, day, presorted)
+
+
+# =========================
+# 🖨️ RESUMO
+# =========================
+def print_summary(archive, start=None, end=None, unfollowed_ids=None):
+    """Churn, ganhos/perdidos e retenção dos mútuos no intervalo"""
+    days = archive.days(start, end)
+    if len(days) < 2:
+        print(f"📦 {len(days)} partição(ões) em {archive.directory}: "
+              "são necessárias pelo menos duas para comparar.")
+        return
+
+    print(f"📦 {len(days)} partições de {days[0]} a {days[-1]}")
+    rows = archive.churn(days[0], days[-1])
+    for row in rows[-14:]:
+        print(f"  {row.day}: {row.followers} seguidores, +{row.gained} / -{row.lost} "
+              f"(churn {row.churn_rate:.2%})")
+
+    gained, lost = archive.changes(days[0], days[-1])
+    print(f"📈 No período: +{len(gained)} seguidores ganhos, -{len(lost)} perdidos")
+
+    curve = archive.retention(days[0], days[-1])
+    if curve:
+        print(f"🤝 Mútuos de {curve[0].day}: {curve[-1].retained}/{curve[0].retained} "
+              f"ainda mútuos em {curve[-1].day} ({curve[-1].rate:.1%})")
+
+    if unfollowed_ids is not None:
+        unfollowed = to_id_array(unfollowed_ids)
+        back = archive.followed_back(unfollowed, days[-1])
+        print(f"🔁 Deixados de seguir que te seguem agora: {len(back)}/{len(unfollowed)}")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Churn de seguidores a partir do arquivo diário")
+    parser.add_argument("directory", nargs="?", default=ARCHIVE_DIR,
+                        help="Diretório das partições (padrão: snapshots)")
+    parser.add_argument("--from", dest="start", help="Primeiro dia (AAAA-MM-DD)")
+    parser.add_argument("--to", dest="end", help="Último dia (AAAA-MM-DD)")
+    parser.add_argument("--days", type=int, help="Só os últimos N dias")
+    parser.add_argument("--history", help="Histórico SQLite para contar quem voltou a seguir")
+    args = parser.parse_args(argv)
+
+    start = days_ago(args.days) if args.days else args.start
+    unfollowed = None
+    if args.history:
+        from core.history_store import HistoryStore
+
+        history = HistoryStore(args.history)
+        try:
+            unfollowed = list(history.unfollowed_ids(start, args.end))
+        finally:
+            history.close()
+    print_summary(SnapshotArchive(args.directory), start, args.end, unfollowed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Filtro de Bloom persistido em disco e carregado via mmap.
+
+Serve para responder "esta conta já foi deixada de seguir?" sem carregar
+o histórico inteiro num set. Um resultado negativo é definitivo; um
+positivo pode ser falso e deve ser confirmado na fonte exata (o SQLite
+do histórico). Com a taxa de erro padrão (0,1%) cada ID ocupa ~1,8 byte.
+
+O cabeçalho guarda também até qual linha da fonte o filtro está em dia
+(``synced``): quem escreve na fonte sem o filtro aberto deixa a marca
+para trás, e quem abre o filtro depois completa o que falta (ver
+``core.history_store``).
+"""
+import hashlib
+import math
+import mmap
+import os
+import struct
+
+MAGIC = b"UFBLOOM2"
+# magic, capacidade, número de bits, número de hashes, itens adicionados, linha sincronizada
+_HEADER = struct.Struct("<8sQQIQQ")
+
+DEFAULT_CAPACITY = 1_000_000
+DEFAULT_ERROR_RATE = 0.001
+
+
+def _optimal_params(capacity, error_rate):
+    num_bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+    num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+    return num_bits, num_hashes
+
+
+class BloomFilter:
+    """Filtro de Bloom com o array de bits mapeado do arquivo"""
+
+    def __init__(self, path, fileobj, mm, capacity, num_bits, num_hashes, count):
+        self.path = path
+        self.capacity = capacity
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.count = count
+        self._added = 0  # adicionados desde o último flush
+        self._file = fileobj
+        self._mm = mm
+
+    # =========================
+    # 📁 ARQUIVO
+    # =========================
+    @classmethod
+    def create(cls, path, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+        """Cria um filtro vazio no disco (sobrescreve o existente)"""
+        num_bits, num_hashes = _optimal_params(capacity, error_rate)
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, capacity, num_bits, num_hashes, 0, 0))
+            f.truncate(_HEADER.size + (num_bits + 7) // 8)
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path):
+        """Abre um filtro existente sem ler os bits para a memória"""
+        f = open(path, "r+b")
+        try:
+            mm = mmap.mmap(f.fileno(), 0)
+            magic, capacity, num_bits, num_hashes, count, _ = _HEADER.unpack_from(mm, 0)
+            if magic != MAGIC:
+                raise ValueError(f"Arquivo de filtro inválido: {path}")
+        except Exception:
+            f.close()
+            raise
+        return cls(path, f, mm, capacity, num_bits, num_hashes, count)
+
+    def flush(self):
+        """
+        Soma ao contador do cabeçalho o que foi adicionado desde o último
+        flush e sincroniza com o disco. O contador é relido do arquivo:
+        outro processo com o mesmo filtro aberto pode ter somado antes.
+        """
+        _, _, _, _, count, synced = _HEADER.unpack_from(self._mm, 0)
+        count += self._added
+        self._write_header(count, synced)
+        self.count = count
+        self._added = 0
+
+    @property
+    def synced(self):
+        """Última linha da fonte já refletida no filtro (lida do arquivo)"""
+        return _HEADER.unpack_from(self._mm, 0)[5]
+
+    def mark_synced(self, synced):
+        """Grava a marca de sincronização (os bits até `synced` já estão no arquivo)"""
+        self._write_header(_HEADER.unpack_from(self._mm, 0)[4], synced)
+
+    def _write_header(self, count, synced):
+        _HEADER.pack_into(self._mm, 0, MAGIC, self.capacity, self.num_bits,
+                          self.num_hashes, count, synced)
+        self._mm.flush()
+
+    def close(self):
+        if self._mm is not None:
+            self.flush()
+            self._mm.close()
+            self._file.close()
+            self._mm = None
+
+    # =========================
+    # 🔎 OPERAÇÕES
+    # =========================
+    def _positions(self, key):
+        digest = hashlib.blake2b(str(key).encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key):
+        mm = self._mm
+        base = _HEADER.size
+        for pos in self._positions(key):
+            index = base + (pos >> 3)
+            mm[index] = mm[index] | (1 << (pos & 7))
+        self.count += 1
+        self._added += 1
+
+    def __contains__(self, key):
+        mm = self._mm
+        base = _HEADER.size
+        for pos in self._positions(key):
+            if not mm[base + (pos >> 3)] & (1 << (pos & 7)):
+                return False
+        return True
+
+    @property
+    def is_saturated(self):
+        """Passou da capacidade: a taxa de falsos positivos começa a subir"""
+        return self.count > self.capacity
+
+
+def open_or_build(path, source_ids=None, capacity=DEFAULT_CAPACITY,
+                  error_rate=DEFAULT_ERROR_RATE, max_synced=None):
+    """
+    Abre o filtro em `path`; se não existir, estiver saturado ou marcado
+    como sincronizado além de `max_synced` (a fonte foi trocada), recria
+    a partir de `source_ids()` (um callable que itera os IDs exatos) ou
+    vazio, com a marca zerada, para quem chama completar.
+    """
+    if os.path.exists(path):
+        try:
+            bloom = BloomFilter.open(path)
+            if max_synced is not None and bloom.synced > max_synced:
+                bloom.close()
+            elif not bloom.is_saturated:
+                return bloom
+            else:
+                capacity = max(capacity, bloom.capacity * 2)
+                bloom.close()
+        except (OSError, ValueError, struct.error):
+            pass
+
+    bloom = BloomFilter.create(path, capacity, error_rate)
+    for user_id in (source_ids() if source_ids is not None else ()):
+        bloom.add(user_id)
+    bloom.flush()
+    return bloom
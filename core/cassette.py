@@ -0,0 +1,373 @@
+"""
+Gravação e reprodução das chamadas ao Instagram ("cassetes").
+
+Gravação (`record_file`, CASSETTE_RECORD): cada chamada de rede do
+cliente vira uma linha JSON num arquivo gzip com o método, os
+argumentos, o instante (desde o início da gravação), a duração e a
+resposta — ou o erro, com os nomes da hierarquia de classes, então as
+limitações (``PleaseWaitFewMinutes``, ``FeedbackRequired``...) ficam
+gravadas como aconteceram. Login e ``account_info`` entram só com tempo
+e resultado (sucesso/erro): senha e dados da conta não vão para o
+arquivo.
+
+Reprodução (`replay_file`, CASSETTE_REPLAY): ``ReplayClient`` devolve
+as respostas gravadas, por método e na ordem da gravação. Quando os
+argumentos batem (a mesma página, o mesmo perfil) a resposta é a deles;
+senão é a próxima da fila — o n-ésimo unfollow recebe a n-ésima resposta,
+mesmo que a versão nova escolha outros alvos. Cada chamada demora a
+duração gravada dividida por `replay_speed` (0 = sem espera). Os erros
+são recriados com os mesmos nomes de classe, então ``is_throttle_error``
+e companhia reagem como no dia gravado. As esperas entre as chamadas não
+são reproduzidas: são o ritmo do próprio código, que é o que se compara
+entre versões.
+
+``python -m benchmarks --replay CASSETE`` roda os pontos de entrada com
+o cassete e o relógio virtual: um dia ruim gravado vira um benchmark
+determinístico.
+"""
+import atexit
+import functools
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+import types
+from collections import Counter, deque
+from datetime import datetime
+
+from core.pacing import is_throttle_error
+
+VERSION = 1
+RECORDED_METHODS = (
+    "login",
+    "account_info",
+    "user_followers",
+    "user_following",
+    "user_followers_v1_chunk",
+    "user_following_v1_chunk",
+    "user_info",
+    "user_medias",
+    "user_unfollow",
+)
+# Só tempo e sucesso/erro: nada de senha nem dados da conta no arquivo
+_PRIVATE_METHODS = {"login", "account_info"}
+
+_FLUSH_EVERY = 100
+
+
+class CassetteExhausted(LookupError):
+    """A execução pediu mais respostas do que o cassete tem"""
+
+
+# =========================
+# 🔄 CODIFICAÇÃO
+# =========================
+class Record:
+    """Objeto de resposta reproduzido; campos ausentes (None na gravação) valem None"""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return None
+
+    def __repr__(self):
+        return f"Record({', '.join(f'{key}={value!r}' for key, value in vars(self).items())})"
+
+
+def _encode(value):
+    """Resposta do cliente → JSON (objetos, datas e dicts com chaves não-str marcados)"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, dict):
+        if all(isinstance(key, str) and not key.startswith("$") for key in value):
+            return {key: _encode(item) for key, item in value.items()}
+        return {"$map": [[_encode(key), _encode(item)] for key, item in value.items()]}
+    if hasattr(value, "_asdict"):
+        fields = value._asdict()
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        return [_encode(item) for item in value]
+    elif hasattr(value, "__dict__"):
+        # Modelos do instagrapi (pydantic) e objetos comuns
+        fields = {key: item for key, item in vars(value).items() if not key.startswith("_")}
+    else:
+        return str(value)
+    return {"$obj": {key: _encode(item) for key, item in fields.items() if item is not None}}
+
+
+def _decode(value):
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    if isinstance(value, dict):
+        if "$dt" in value:
+            return datetime.fromisoformat(value["$dt"])
+        if "$map" in value:
+            return {_decode(key): _decode(item) for key, item in value["$map"]}
+        if "$obj" in value:
+            return Record(**{key: _decode(item) for key, item in value["$obj"].items()})
+        return {key: _decode(item) for key, item in value.items()}
+    return value
+
+
+def _args_key(args):
+    return json.dumps(args, sort_keys=True, separators=(",", ":"))
+
+
+def _encode_error(exc):
+    names = [cls.__name__ for cls in type(exc).__mro__
+             if cls not in (object, BaseException, Exception)]
+    return {"types": names, "message": str(exc)}
+
+
+_error_classes = {}
+
+
+def _rebuild_error(data):
+    """Exceção com a mesma cadeia de nomes de classe da gravada"""
+    base = Exception
+    names = tuple(data["types"])
+    for depth in range(len(names) - 1, -1, -1):
+        key = names[depth:]
+        if key not in _error_classes:
+            _error_classes[key] = type(names[depth], (base,), {})
+        base = _error_classes[key]
+    return base(data["message"])
+
+
+# =========================
+# ⏺️ GRAVAÇÃO
+# =========================
+class CassetteRecorder:
+    """Grava as chamadas de um ou mais clientes (clones da busca paralela) num arquivo"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._user_id = None
+        self.calls = 0
+        self._write({"cassette": VERSION, "recorded_at": datetime.now().isoformat()})
+        atexit.register(self.close)
+
+    def _write(self, data):
+        self._file.write(json.dumps(data, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def write(self, entry, cl):
+        user_id = getattr(cl, "user_id", None)
+        with self._lock:
+            if self._file is None:
+                return
+            if user_id is not None and user_id != self._user_id:
+                self._user_id = entry["u"] = user_id
+            self._write(entry)
+            self.calls += 1
+            # Erros (limitações) são o que mais interessa: não ficam só no buffer
+            if "e" in entry or self.calls % _FLUSH_EVERY == 0:
+                self._file.flush()
+
+    def attach(self, cl):
+        """Grava as chamadas de `cl` (na instância); o gravador fica em ``cl.cassette``"""
+        for method in RECORDED_METHODS:
+            call = getattr(cl, method, None)
+            if call is not None:
+                setattr(cl, method, _recorded(self, cl, method, call))
+        cl.cassette = self
+        return cl
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _recorded(recorder, cl, method, call):
+    @functools.wraps(call)
+    def wrapper(*args, **kwargs):
+        started = time.monotonic()
+        entry = {"t": round(started - recorder._started, 4), "m": method}
+        private = method in _PRIVATE_METHODS
+        if not private:
+            entry["a"] = _encode([list(args), kwargs])
+        try:
+            result = call(*args, **kwargs)
+        except Exception as e:
+            entry["e"] = _encode_error(e)
+            raise
+        else:
+            if not private:
+                entry["r"] = _encode(result)
+            return result
+        finally:
+            entry["d"] = round(time.monotonic() - started, 4)
+            recorder.write(entry, cl)
+    return wrapper
+
+
+def record(cl, path):
+    """Começa a gravar as chamadas de `cl` em `path`; retorna o cliente"""
+    return CassetteRecorder(path).attach(cl)
+
+
+# =========================
+# ▶️ REPRODUÇÃO
+# =========================
+def read_cassette(path):
+    """(cabeçalho, chamadas) do arquivo; tolera o fim cortado de uma gravação interrompida"""
+    header = None
+    entries = []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    break  # última linha incompleta
+                if header is None:
+                    header = data
+                else:
+                    entries.append(data)
+        except (EOFError, OSError):
+            pass
+    if header is None or header.get("cassette") != VERSION:
+        raise ValueError(f"{path} não é um cassete (versão {VERSION})")
+    return header, entries
+
+
+class CassettePlayer:
+    """Respostas gravadas por método, entregues na ordem; compartilhado entre clones"""
+
+    def __init__(self, path, speed=1.0):
+        self.path = path
+        self.speed = speed
+        self.header, entries = read_cassette(path)
+        self.user_id = None
+        self._queues = {}     # método → fila de chamadas (ordem da gravação)
+        self._by_args = {}    # (método, argumentos) → fila das mesmas chamadas
+        for entry in entries:
+            self.user_id = entry.get("u", self.user_id)
+            self._queues.setdefault(entry["m"], deque()).append(entry)
+            if "a" in entry:
+                self._by_args.setdefault((entry["m"], _args_key(entry["a"])), deque()).append(entry)
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    @property
+    def remaining(self):
+        return sum(1 for queue in self._queues.values() for entry in queue if "used" not in entry)
+
+    def _take(self, method, args, kwargs):
+        with self._lock:
+            queues = [self._by_args.get((method, _args_key(_encode([list(args), kwargs])))),
+                      self._queues.get(method)]
+            for queue in queues:
+                while queue:
+                    entry = queue.popleft()
+                    if "used" not in entry:
+                        entry["used"] = True
+                        return entry
+        return None
+
+    def play(self, method, *args, **kwargs):
+        entry = self._take(method, args, kwargs)
+        if entry is None:
+            if method in _PRIVATE_METHODS:
+                # Sessão diferente da gravada (ex.: login que não aconteceu no dia): sucesso
+                self.stats["synthesized"] += 1
+                return True if method == "login" else None
+            self.stats["missed"] += 1
+            raise CassetteExhausted(f"Nenhuma resposta gravada restante para {method}")
+
+        if self.speed > 0 and entry["d"] > 0:
+            time.sleep(entry["d"] / self.speed)
+        self.stats["replayed"] += 1
+        if "e" in entry:
+            error = _rebuild_error(entry["e"])
+            self.stats["throttled" if is_throttle_error(error) else "errors"] += 1
+            raise error
+        self.stats[method] += 1  # respostas de sucesso por método
+        if method == "login":
+            return True  # o resultado do login não é gravado, só o sucesso
+        return _decode(entry.get("r"))
+
+    def attach(self, cl):
+        cl.player = cl.cassette = self
+        return cl
+
+
+class ReplayClient:
+    """Mesma interface do ``instagrapi.Client`` usada pelos scripts, respondida pelo cassete"""
+
+    def __init__(self, player=None, **kwargs):
+        self.player = self.cassette = player
+        self.delay_range = None
+        self.challenge_code_handler = None
+        self.settings = {}
+
+    @property
+    def user_id(self):
+        return self.player.user_id if self.player is not None else None
+
+    def __getattr__(self, name):
+        player = self.__dict__.get("player")
+        if player is None or name not in RECORDED_METHODS:
+            raise AttributeError(name)
+        return functools.partial(player.play, name)
+
+    # 🔐 Sessão (local, como no instagrapi)
+    def get_settings(self):
+        return json.loads(json.dumps(self.settings))
+
+    def set_settings(self, settings):
+        self.settings = json.loads(json.dumps(settings))
+        return True
+
+    def load_settings(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            self.set_settings(json.load(f))
+        return self.settings
+
+    def dump_settings(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.settings, f, indent=4)
+        return True
+
+    def set_uuids(self, uuids):
+        self.settings["uuids"] = dict(uuids)
+        return True
+
+    def set_user_agent(self, user_agent=""):
+        self.settings["user_agent"] = user_agent
+        return True
+
+    def set_proxy(self, dsn):
+        return True
+
+
+def replay_client(path, speed=1.0):
+    """``ReplayClient`` com um tocador novo para o cassete em `path`"""
+    return ReplayClient(CassettePlayer(path, speed))
+
+
+def install(path, speed=1.0):
+    """
+    Registra ``instagrapi`` com um ``Client`` que reproduz o cassete, para
+    os scripts que criam o cliente sozinhos; retorna o tocador (compartilhado)
+    """
+    player = CassettePlayer(path, speed)
+    package = types.ModuleType("instagrapi")
+    package.Client = functools.partial(ReplayClient, player)
+    package.__path__ = []
+    sys.modules["instagrapi"] = package
+    return player
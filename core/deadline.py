@@ -0,0 +1,72 @@
+"""
+Prazo da execução (ex.: o ``timeout-minutes`` do GitHub Actions).
+
+Com um prazo, o pipeline:
+
+- depois da busca, calcula quantas ações cabem no tempo que sobrou com o
+  ritmo atual do pacer e agenda só essas (``Deadline.capacity``);
+- antes de cada espera do pacer (intervalo entre ações ou pausa por
+  limitação), confere se ela termina antes do prazo. Se não terminar,
+  levanta ``DeadlineReached`` em vez de dormir: o plano, o snapshot e o
+  ritmo aprendido já estão salvos e a próxima execução retoma dali.
+
+A margem (``margin``) reserva tempo para gravar o estado e para os
+passos seguintes do workflow (ex.: salvar o cache).
+"""
+import math
+import time
+
+from core.ratelimit import BudgetExhausted
+
+DEFAULT_MARGIN_SECONDS = 60
+
+
+class DeadlineReached(BudgetExhausted):
+    """A próxima espera terminaria depois do prazo da execução"""
+
+    def __init__(self, wait_seconds, available):
+        super().__init__(wait_seconds)
+        self.available = available
+        self.args = (f"espera de {wait_seconds:.0f}s, restam {max(available, 0):.0f}s do prazo",)
+
+
+class Deadline:
+    """Prazo de `seconds` a partir da criação, menos `margin` de reserva"""
+
+    def __init__(self, seconds, margin=DEFAULT_MARGIN_SECONDS, clock=None):
+        self._clock = clock or time.monotonic
+        self.margin = margin
+        self.ends_at = self._clock() + seconds
+
+    @classmethod
+    def from_minutes(cls, minutes, margin=DEFAULT_MARGIN_SECONDS, clock=None):
+        return cls(minutes * 60, margin, clock)
+
+    @property
+    def available(self):
+        """Segundos utilizáveis até o prazo (já sem a margem)"""
+        return self.ends_at - self.margin - self._clock()
+
+    def check(self, seconds):
+        """Levanta DeadlineReached se esperar `seconds` passaria do prazo"""
+        available = self.available
+        if seconds > available:
+            raise DeadlineReached(seconds, available)
+
+    def capacity(self, rate_per_hour, ready=1):
+        """Ações que cabem no tempo restante: `ready` já liberadas + o ritmo"""
+        available = self.available
+        if available <= 0:
+            return 0
+        if math.isinf(rate_per_hour):
+            return math.inf  # sem teto de ritmo: só o limite de ações da execução vale
+        return ready + math.floor(available * rate_per_hour / 3600)
+
+
+def deadline_from_settings(minutes, margin=None):
+    """Deadline a partir da configuração; None se não houver prazo"""
+    if not minutes:
+        return None
+    return Deadline.from_minutes(float(minutes),
+                                 DEFAULT_MARGIN_SECONDS if margin is None else float(margin))
+
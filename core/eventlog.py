@@ -0,0 +1,220 @@
+"""
+Logging sem bloqueio com eventos estruturados em JSONL.
+
+``configure_logging`` troca os handlers da raiz por um ``QueueHandler``:
+quem loga só põe o registro numa fila, e uma thread (``QueueListener``)
+faz a escrita no console e nos arquivos. Assim um disco lento nunca
+atrasa o loop de unfollows.
+
+Os arquivos giram por tamanho **ou** por tempo (o que vier primeiro) e
+as cópias antigas são comprimidas com gzip (``events.jsonl.1.gz``...).
+
+Cada linha do JSONL é um objeto com ``ts``, ``level``, ``logger`` e
+``message``, mais os campos estruturados passados em ``extra``::
+
+    logger.info("❌ Deixou de seguir: @fulano",
+                extra=event("unfollow", user_id="123", outcome="done", latency_ms=240))
+
+``read_events`` lê os arquivos (inclusive os .gz) para análise.
+"""
+import atexit
+import glob
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import sys
+import time
+from datetime import datetime
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_ROTATE_HOURS = 24
+DEFAULT_BACKUPS = 7
+
+# Atributos que todo LogRecord tem; o resto veio de `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener = None
+
+
+def event(action, **fields):
+    """Campos estruturados para `extra`; valores None são omitidos"""
+    fields = {key: value for key, value in fields.items() if value is not None}
+    fields["action"] = action
+    return fields
+
+
+class JsonlFormatter(logging.Formatter):
+    """Uma linha JSON por registro, com os campos de `extra`"""
+
+    def format(self, record):
+        data = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class CompressedRotatingFileHandler(logging.FileHandler):
+    """Gira ao passar de `max_bytes` ou a cada `rotate_hours`; cópias antigas em .gz"""
+
+    def __init__(self, filename, max_bytes=DEFAULT_MAX_BYTES, rotate_hours=DEFAULT_ROTATE_HOURS,
+                 backup_count=DEFAULT_BACKUPS, encoding="utf-8"):
+        os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+        super().__init__(filename, encoding=encoding, delay=True)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.interval = rotate_hours * 3600 if rotate_hours else None
+        self.rollover_at = self._next_rollover()
+
+    def _backup_name(self, index):
+        return f"{self.baseFilename}.{index}.gz"
+
+    def _next_rollover(self):
+        if self.interval is None:
+            return None
+        # Conta a partir da última rotação (a cópia .1.gz), para valer entre execuções
+        try:
+            started = os.path.getmtime(self._backup_name(1))
+        except OSError:
+            started = time.time()
+        return started + self.interval
+
+    def _size(self):
+        try:
+            return os.path.getsize(self.baseFilename)
+        except OSError:
+            return 0
+
+    def should_rollover(self, line_bytes):
+        size = self._size()
+        if not size:
+            return False
+        if self.max_bytes and size + line_bytes > self.max_bytes:
+            return True
+        return self.rollover_at is not None and time.time() >= self.rollover_at
+
+    def rollover(self):
+        """Comprime o arquivo atual em .1.gz e empurra as cópias antigas"""
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                if os.path.exists(self._backup_name(index)):
+                    os.replace(self._backup_name(index), self._backup_name(index + 1))
+            with open(self.baseFilename, "rb") as src, gzip.open(self._backup_name(1), "wb") as dst:
+                shutil.copyfileobj(src, dst)
+        os.remove(self.baseFilename)
+        if self.interval is not None:
+            self.rollover_at = time.time() + self.interval
+
+    def emit(self, record):
+        try:
+            line = self.format(record)
+            if self.should_rollover(len(line.encode("utf-8")) + 1):
+                self.rollover()
+        except Exception:
+            self.handleError(record)
+            return
+        super().emit(record)
+
+
+def configure_logging(jsonl_file=None, text_file=None, level=logging.INFO,
+                      console_format="%(message)s", text_format=None, stream=None,
+                      max_bytes=DEFAULT_MAX_BYTES, rotate_hours=DEFAULT_ROTATE_HOURS,
+                      backup_count=DEFAULT_BACKUPS):
+    """
+    Console (`console_format`), JSONL (`jsonl_file`) e texto (`text_file`)
+    escritos por uma thread em segundo plano. Parada automática no fim do
+    processo (ou com ``stop_logging``). Retorna o QueueListener.
+    """
+    import logging.handlers  # só aqui: importar este módulo continua barato
+
+    global _listener
+    stop_logging()
+
+    handlers = []
+    console = logging.StreamHandler(stream or sys.stdout)
+    console.setFormatter(logging.Formatter(console_format))
+    handlers.append(console)
+    if jsonl_file:
+        jsonl = CompressedRotatingFileHandler(jsonl_file, max_bytes, rotate_hours, backup_count)
+        jsonl.setFormatter(JsonlFormatter())
+        handlers.append(jsonl)
+    if text_file:
+        text = CompressedRotatingFileHandler(text_file, max_bytes, rotate_hours, backup_count)
+        text.setFormatter(logging.Formatter(text_format or console_format))
+        handlers.append(text)
+
+    records = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(records))
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def logging_from_env(default_jsonl, environ=None, **kwargs):
+    """
+    ``configure_logging`` com LOG_FILE (caminho do JSONL; "0" desativa),
+    LOG_MAX_BYTES, LOG_ROTATE_HOURS e LOG_BACKUPS.
+    """
+    environ = os.environ if environ is None else environ
+    jsonl_file = environ.get("LOG_FILE") or default_jsonl
+    return configure_logging(
+        jsonl_file=None if jsonl_file == "0" else jsonl_file,
+        max_bytes=int(environ.get("LOG_MAX_BYTES", DEFAULT_MAX_BYTES)),
+        rotate_hours=float(environ.get("LOG_ROTATE_HOURS", DEFAULT_ROTATE_HOURS)),
+        backup_count=int(environ.get("LOG_BACKUPS", DEFAULT_BACKUPS)),
+        **kwargs,
+    )
+
+
+def stop_logging():
+    """Esvazia a fila e para a thread de escrita"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(stop_logging)
+
+
+# =========================
+# 📊 LEITURA
+# =========================
+def read_events(path, action=None):
+    """Eventos do JSONL e das cópias giradas (.gz), do mais antigo ao mais novo"""
+    rotated = [name for name in glob.glob(f"{glob.escape(path)}.*.gz")
+               if name[len(path) + 1:-3].isdigit()]
+    rotated.sort(key=lambda name: int(name[len(path) + 1:-3]), reverse=True)
+    for filename in rotated + ([path] if os.path.exists(path) else []):
+        opener = gzip.open if filename.endswith(".gz") else open
+        with opener(filename, "rt", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    continue  # linha cortada por uma parada abrupta
+                if action is None or data.get("action") == action:
+                    yield data
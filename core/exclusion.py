@@ -0,0 +1,196 @@
+"""
+Lista de contas protegidas (nunca deixadas de seguir).
+
+Cada linha do arquivo é uma regra; ``#`` começa um comentário::
+
+    123456789          # ID exato (ou id:123456789)
+    @amigo             # username exato (o @ é opcional)
+    marca*             # prefixo
+    *_official         # sufixo
+    *loja*             # outros curingas (* ? [..]) viram regex
+    re:^team_\\d+$     # expressão regular
+
+Os tipos de regra são compilados separadamente: IDs e usernames exatos
+num set, prefixos e sufixos em duas tries, e todos os curingas/regex numa
+única alternação compilada. Cada candidato custa então uma consulta ao
+set, um passeio de no máximo ``len(username)`` nas tries e uma busca da
+regex, independentemente de quantas regras existem.
+
+Usernames são comparados sem diferenciar maiúsculas de minúsculas.
+``ExclusionFile`` relê o arquivo quando ele muda (verificação por mtime e
+tamanho), o que permite editar a lista com o modo automático rodando.
+"""
+import fnmatch
+import logging
+import os
+import re
+
+EXCLUSIONS_FILE = "exclusions.txt"
+
+_END = None  # Marca de fim de palavra nas tries
+_WILDCARDS = "*?["
+
+logger = logging.getLogger(__name__)
+
+
+class _Trie:
+    """Trie de caracteres: `matches(texto)` diz se alguma palavra é prefixo do texto"""
+
+    def __init__(self):
+        self.root = {}
+        self.size = 0
+
+    def add(self, word):
+        node = self.root
+        for char in word:
+            node = node.setdefault(char, {})
+        if _END not in node:
+            node[_END] = True
+            self.size += 1
+
+    def matches(self, text):
+        node = self.root
+        for char in text:
+            if _END in node:
+                return True
+            node = node.get(char)
+            if node is None:
+                return False
+        return _END in node
+
+
+class ExclusionList:
+    """Regras compiladas; `matches(user_id, username)` em tempo ~linear no username"""
+
+    def __init__(self, rules=()):
+        self.ids = set()
+        self.usernames = set()
+        self._prefixes = _Trie()
+        self._suffixes = _Trie()  # sufixos guardados ao contrário
+        self._patterns = []
+        self._regex = None
+        self.skipped = 0
+        for number, rule in enumerate(rules, 1):
+            try:
+                self._add(rule)
+            except re.error as e:
+                raise ValueError(f"Regra {number} inválida ({rule.strip()!r}): {e}") from e
+        if self._patterns:
+            self._regex = re.compile("|".join(f"(?:{pattern})" for pattern in self._patterns),
+                                     re.IGNORECASE)
+
+    @classmethod
+    def load(cls, path=EXCLUSIONS_FILE):
+        """Lê as regras de um arquivo (uma por linha)"""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(f)
+
+    def _add(self, rule):
+        rule = rule.strip()
+        if not rule.startswith("re:"):
+            rule = rule.split("#", 1)[0].strip()  # numa regex o # é literal
+        if not rule:
+            return
+        if rule.startswith("re:"):
+            pattern = rule[3:]
+            re.compile(pattern)  # erro aponta a regra, não a alternação inteira
+            self._patterns.append(pattern)
+            return
+        if rule.startswith("id:"):
+            self.ids.add(rule[3:].strip())
+            return
+        if rule.isdigit():
+            self.ids.add(rule)
+            return
+
+        name = rule.lstrip("@").lower()
+        body = name.strip("*")
+        if not any(char in body for char in _WILDCARDS):
+            if name.endswith("*") and not name.startswith("*"):
+                self._prefixes.add(body)
+                return
+            if name.startswith("*") and not name.endswith("*"):
+                self._suffixes.add(body[::-1])
+                return
+            if "*" not in name:
+                self.usernames.add(name)
+                return
+        self._patterns.append(fnmatch.translate(name))
+
+    def __len__(self):
+        return (len(self.ids) + len(self.usernames) + self._prefixes.size
+                + self._suffixes.size + len(self._patterns))
+
+    def matches(self, user_id, username):
+        """True se a conta está protegida por alguma regra"""
+        if str(user_id) in self.ids:
+            return True
+        if not username:
+            return False
+        name = username.lower()
+        return (name in self.usernames
+                or self._prefixes.matches(name)
+                or self._suffixes.matches(name[::-1])
+                or (self._regex is not None and self._regex.match(name) is not None))
+
+    def filter(self, candidates):
+        """Tira de (usuário, posição) os protegidos; conta quantos em `self.skipped`"""
+        self.skipped = 0
+        for candidate in candidates:
+            user = candidate[0]
+            if self.matches(user.pk, user.username):
+                self.skipped += 1
+                continue
+            yield candidate
+
+
+class ExclusionFile:
+    """Arquivo de regras relido quando muda; sem arquivo, nenhuma conta é protegida"""
+
+    def __init__(self, path=EXCLUSIONS_FILE):
+        self.path = path
+        self.rules = ExclusionList()
+        self._stamp = None
+
+    def refresh(self):
+        """Relê o arquivo se ele mudou; True quando as regras foram trocadas"""
+        try:
+            stat = os.stat(self.path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stamp = None
+        if stamp == self._stamp:
+            return False
+
+        if stamp is None:
+            rules = ExclusionList()
+        else:
+            try:
+                rules = ExclusionList.load(self.path)
+            except (OSError, ValueError) as e:
+                if self._stamp is None:
+                    raise  # Na primeira leitura um erro não pode virar "ninguém protegido"
+                logger.warning(f"⚠️ Lista de proteção não recarregada, mantendo a anterior: {e}")
+                return False
+        self.rules = rules
+        self._stamp = stamp
+        return True
+
+
+_files = {}
+
+
+def exclusion_file(path):
+    """``ExclusionFile`` compartilhado por caminho (mantém o cache entre execuções)"""
+    if path not in _files:
+        _files[path] = ExclusionFile(path)
+    return _files[path]
+
+
+def load_exclusions(path):
+    """Regras atuais do arquivo (relido só se mudou); None se não houver regras"""
+    if not path:
+        return None
+    excluded = exclusion_file(path)
+    excluded.refresh()
+    return excluded.rules if len(excluded.rules) else None
@@ -0,0 +1,160 @@
+"""
+Busca concorrente das listas de seguidores e seguindo.
+
+As duas listas são paginações independentes, então cada uma roda numa
+thread com o seu próprio cliente (clonado a partir das configurações da
+sessão já autenticada, para não compartilhar o estado interno do
+``Client``). O pacer de busca (``core.pacing.AdaptivePacer``) é
+compartilhado pelas duas threads, como se fosse um único cliente: o
+ritmo, as pausas por limitação (a mesma página é tentada de novo) e o
+prazo da execução valem para a soma das duas. A vez de cada página é
+calculada sob um lock e a espera acontece fora dele, então uma thread
+dormindo não segura a outra. Com pacer, o
+``delay_range`` do cliente fica desligado durante a busca para não
+dormir duas vezes. Se um lado falhar de vez (ex.: limitações seguidas
+demais), o outro para na próxima página e a exceção original é relançada.
+
+O clone recebe de novo o que foi instalado na instância do cliente
+original (métricas de ``core.metrics``, renovação de sessão de
+``core.session``): quem envolve o cliente registra um gancho com
+``on_clone`` e ``clone_client`` os reaplica na ordem.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+
+from core.idstream import iter_pages, DEFAULT_PAGE_SIZE
+
+
+class FetchCancelled(Exception):
+    """A outra lista falhou; esta busca foi interrompida"""
+
+
+class SharedPacer:
+    """
+    Pacer usado pelas duas threads. A vez de cada chamada (ritmo, pausa
+    por limitação e prazo) é reservada sob o lock; a espera é fora dele.
+    Uma limitação pausa as duas listas até o fim da pausa.
+    """
+
+    def __init__(self, pacer):
+        self.pacer = pacer
+        self.clock = pacer.limiter.clock
+        self._lock = threading.Lock()
+        self._paused_until = None
+
+    def wait(self):
+        with self._lock:
+            pause = 0.0
+            if self._paused_until is not None:
+                pause = max(0.0, self._paused_until - self.clock.now())
+                if self.pacer.deadline is not None:
+                    self.pacer.deadline.check(pause)
+            wait = max(pause, self.pacer.reserve())
+        self.clock.sleep(wait)
+        return wait
+
+    def on_success(self):
+        with self._lock:
+            self.pacer.on_success()
+
+    def on_throttle(self):
+        """Reduz o ritmo e marca a pausa; quem esperar a próxima vez dorme até o fim dela"""
+        with self._lock:
+            backoff = self.pacer.on_throttle(sleep=False)
+            if self.pacer.deadline is not None:
+                self.pacer.deadline.check(backoff)
+            self.pacer.backoff_total += backoff
+            until = self.clock.now() + backoff
+            self._paused_until = max(self._paused_until or until, until)
+        return backoff
+
+
+def on_clone(cl, hook):
+    """Registra `hook(clone)`, reaplicado por ``clone_client`` em cada clone de `cl`"""
+    hooks = getattr(cl, "clone_hooks", None)
+    if hooks is None:
+        hooks = cl.clone_hooks = []
+    hooks.append(hook)
+    return cl
+
+
+def clone_client(cl):
+    """
+    Novo cliente com a mesma sessão (cookies, device, user agent) e o
+    mesmo transporte, se houver: o pool de conexões é compartilhado. Com
+    um cassete (``core.cassette``), o clone grava ou reproduz no mesmo;
+    os ganchos de ``on_clone`` (métricas, renovação de sessão) são
+    reaplicados depois.
+    """
+    clone = type(cl)()
+    clone.set_settings(cl.get_settings())
+    transport = getattr(cl, "transport", None)
+    if transport is not None:
+        transport.apply(clone)
+    cassette = getattr(cl, "cassette", None)
+    if cassette is not None:
+        cassette.attach(clone)
+    for hook in getattr(cl, "clone_hooks", None) or ():
+        hook(clone)
+    return clone
+
+
+def _crawl(cl, kind, user_id, pacer, stop, page_size):
+    users = {}
+    for page in iter_pages(cl, kind, user_id, page_size, pacer):
+        if stop.is_set():
+            raise FetchCancelled(kind)
+        for user in page:
+            users[user.pk] = user
+    return users
+
+
+def fetch_both(cl, user_id=None, pacer=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Busca seguidores e seguindo ao mesmo tempo, com o `pacer` de busca
+    compartilhado entre as duas threads.
+
+    Retorna ``(followers, following)`` no mesmo formato de
+    ``user_followers``/``user_following`` (dict pk -> UserShort).
+    """
+    user_id = user_id or cl.user_id
+    delay_range = getattr(cl, "delay_range", None)
+
+    stop = threading.Event()
+    clients = {"followers": cl, "following": clone_client(cl)}
+    if pacer is not None:
+        pacer = SharedPacer(pacer)
+        for client in clients.values():
+            client.delay_range = None
+
+    try:
+        results, error = _run(clients, user_id, pacer, stop, page_size)
+    finally:
+        cl.delay_range = delay_range
+
+    if error is not None:
+        raise error
+    return results["followers"], results["following"]
+
+
+def _run(clients, user_id, pacer, stop, page_size):
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="fetch") as pool:
+        futures = {
+            kind: pool.submit(_crawl, client, kind, user_id, pacer, stop, page_size)
+            for kind, client in clients.items()
+        }
+
+        # Assim que um lado falha, sinaliza o outro para parar
+        done, _ = wait(futures.values(), return_when=FIRST_EXCEPTION)
+        if any(future.exception() is not None for future in done):
+            stop.set()
+
+    results = {}
+    error = None
+    for kind, future in futures.items():
+        exc = future.exception()
+        if exc is None:
+            results[kind] = future.result()
+        elif not isinstance(exc, FetchCancelled) and error is None:
+            error = exc
+    return results, error
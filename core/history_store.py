@@ -0,0 +1,256 @@
+"""
+Histórico de unfollows em SQLite.
+
+Substitui o ``unfollow_history.json``, que era reescrito inteiro a cada
+alteração e só guardava os últimos 1000 usuários. Aqui cada unfollow é uma
+linha nova (append-only) e os contadores diários ficam numa tabela própria,
+então as consultas por usuário e por dia são buscas em índice.
+
+Opcionalmente um filtro de Bloom (ver ``core.bloom``) fica na frente das
+consultas por usuário: só os positivos do filtro vão para o SQLite. Um
+falso negativo ali deixaria alguém ser deixado de seguir duas vezes,
+então o cabeçalho do filtro guarda o último ``id`` de ``unfollows`` que
+ele já contém. Os bits são escritos dentro da transação de escrita do
+SQLite (``BEGIN IMMEDIATE``), que serializa os processos, a partir das
+linhas com ``id`` acima da marca; ao abrir e antes de cada consulta, o
+que outro processo gravou (com ou sem filtro) é completado, e um filtro
+marcado além do fim da tabela é recriado.
+
+Para consultas (``readonly=True``, ex.: estatísticas) o arquivo é aberto
+só para leitura, sem filtro, e um histórico que ainda não existe não é
+criado: a consulta vê um histórico vazio.
+"""
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+
+
+HISTORY_DB = "unfollow_history.db"
+
+# Limite de parâmetros por consulta "IN (...)" (o SQLite aceita 999 por padrão)
+_QUERY_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS unfollows (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    username TEXT,
+    unfollowed_at TEXT NOT NULL,
+    day TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_unfollows_user_id ON unfollows(user_id);
+CREATE INDEX IF NOT EXISTS idx_unfollows_day ON unfollows(day);
+
+CREATE TABLE IF NOT EXISTS daily_counts (
+    day TEXT PRIMARY KEY,
+    count INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _uri_path(path):
+    return path.replace("%", "%25").replace("?", "%3f").replace("#", "%23")
+
+
+def _today():
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+class HistoryStore:
+    """Histórico de unfollows com escrita transacional e consultas indexadas"""
+
+    def __init__(self, path=HISTORY_DB, bloom_path=None, readonly=False):
+        self.path = path
+        self.bloom = None
+        if readonly and os.path.exists(path):
+            self.conn = sqlite3.connect(f"file:{_uri_path(path)}?mode=ro", uri=True)
+            return
+        self.conn = sqlite3.connect(":memory:" if readonly else path)
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+
+        if bloom_path and not readonly:
+            from core.bloom import open_or_build, DEFAULT_CAPACITY
+
+            size = self.history_size
+            capacity = max(DEFAULT_CAPACITY, 2 * size)
+            self.bloom = open_or_build(bloom_path, capacity=capacity, max_synced=size)
+            self._catch_up()
+
+    def close(self):
+        if self.bloom is not None:
+            self.bloom.close()
+        self.conn.close()
+
+    @contextmanager
+    def _writing(self):
+        """
+        Transação com o lock de escrita do SQLite; antes do commit o filtro
+        recebe as linhas novas (de qualquer processo). A marca só avança
+        depois do commit: um rollback deixa no máximo bits a mais.
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+            synced = self._sync_bloom()
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+        if synced is not None:
+            self.bloom.mark_synced(synced)
+
+    def _sync_bloom(self):
+        """Adiciona ao filtro as linhas além da marca; retorna a nova marca"""
+        if self.bloom is None:
+            return None
+        synced = self.bloom.synced
+        rows = self.conn.execute(
+            "SELECT id, user_id FROM unfollows WHERE id > ? ORDER BY id", (synced,))
+        for row_id, user_id in rows:
+            self.bloom.add(user_id)
+            synced = row_id
+        self.bloom.flush()
+        return synced
+
+    def _catch_up(self):
+        """Completa o filtro com o que foi gravado sem ele (outro processo ou store)"""
+        if self.bloom is not None and self.history_size > self.bloom.synced:
+            with self._writing():
+                pass
+
+    # =========================
+    # 🔧 METADADOS
+    # =========================
+    def _get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key, value):
+        self.conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
+
+    @property
+    def total_unfollowed(self):
+        return int(self._get_meta("total_unfollowed", 0))
+
+    @property
+    def last_check(self):
+        return self._get_meta("last_check")
+
+    @property
+    def history_size(self):
+        """Quantidade de unfollows registrados (a tabela é append-only)"""
+        row = self.conn.execute("SELECT MAX(id) FROM unfollows").fetchone()
+        return row[0] or 0
+
+    # =========================
+    # 📅 CONTADORES DIÁRIOS
+    # =========================
+    def daily_count(self, day=None):
+        """Unfollows feitos no dia (hoje por padrão)"""
+        row = self.conn.execute(
+            "SELECT count FROM daily_counts WHERE day = ?", (day or _today(),)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def add_daily_count(self, count, day=None):
+        """Soma ao contador do dia e ao total, numa única transação"""
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO daily_counts (day, count) VALUES (?, ?) "
+                "ON CONFLICT(day) DO UPDATE SET count = count + excluded.count",
+                (day or _today(), count),
+            )
+            self._set_meta("total_unfollowed", str(self.total_unfollowed + count))
+            self._set_meta("last_check", datetime.now().isoformat())
+
+    # =========================
+    # 👤 EVENTOS DE UNFOLLOW
+    # =========================
+    def add_unfollowed(self, users, when=None):
+        """Registra os usuários (objetos com .pk e .username) numa transação"""
+        when = when or datetime.now()
+        rows = [
+            (str(user.pk), user.username, when.isoformat(), when.strftime("%Y-%m-%d"))
+            for user in users
+        ]
+        with self._writing():
+            self.conn.executemany(
+                "INSERT INTO unfollows (user_id, username, unfollowed_at, day) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def filter_unfollowed(self, user_ids):
+        """Subconjunto de `user_ids` que já foi deixado de seguir"""
+        user_ids = [str(uid) for uid in user_ids]
+        if self.bloom is not None:
+            self._catch_up()
+            # Negativos do filtro são definitivos; só os positivos vão ao SQLite
+            user_ids = [uid for uid in user_ids if uid in self.bloom]
+        found = set()
+        for start in range(0, len(user_ids), _QUERY_CHUNK):
+            chunk = user_ids[start:start + _QUERY_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT DISTINCT user_id FROM unfollows WHERE user_id IN ({placeholders})",
+                chunk,
+            )
+            found.update(row[0] for row in rows)
+        return found
+
+    def unfollowed_ids(self, start=None, end=None):
+        """IDs distintos deixados de seguir entre os dias `start` e `end` (inclusive)"""
+        rows = self.conn.execute(
+            "SELECT DISTINCT user_id FROM unfollows WHERE day >= ? AND day <= ?",
+            (start or "", end or "9999-12-31"),
+        )
+        for row in rows:
+            yield row[0]
+
+    # =========================
+    # 📦 MIGRAÇÃO DO JSON
+    # =========================
+    def migrate_from_json(self, json_path):
+        """Importa o histórico JSON antigo uma única vez; retorna True se importou"""
+        if self._get_meta("migrated_from_json") or not os.path.exists(json_path):
+            return False
+
+        with open(json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        with self._writing():
+            self.conn.executemany(
+                "INSERT INTO daily_counts (day, count) VALUES (?, ?) "
+                "ON CONFLICT(day) DO UPDATE SET count = count + excluded.count",
+                list(data.get("daily_unfollows", {}).items()),
+            )
+            self.conn.executemany(
+                "INSERT INTO unfollows (user_id, username, unfollowed_at, day) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (str(user["user_id"]), user.get("username"), user["unfollowed_at"],
+                     user["unfollowed_at"][:10])
+                    for user in data.get("unfollowed_users", [])
+                ],
+            )
+            self._set_meta("total_unfollowed",
+                           str(self.total_unfollowed + data.get("total_unfollowed", 0)))
+            if data.get("last_check"):
+                self._set_meta("last_check", data["last_check"])
+            self._set_meta("migrated_from_json", datetime.now().isoformat())
+
+        os.replace(json_path, f"{json_path}.migrated")
+        return True
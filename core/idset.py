@@ -0,0 +1,198 @@
+"""
+Motor de diferença entre conjuntos de IDs.
+
+Com NumPy, os IDs ficam em arrays ordenados de int64 e todas as relações
+(não-seguidores, fãs, mútuos e "menos os já deixados de seguir") saem de
+uma única passada com busca binária vetorizada. Sem NumPy (o caso do
+``requirements.txt``) não há array de int64 na diferença: ``diff_ids``
+trabalha direto nos sets/chaves que recebe, sem converter nem ordenar,
+com as operações de set do Python. É o caminho mais rápido sem NumPy,
+mas não é de poucos milissegundos: com 1M seguindo e 1M seguidores a
+diferença com a exclusão leva ~0,3–0,45 s (uma diferença de sets simples
+custa o mesmo). O NumPy só é importado no primeiro cálculo, para não
+pesar na partida dos comandos que não fazem diferença de listas.
+
+Os objetos de usuário só são montados para os IDs que vão ser usados
+(ver ``iter_ranked``).
+
+``to_deltas``/``from_deltas`` gravam um array ordenado como diferenças
+entre IDs vizinhos (int64 little-endian), formato das colunas de
+``core.archive``; ``iter_deltas`` faz o mesmo em blocos para IDs que já
+vêm ordenados.
+"""
+import sys
+from array import array
+from collections import namedtuple
+from itertools import accumulate, chain, islice
+
+DELTA_CHUNK = 65536
+
+_np = False  # False = ainda não tentou importar
+
+DiffResult = namedtuple("DiffResult", ["non_followers", "candidates", "mutuals", "fans"])
+
+
+def _numpy():
+    """Importa o NumPy na primeira chamada; None se não estiver instalado"""
+    global _np
+    if _np is False:
+        try:
+            import numpy
+        except ImportError:  # NumPy é opcional
+            numpy = None
+        _np = numpy
+    return _np
+
+
+def to_id_array(ids):
+    """
+    Converte IDs (str ou int) para um array int64 ordenado e sem repetição
+    (``array("q")`` sem NumPy: usado pelas colunas de ``core.archive``)
+    """
+    np = _numpy()
+    if np is not None:
+        if isinstance(ids, np.ndarray):
+            ids = ids.astype(np.int64, copy=False)
+            if len(ids) < 2 or bool((ids[1:] > ids[:-1]).all()):
+                return ids  # já ordenado e sem repetição (ex.: colunas do arquivo)
+            return np.unique(ids)
+        return np.unique(np.fromiter((int(uid) for uid in ids), dtype=np.int64))
+    return array("q", sorted({int(uid) for uid in ids}))
+
+
+def _id_set(ids):
+    """set de int para as operações sem NumPy (arrays de int64 não precisam de conversão)"""
+    if isinstance(ids, array):
+        return set(ids)
+    return {int(uid) for uid in ids}
+
+
+def _isin_sorted(values, sorted_ref):
+    """Máscara booleana: quais de `values` estão em `sorted_ref` (NumPy)"""
+    np = _numpy()
+    if len(sorted_ref) == 0:
+        return np.zeros(len(values), dtype=bool)
+    idx = np.searchsorted(sorted_ref, values)
+    idx[idx == len(sorted_ref)] = 0
+    return sorted_ref[idx] == values
+
+
+def _as_set(ids):
+    """Set (ou view de chaves de dict, que já tem as operações de set) sem copiar"""
+    if isinstance(ids, (set, frozenset, type({}.keys()))):
+        return ids
+    return set(ids)
+
+
+def diff_ids(followers_ids, following_ids, exclude_ids=()):
+    """
+    Calcula, de uma vez:
+      - non_followers: seguindo - seguidores
+      - candidates: non_followers - exclude_ids (ex.: já deixados de seguir)
+      - mutuals / fans: quantos estão nas duas listas / só em seguidores
+    `exclude_ids` pode ser uma função que recebe os não-seguidores e
+    retorna os que saem (ex.: ``HistoryStore.filter_unfollowed``).
+    Com NumPy os IDs saem em arrays int64 ordenados; sem NumPy, em sets
+    com os IDs no tipo recebido (as listas e o histórico usam str), e o
+    custo é o de ``following - followers`` (~0,3 s com 1M IDs).
+    """
+    np = _numpy()
+    if np is None:
+        followers = _as_set(followers_ids)
+        following = _as_set(following_ids)
+        non_followers = following - followers
+        exclude = exclude_ids(non_followers) if callable(exclude_ids) else exclude_ids
+        mutuals = len(following) - len(non_followers)
+        return DiffResult(
+            non_followers,
+            non_followers.difference(exclude) if exclude else non_followers,
+            mutuals,
+            len(followers) - mutuals,
+        )
+
+    followers = to_id_array(followers_ids)
+    following = to_id_array(following_ids)
+    follows_back = _isin_sorted(following, followers)
+    non_followers = following[~follows_back]
+    exclude = exclude_ids(non_followers) if callable(exclude_ids) else exclude_ids
+    candidates = non_followers[~_isin_sorted(non_followers, to_id_array(exclude))]
+    mutuals = int(follows_back.sum())
+    return DiffResult(non_followers, candidates, mutuals, len(followers) - mutuals)
+
+
+def subtract(ids, exclude_ids):
+    """Remove `exclude_ids` de um array ordenado"""
+    if _numpy() is not None:
+        return ids[~_isin_sorted(ids, to_id_array(exclude_ids))]
+    exclude = _id_set(exclude_ids)
+    return array("q", (uid for uid in ids if uid not in exclude))
+
+
+def intersect(ids, other_ids):
+    """IDs de um array ordenado que também estão em `other_ids`"""
+    if _numpy() is not None:
+        return ids[_isin_sorted(ids, to_id_array(other_ids))]
+    other = _id_set(other_ids)
+    return array("q", (uid for uid in ids if uid in other))
+
+
+def to_deltas(ids):
+    """Bytes das diferenças entre IDs consecutivos (o primeiro fica inteiro)"""
+    ids = to_id_array(ids)
+    np = _numpy()
+    if np is not None:
+        return np.diff(ids, prepend=np.int64(0)).astype("<i8", copy=False).tobytes()
+    deltas = array("q", (uid - prev for prev, uid in zip(chain((0,), ids), ids)))
+    if sys.byteorder == "big":
+        deltas.byteswap()
+    return deltas.tobytes()
+
+
+def iter_deltas(sorted_ids, chunk_size=DELTA_CHUNK):
+    """
+    Mesmo formato de ``to_deltas``, em blocos de até `chunk_size` IDs,
+    para IDs que já chegam em ordem crescente e sem repetição (ex.: um
+    ``core.idstream.IdSpool``): nada é juntado num set nem reordenado
+    """
+    ids = iter(sorted_ids)
+    prev = 0
+    while True:
+        chunk = array("q", (int(uid) for uid in islice(ids, chunk_size)))
+        if not chunk:
+            return
+        deltas = array("q", (uid - before for before, uid in zip(chain((prev,), chunk), chunk)))
+        if (prev and deltas[0] <= 0) or (len(deltas) > 1 and min(deltas[1:]) <= 0):
+            raise ValueError("IDs fora de ordem ou repetidos")
+        prev = chunk[-1]
+        if sys.byteorder == "big":
+            deltas.byteswap()
+        yield deltas.tobytes()
+
+
+def from_deltas(raw):
+    """Inverso de ``to_deltas``: array ordenado de int64"""
+    np = _numpy()
+    if np is not None:
+        return np.frombuffer(raw, dtype="<i8").cumsum(dtype=np.int64)
+    deltas = array("q")
+    deltas.frombytes(raw)
+    if sys.byteorder == "big":
+        deltas.byteswap()
+    return array("q", accumulate(deltas))
+
+
+def iter_ranked(ids, users):
+    """
+    (usuário, posição em `users`) para cada ID de `ids`, na ordem de
+    `users` (a ordem da lista "seguindo": mais recentes primeiro)
+    """
+    if isinstance(ids, (set, frozenset)):
+        # Saída de diff_ids sem NumPy: mesmo tipo das chaves de `users`
+        for rank, (key, user) in enumerate(users.items()):
+            if key in ids:
+                yield user, rank
+        return
+    wanted = {str(uid) for uid in ids}
+    for rank, (key, user) in enumerate(users.items()):
+        if str(key) in wanted:
+            yield user, rank
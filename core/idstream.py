@@ -0,0 +1,227 @@
+"""
+Coleta paginada de seguidores/seguindo com uso de memória limitado.
+
+Em vez de montar dicts com todos os ``UserShort``, as páginas são
+percorridas uma a uma e só os IDs (e, para "seguindo", o username) são
+guardados. Quando o buffer passa do limite configurado ele é ordenado e
+despejado num arquivo temporário (um "run"). A diferença entre as listas
+é feita com um merge sobre os runs ordenados.
+"""
+import heapq
+import os
+import tempfile
+from array import array
+from collections import namedtuple
+from itertools import islice
+
+from core.pacing import is_throttle_error
+from core.priority import select_top
+
+DEFAULT_PAGE_SIZE = 200
+DEFAULT_MEMORY_LIMIT = 32 * 1024 * 1024
+EXCLUDE_BATCH = 500  # IDs por consulta ao filtro de exclusão
+
+# Custo aproximado de um username guardado em memória (objeto str + lista)
+_NAME_OVERHEAD = 57
+
+# Referência mínima a um usuário: mesmos atributos usados pelos executores
+UserRef = namedtuple("UserRef", ["pk", "username"])
+
+
+# =========================
+# 📄 PAGINAÇÃO
+# =========================
+def iter_pages(cl, kind, user_id, page_size=DEFAULT_PAGE_SIZE, pacer=None, max_attempts=5):
+    """
+    Percorre 'followers' ou 'following' página por página.
+
+    Com um `pacer` (ver ``core.pacing``) cada página espera a sua vez e,
+    em caso de limitação, a mesma página é tentada de novo após a pausa
+    em vez de recomeçar a lista do zero.
+    """
+    fetch = getattr(cl, f"user_{kind}_v1_chunk")
+    max_id = ""
+    while True:
+        attempt = 0
+        while True:
+            if pacer is not None:
+                pacer.wait()
+            try:
+                users, next_max_id = fetch(user_id, max_amount=page_size, max_id=max_id)
+            except Exception as e:
+                attempt += 1
+                if pacer is None or not is_throttle_error(e) or attempt >= max_attempts:
+                    raise
+                pacer.on_throttle()
+                continue
+            if pacer is not None:
+                pacer.on_success()
+            break
+
+        max_id = next_max_id
+        if users:
+            yield users
+        if not max_id:
+            break
+
+
+def fetch_list(cl, kind, user_id, pacer=None, page_size=DEFAULT_PAGE_SIZE):
+    """Lista completa no formato de `user_followers` (dict pk -> UserShort)"""
+    users = {}
+    for page in iter_pages(cl, kind, user_id, page_size, pacer):
+        for user in page:
+            users[user.pk] = user
+    return users
+
+
+# =========================
+# 💾 BUFFER COM DESPEJO EM DISCO
+# =========================
+class IdSpool:
+    """Acumula IDs e despeja runs ordenados em disco ao passar do limite"""
+
+    def __init__(self, memory_limit=DEFAULT_MEMORY_LIMIT, with_names=False, tmp_dir=None):
+        self.memory_limit = memory_limit
+        self.with_names = with_names
+        self.tmp_dir = tmp_dir
+        self.added = 0
+        self._ids = array("q")
+        self._names = [] if with_names else None
+        self._buffer_bytes = 0
+        self._runs = []
+
+    def add(self, user_id, username=None):
+        """Adiciona um ID (e o username, se o spool guarda nomes)"""
+        self._ids.append(int(user_id))
+        self._buffer_bytes += self._ids.itemsize
+        if self._names is not None:
+            name = username or ""
+            self._names.append(name)
+            self._buffer_bytes += len(name) + _NAME_OVERHEAD
+        self.added += 1
+
+        if self._buffer_bytes >= self.memory_limit:
+            self._spill()
+
+    def add_page(self, users):
+        """Adiciona uma página de UserShort"""
+        for user in users:
+            self.add(user.pk, user.username if self.with_names else None)
+
+    @property
+    def spilled_runs(self):
+        return len(self._runs)
+
+    def _sorted_buffer(self):
+        if self._names is None:
+            return [(uid, None) for uid in sorted(self._ids)]
+        return sorted(zip(self._ids, self._names))
+
+    def _spill(self):
+        """Ordena o buffer atual e grava como um run em disco"""
+        if not self._ids:
+            return
+
+        fd, path = tempfile.mkstemp(prefix="idspool-", suffix=".run", dir=self.tmp_dir)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for uid, name in self._sorted_buffer():
+                if name is None:
+                    f.write(f"{uid}\n")
+                else:
+                    f.write(f"{uid}\t{name}\n")
+        self._runs.append(path)
+
+        self._ids = array("q")
+        self._names = [] if self.with_names else None
+        self._buffer_bytes = 0
+
+    @staticmethod
+    def _read_run(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                uid, sep, name = line.rstrip("\n").partition("\t")
+                yield int(uid), (name if sep else None)
+
+    def __iter__(self):
+        """Itera (id, username) em ordem crescente de ID, sem duplicatas"""
+        sources = [self._read_run(path) for path in self._runs]
+        sources.append(iter(self._sorted_buffer()))
+
+        last = None
+        for uid, name in heapq.merge(*sources, key=lambda item: item[0]):
+            if uid != last:
+                last = uid
+                yield uid, name
+
+    def close(self):
+        """Remove os runs temporários"""
+        for path in self._runs:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._runs = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# =========================
+# 🔀 DIFERENÇA POR MERGE
+# =========================
+def merge_difference(left, right):
+    """Itens de `left` cujo ID não aparece em `right` (ambos ordenados)"""
+    right = iter(right)
+    current = next(right, None)
+
+    for item in left:
+        while current is not None and current[0] < item[0]:
+            current = next(right, None)
+        if current is None or current[0] != item[0]:
+            yield item
+
+
+def collect_ids(cl, user_id, kind, memory_limit=DEFAULT_MEMORY_LIMIT,
+                page_size=DEFAULT_PAGE_SIZE, with_names=False, pacer=None):
+    """Baixa uma lista página por página para um IdSpool (com o `pacer`, ver `iter_pages`)"""
+    spool = IdSpool(memory_limit, with_names=with_names)
+    try:
+        for page in iter_pages(cl, kind, user_id, page_size, pacer):
+            spool.add_page(page)
+    except BaseException:
+        spool.close()
+        raise
+    return spool
+
+
+def _filtered_non_followers(followers, following, exclude):
+    candidates = merge_difference(following, followers)
+    while True:
+        batch = list(islice(candidates, EXCLUDE_BATCH))
+        if not batch:
+            break
+        excluded = exclude(uid for uid, _ in batch) if exclude is not None else ()
+        for uid, name in batch:
+            if excluded and str(uid) in excluded:
+                continue
+            # Os spools não guardam a posição na lista: rank desconhecido
+            yield UserRef(str(uid), name), None
+
+
+def take_non_followers(followers, following, limit=None, exclude=None, scorers=None,
+                       screen=None):
+    """
+    Retorna (os `limit` não-seguidores de maior prioridade, total encontrado).
+    `exclude(ids)` opcional recebe lotes de IDs e retorna o set (de str)
+    dos que devem ficar de fora, ex.: ``HistoryStore.filter_unfollowed``.
+    `scorers` vem de ``core.priority.parse_priority``; sem eles, a ordem é por ID.
+    `screen(candidates)` opcional transforma o fluxo de (usuário, posição)
+    antes da ordenação (ex.: tira contas protegidas, enriquece perfis).
+    """
+    candidates = _filtered_non_followers(followers, following, exclude)
+    if screen is not None:
+        candidates = screen(candidates)
+    return select_top(candidates, limit, scorers)
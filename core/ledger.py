@@ -0,0 +1,203 @@
+"""
+Registro de ações compartilhado entre processos, com janelas deslizantes.
+
+Os workflows e os scripts rodam em processos separados (às vezes ao
+mesmo tempo) contra a mesma conta, e cada ``RateLimiter`` só enxerga as
+próprias ações. ``RateLedger`` guarda cada ação com o horário num SQLite
+em modo WAL e aplica tetos por conta em três janelas deslizantes: último
+minuto, última hora e últimas 24 horas.
+
+A verificação não conta linhas do histórico: cada janela mantém
+contadores por balde (5 s no minuto, 1 min na hora, 15 min no dia), então
+consultar uma janela soma no máximo ~100 linhas, quantas ações houver.
+A janela inclui o balde mais antigo inteiro, o que erra só para o lado
+seguro. Verificar e registrar acontecem numa única transação
+``BEGIN IMMEDIATE``: dois processos não conseguem usar a mesma vaga.
+
+A ação é registrada ao ser liberada, antes da chamada ao Instagram (uma
+chamada que falha também conta para o Instagram). O histórico bruto
+(tabela ``actions``) fica guardado por ``RETENTION_DAYS`` dias.
+"""
+import atexit
+import sqlite3
+import time
+
+LEDGER_DB = "rate_ledger.db"
+RETENTION_DAYS = 30
+
+# Janela → (duração, largura do balde), em segundos
+WINDOWS = {
+    "minute": (60, 5),
+    "hour": (3600, 60),
+    "day": (86400, 900),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS actions (
+    account TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_actions_at ON actions(at);
+CREATE TABLE IF NOT EXISTS buckets (
+    account TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    width INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (account, kind, width, bucket)
+) WITHOUT ROWID;
+"""
+
+def _active_limits(limits):
+    """Só as janelas com teto; erro para nomes desconhecidos"""
+    active = {name: limit for name, limit in (limits or {}).items() if limit}
+    unknown = set(active) - set(WINDOWS)
+    if unknown:
+        raise ValueError(f"Janela desconhecida: {', '.join(sorted(unknown))}")
+    return active
+
+
+class RateLedger:
+    """
+    Ações de `account` (tipo `kind`) com tetos em `limits`
+    ({"minute": n, "hour": n, "day": n}; janela sem teto não é verificada).
+    """
+
+    def __init__(self, path=LEDGER_DB, account="", limits=None, kind="unfollow", clock=None,
+                 timeout=30):
+        self.path = path
+        self.account = account
+        self.kind = kind
+        self.limits = _active_limits(limits)
+        self._clock = clock or time.time
+        # Transações explícitas (autocommit fora delas); `timeout` espera o lock de outro processo
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self.prune()
+
+    def close(self):
+        self.conn.close()
+
+    def prune(self):
+        """Apaga baldes fora de todas as janelas e o histórico além da retenção"""
+        now = self._clock()
+        with self._transaction():
+            for span, width in WINDOWS.values():
+                self.conn.execute(
+                    "DELETE FROM buckets WHERE account = ? AND kind = ? AND width = ? "
+                    "AND bucket < ?",
+                    (self.account, self.kind, width, int(now // width) - span // width))
+            self.conn.execute("DELETE FROM actions WHERE at < ?",
+                              (now - RETENTION_DAYS * 86400,))
+
+    def _transaction(self):
+        return _Transaction(self.conn)
+
+    # =========================
+    # 🔎 JANELAS
+    # =========================
+    def _buckets(self, name, now):
+        span, width = WINDOWS[name]
+        first = int(now // width) - span // width
+        return self.conn.execute(
+            "SELECT bucket, count FROM buckets WHERE account = ? AND kind = ? AND width = ? "
+            "AND bucket >= ? ORDER BY bucket",
+            (self.account, self.kind, width, first)).fetchall()
+
+    def _wait(self, name, limit, now):
+        """Segundos até a janela ter uma vaga (0 se já tem)"""
+        rows = self._buckets(name, now)
+        excess = sum(count for _, count in rows) - limit + 1
+        if excess <= 0:
+            return 0.0
+        span, width = WINDOWS[name]
+        for bucket, count in rows:
+            excess -= count
+            if excess <= 0:
+                # O balde sai da janela quando o balde atual passa de bucket + span/width
+                return (bucket + span // width + 1) * width - now
+        return 0.0
+
+    def counts(self):
+        """Ações em cada janela: {"minute": n, "hour": n, "day": n}"""
+        now = self._clock()
+        return {name: sum(count for _, count in self._buckets(name, now)) for name in WINDOWS}
+
+    def time_until_available(self):
+        now = self._clock()
+        return max([self._wait(name, limit, now) for name, limit in self.limits.items()],
+                   default=0.0)
+
+    # =========================
+    # ✍️ REGISTRO
+    # =========================
+    def try_acquire(self):
+        """
+        Registra uma ação se todas as janelas têm vaga e retorna 0; senão
+        não registra e retorna os segundos até a próxima vaga
+        """
+        with self._transaction():
+            now = self._clock()
+            wait = max([self._wait(name, limit, now) for name, limit in self.limits.items()],
+                       default=0.0)
+            if wait > 0:
+                return wait
+            self.conn.execute("INSERT INTO actions (account, kind, at) VALUES (?, ?, ?)",
+                              (self.account, self.kind, now))
+            self.conn.executemany(
+                "INSERT INTO buckets (account, kind, width, bucket, count) VALUES (?, ?, ?, ?, 1) "
+                "ON CONFLICT(account, kind, width, bucket) DO UPDATE SET count = count + 1",
+                [(self.account, self.kind, width, int(now // width))
+                 for _, width in WINDOWS.values()])
+        return 0.0
+
+    def describe(self):
+        """Texto com o uso de cada janela, ex.: "3/10 no minuto, 40/200 na hora" """
+        labels = {"minute": "no minuto", "hour": "na hora", "day": "em 24 h"}
+        counts = self.counts()
+        return ", ".join(f"{counts[name]}/{self.limits[name]} {labels[name]}"
+                         for name in WINDOWS if name in self.limits)
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT (ROLLBACK em caso de erro)"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type is not None else "COMMIT")
+        return False
+
+
+_ledgers = {}
+
+
+def open_ledger(path, account, limits, kind="unfollow"):
+    """
+    ``RateLedger`` compartilhado por (arquivo, conta, tipo) no processo;
+    fechado no fim do processo, o que leva o WAL de volta para o arquivo
+    principal (importante para quem guarda o arquivo em cache)
+    """
+    key = (path, account, kind)
+    ledger = _ledgers.get(key)
+    if ledger is None:
+        if not _ledgers:
+            atexit.register(close_ledgers)
+        ledger = _ledgers[key] = RateLedger(path, account, limits, kind)
+    else:
+        ledger.limits = _active_limits(limits)
+    return ledger
+
+
+def close_ledgers():
+    for ledger in _ledgers.values():
+        ledger.close()
+    _ledgers.clear()
@@ -0,0 +1,258 @@
+"""
+Métricas da execução no formato texto do Prometheus.
+
+``instrument`` envolve as chamadas do cliente (login, listas e
+unfollow) e registra a latência de cada uma num histograma, além dos
+erros e das limitações. O pipeline soma as novas tentativas e o tempo
+de espera dos pacers (ritmo e pausas por limitação), então dá para
+comparar o tempo dormindo com o tempo de rede (``_sum`` do histograma).
+
+Exportação:
+
+- ``Metrics.write(path)``: arquivo ``.prom`` (ex.: para o textfile
+  collector do node_exporter), gravado de forma atômica;
+- ``Metrics.serve(port)``: endpoint HTTP local ``/metrics``, para o
+  modo agendado do ``Insta.py``.
+"""
+import functools
+import os
+import threading
+import time
+
+from core.pacing import is_throttle_error
+
+# Segundos; as chamadas de lista costumam ficar entre 0,5 e 5 s
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+INSTRUMENTED_METHODS = (
+    "login",
+    "account_info",
+    "user_followers",
+    "user_following",
+    "user_followers_v1_chunk",
+    "user_following_v1_chunk",
+    "user_info",
+    "user_medias",
+    "user_unfollow",
+)
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metrics:
+    """
+    Registro de contadores, gauges e histogramas (seguro entre threads).
+    `labels` são fixos e entram em todas as séries (ex.: a conta).
+    """
+
+    def __init__(self, labels=None, buckets=DEFAULT_BUCKETS):
+        self.labels = dict(labels or {})
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._kinds = {}
+        self._help = {}
+        self._values = {}
+        self._server = None
+
+    def _key(self, name, kind, help_text, labels):
+        known = self._kinds.setdefault(name, kind)
+        if known != kind:
+            raise ValueError(f"Métrica {name} já registrada como {known}")
+        if help_text:
+            self._help.setdefault(name, help_text)
+        return name, tuple(sorted({**self.labels, **labels}.items()))
+
+    def inc(self, name, value=1, help_text=None, **labels):
+        """Soma `value` ao contador"""
+        with self._lock:
+            key = self._key(name, COUNTER, help_text, labels)
+            self._values[key] = self._values.get(key, 0) + value
+
+    def set(self, name, value, help_text=None, kind=GAUGE, **labels):
+        """Define o valor; com kind=COUNTER, para totais acumulados em outro lugar"""
+        with self._lock:
+            key = self._key(name, kind, help_text, labels)
+            self._values[key] = value
+
+    def observe(self, name, value, help_text=None, **labels):
+        """Registra uma amostra no histograma"""
+        with self._lock:
+            key = self._key(name, HISTOGRAM, help_text, labels)
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = {"buckets": [0] * len(self.buckets),
+                                              "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def value(self, name, **labels):
+        """Valor atual da série (contagem, no caso de histograma); 0 se não existir"""
+        key = (name, tuple(sorted({**self.labels, **labels}.items())))
+        with self._lock:
+            value = self._values.get(key, 0)
+        return value["count"] if isinstance(value, dict) else value
+
+    # =========================
+    # 📤 EXPORTAÇÃO
+    # =========================
+    def render(self):
+        """Texto no formato de exposição do Prometheus"""
+        with self._lock:
+            by_name = {}
+            for (name, labels), value in self._values.items():
+                by_name.setdefault(name, []).append((labels, value))
+
+            lines = []
+            for name in sorted(by_name):
+                kind = self._kinds[name]
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in sorted(by_name[name]):
+                    if kind != HISTOGRAM:
+                        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                        continue
+                    for bound, count in zip(self.buckets + (float("inf"),),
+                                            value["buckets"] + [value["count"]]):
+                        bucket_labels = labels + (("le", _format_value(bound)),)
+                        lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value['sum'])}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Grava o texto em `path` (escrita atômica)"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+    def serve(self, port, host="127.0.0.1"):
+        """Sobe o endpoint /metrics numa thread em segundo plano; retorna o servidor"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        thread.start()
+        return self._server
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+# =========================
+# 🔌 INSTRUMENTAÇÃO
+# =========================
+def _timed(metrics, method, call):
+    @functools.wraps(call)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return call(*args, **kwargs)
+        except Exception as e:
+            metrics.inc("instagram_request_errors_total", help_text="Chamadas que falharam",
+                        method=method, error=type(e).__name__)
+            if is_throttle_error(e):
+                metrics.inc("instagram_throttles_total",
+                            help_text="Limitações do Instagram recebidas", method=method)
+            raise
+        finally:
+            metrics.observe("instagram_request_seconds", time.perf_counter() - started,
+                            help_text="Latência das chamadas ao Instagram", method=method)
+    return wrapper
+
+
+def record_http(metrics, timing):
+    """Registra um ``core.transport.RequestTiming`` (DNS, conexão, primeiro byte)"""
+    reused = "sim" if timing.reused else "nao"
+    metrics.inc("http_requests_total", help_text="Requisições HTTP por host e reuso de conexão",
+                host=timing.host, reused=reused)
+    if not timing.reused:
+        metrics.observe("http_dns_seconds", timing.dns, help_text="Resolução de DNS",
+                        host=timing.host)
+        metrics.observe("http_connect_seconds", timing.connect,
+                        help_text="Abertura de conexão (TCP e TLS)", host=timing.host)
+    if timing.error is None:
+        metrics.observe("http_ttfb_seconds", timing.ttfb,
+                        help_text="Tempo até o primeiro byte da resposta", host=timing.host)
+    if timing.retries:
+        metrics.inc("http_retries_total", timing.retries,
+                    help_text="Novas tentativas após falha de conexão", host=timing.host)
+
+
+def instrument(cl, metrics, methods=INSTRUMENTED_METHODS):
+    """
+    Envolve os métodos do cliente (na instância) para medir cada chamada;
+    com um transporte (``core.transport``), mede também cada requisição HTTP.
+    Os clones da busca paralela (``core.fetch.clone_client``) são medidos
+    do mesmo jeito (o transporte é o mesmo, já medido).
+    """
+    from core.fetch import on_clone
+
+    _time_methods(cl, metrics, methods)
+    transport = getattr(cl, "transport", None)
+    if transport is not None:
+        transport.observers.append(functools.partial(record_http, metrics))
+    return on_clone(cl, functools.partial(_time_methods, metrics=metrics, methods=methods))
+
+
+def _time_methods(cl, metrics, methods):
+    for method in methods:
+        call = getattr(cl, method, None)
+        if call is not None:
+            setattr(cl, method, _timed(metrics, method, call))
+
+
+def record_pacing(metrics, fetch_pacer, pacer):
+    """Exporta os totais de espera e de ritmo dos pacers"""
+    for kind, current in (("fetch", fetch_pacer), ("unfollow", pacer)):
+        metrics.set("unfollow_sleep_seconds_total", current.limiter.total_wait, kind=COUNTER,
+                    help_text="Tempo dormindo por tipo de espera", pacer=kind, reason="ritmo")
+        metrics.set("unfollow_sleep_seconds_total", current.backoff_total, kind=COUNTER,
+                    pacer=kind, reason="limitacao")
+        metrics.set("unfollow_pacing_rate_per_hour", current.rate,
+                    help_text="Ritmo atual (ações/hora)", pacer=kind)
@@ -0,0 +1,146 @@
+"""
+Orquestrador de várias contas.
+
+Lê um manifesto JSON e roda o pipeline de cada conta num processo
+separado (``ProcessPoolExecutor``), com um teto global de processos
+simultâneos. Cada conta usa o seu próprio arquivo de sessão e o seu
+próprio ritmo aprendido. No fim é gravado um relatório único.
+
+Exemplo de manifesto::
+
+    {
+      "max_workers": 4,
+      "defaults": {"max_unfollows": 50, "sleep_between_actions": 15},
+      "accounts": [
+        {"username": "conta1", "password_env": "IG_PASSWORD_CONTA1"},
+        {"username": "conta2", "password_env": "IG_PASSWORD_CONTA2"}
+      ]
+    }
+
+Uso::
+
+    python -m core.orchestrator accounts.json --workers 4 --report run_report.json
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from core.pipeline import account_settings, run_account
+from core.eventlog import configure_logging, logging_from_env
+from core.profiling import PhaseProfiler
+
+DEFAULT_WORKERS = 2
+REPORT_FILE = "run_report.json"
+
+logger = logging.getLogger(__name__)
+
+
+def load_manifest(path):
+    """Retorna (lista de contas completas, max_workers do manifesto)"""
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if isinstance(manifest, list):
+        manifest = {"accounts": manifest}
+
+    defaults = manifest.get("defaults", {})
+    accounts = [account_settings(spec, defaults) for spec in manifest.get("accounts", [])]
+
+    usernames = [account["username"] for account in accounts]
+    duplicated = {name for name in usernames if usernames.count(name) > 1}
+    if duplicated:
+        raise ValueError(f"Contas repetidas no manifesto: {', '.join(sorted(duplicated))}")
+
+    return accounts, manifest.get("max_workers")
+
+
+def _run_in_worker(account):
+    """Ponto de entrada de cada processo"""
+    # Cada conta grava os seus eventos no próprio diretório de estado
+    logging_from_env(os.path.join(account["state_dir"], "events.jsonl"),
+                     console_format="%(asctime)s - %(levelname)s - %(message)s",
+                     stream=sys.stderr)
+    # Com --profile, cada conta grava o seu perfil no próprio diretório de estado
+    profiler = None
+    if os.getenv("PROFILE") == "1":
+        profiler = PhaseProfiler(os.path.join(account["state_dir"], "profile_report.json"))
+        profiler.start()
+    try:
+        return run_account(account, profiler=profiler)
+    finally:
+        if profiler is not None:
+            profiler.finish()
+
+
+def run_all(accounts, max_workers=DEFAULT_WORKERS, worker=_run_in_worker):
+    """Roda todas as contas, no máximo `max_workers` ao mesmo tempo"""
+    started = time.monotonic()
+    reports = []
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(worker, account): account for account in accounts}
+        for future in as_completed(futures):
+            account = futures[future]
+            try:
+                report = future.result()
+            except Exception as e:
+                # Falha do próprio processo (ex.: erro ao importar o cliente)
+                report = {"account": account["username"], "status": "error",
+                          "error": f"{type(e).__name__}: {e}"}
+            reports.append(report)
+            logger.info(f"📋 [{report['account']}] {report['status']}: "
+                        f"{report.get('unfollowed', 0)} unfollows")
+
+    reports.sort(key=lambda report: report["account"])
+    return {
+        "finished_at": datetime.now().isoformat(),
+        "duration": round(time.monotonic() - started, 3),
+        "accounts": len(reports),
+        "succeeded": sum(1 for report in reports if report["status"] == "ok"),
+        "failed": sum(1 for report in reports if report["status"] != "ok"),
+        "unfollowed": sum(report.get("unfollowed", 0) for report in reports),
+        "throttles": sum(report.get("throttles", 0) for report in reports),
+        "reports": reports,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Unfollow em várias contas")
+    parser.add_argument("manifest", help="Arquivo JSON com as contas")
+    parser.add_argument("--workers", type=int, help="Processos simultâneos (teto global)")
+    parser.add_argument("--report", default=REPORT_FILE, help="Arquivo do relatório")
+    parser.add_argument("--client", help='Fábrica do cliente, ex.: "instagrapi:Client"')
+    parser.add_argument("--profile", action="store_true",
+                        help="Perfil por etapa em <state_dir>/profile_report.json")
+    args = parser.parse_args(argv)
+    if args.profile:
+        # Herdado pelos processos das contas
+        os.environ["PROFILE"] = "1"
+
+    configure_logging(console_format="%(asctime)s - %(levelname)s - %(message)s",
+                      stream=sys.stderr)
+
+    accounts, manifest_workers = load_manifest(args.manifest)
+    if args.client:
+        for account in accounts:
+            account["client"] = args.client
+
+    workers = args.workers or manifest_workers or DEFAULT_WORKERS
+    logger.info(f"🤖 {len(accounts)} contas, até {workers} ao mesmo tempo")
+    report = run_all(accounts, workers)
+
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    logger.info(f"✅ {report['succeeded']}/{report['accounts']} contas ok, "
+                f"{report['unfollowed']} unfollows. Relatório: {args.report}")
+    return 0 if report["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
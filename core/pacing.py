@@ -0,0 +1,150 @@
+"""
+Controle adaptativo de ritmo (AIMD) em cima do ``RateLimiter``.
+
+Enquanto as chamadas dão certo o ritmo sobe de forma aditiva; a cada
+sinal de limitação do Instagram (``PleaseWaitFewMinutes``,
+``FeedbackRequired`` ou um ``ClientError`` com "wait a few minutes") ele
+cai de forma multiplicativa e há uma pausa que dobra a cada limitação
+seguida. O ritmo aprendido é salvo por conta entre execuções, então cada
+conta se aproxima do que o Instagram realmente tolera em vez de alternar
+entre rápido demais e uma pausa fixa de 10–30 minutos.
+"""
+import json
+import math
+import os
+from datetime import datetime
+
+from core.ratelimit import RateLimiter
+
+PACING_FILE = "pacing_state.json"
+
+THROTTLE_ERRORS = {"PleaseWaitFewMinutes", "FeedbackRequired", "ClientThrottledError"}
+
+
+def is_throttle_error(exc):
+    """Reconhece os sinais de limitação sem importar o instagrapi"""
+    names = {cls.__name__ for cls in type(exc).__mro__}
+    if names & THROTTLE_ERRORS:
+        return True
+    return "ClientError" in names and "wait a few minutes" in str(exc).lower()
+
+
+class AdaptivePacer:
+    """
+    Ritmo em ações por hora, ajustado por AIMD.
+
+    - `increase`: ações/hora somadas a cada sucesso
+    - `decrease`: fator multiplicativo a cada limitação
+    - `base_backoff` / `max_backoff`: pausa após limitação (dobra a cada repetição)
+    """
+
+    def __init__(self, limiter, rate, min_rate, max_rate, increase=2.0, decrease=0.5,
+                 base_backoff=60, max_backoff=1800):
+        self.limiter = limiter
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.throttles = 0
+        self.backoff_total = 0.0
+        self.deadline = None  # core.deadline.Deadline: não dorme além do prazo
+        self._streak = 0
+        self.rate = None
+        self._set_rate(rate)
+
+    def _set_rate(self, rate):
+        self.rate = min(self.max_rate, max(self.min_rate, rate))
+        self.limiter.set_interval(3600 / self.rate)
+
+    @property
+    def interval(self):
+        return 3600 / self.rate
+
+    def wait(self, max_wait=None):
+        """Espera a vez da próxima chamada"""
+        if self.deadline is not None:
+            self.deadline.check(self.limiter.time_until_available())
+        return self.limiter.acquire(max_wait)
+
+    def reserve(self, max_wait=None):
+        """Como ``wait``, mas só reserva a vez e retorna a espera (ver ``RateLimiter.reserve``)"""
+        if self.deadline is not None:
+            self.deadline.check(self.limiter.time_until_available())
+        return self.limiter.reserve(max_wait)
+
+    def on_success(self):
+        self._streak = 0
+        self._set_rate(self.rate + self.increase)
+
+    def next_backoff(self):
+        """Pausa que a próxima limitação causaria"""
+        return min(self.max_backoff, self.base_backoff * 2 ** self._streak)
+
+    def on_throttle(self, sleep=True):
+        """
+        Reduz o ritmo e faz a pausa; retorna os segundos de pausa. Com
+        prazo, uma pausa que passaria dele levanta ``DeadlineReached``
+        (o ritmo já reduzido fica registrado).
+        """
+        backoff = self.next_backoff()
+        self._streak += 1
+        self.throttles += 1
+        self._set_rate(self.rate * self.decrease)
+        if sleep:
+            if self.deadline is not None:
+                self.deadline.check(backoff)
+            self.limiter.clock.sleep(backoff)
+            self.backoff_total += backoff
+        return backoff
+
+
+# =========================
+# 💾 ESTADO POR CONTA
+# =========================
+def _load_state(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_pacer(account, kind, interval, max_rate=None, min_rate=None, path=PACING_FILE,
+               limiter=None, **kwargs):
+    """
+    Cria um AdaptivePacer para `account`/`kind` ("unfollow", "fetch"...),
+    começando do ritmo salvo ou de `interval` segundos entre ações.
+    Intervalo zero (ou negativo) é ritmo sem teto: só as pausas por
+    limitação valem.
+    """
+    if interval <= 0:
+        limiter = limiter or RateLimiter(0)
+        return AdaptivePacer(limiter, math.inf, math.inf, math.inf, **kwargs)
+
+    base_rate = 3600 / interval
+    max_rate = max_rate or base_rate * 2
+    min_rate = min_rate or max(1.0, base_rate / 8)
+
+    saved = _load_state(path).get(account, {}).get(kind, {})
+    rate = saved.get("rate_per_hour") or base_rate
+
+    limiter = limiter or RateLimiter(interval)
+    return AdaptivePacer(limiter, rate, min_rate, max_rate, **kwargs)
+
+
+def save_pacer(pacer, account, kind, path=PACING_FILE):
+    """Grava o ritmo aprendido (escrita atômica)"""
+    state = _load_state(path)
+    state.setdefault(account, {})[kind] = {
+        "rate_per_hour": round(pacer.rate, 3) if math.isfinite(pacer.rate) else None,
+        "throttles": pacer.throttles,
+        "updated_at": datetime.now().isoformat(),
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
@@ -0,0 +1,814 @@
+"""
+Pipeline de uma conta: login, busca das listas, diferença e unfollows.
+
+É o motor único usado pelos quatro scripts e pelo orquestrador. Recebe a
+configuração da conta como dict (ver ``account_settings`` e
+``settings_from_env``) e não tem efeito colateral ao ser importado: nada
+de ``sys.exit``, handlers de log ou estado global. O cliente é criado
+por uma "fábrica" indicada como ``"modulo:Classe"`` (padrão
+``instagrapi:Client``) e só é importado em ``create_client``, então
+comandos offline (estatísticas, plano) não pagam o import do instagrapi.
+
+Etapas, que também podem ser chamadas separadamente:
+
+- ``create_client`` / ``login``
+- ``load_pacers``: ritmo adaptativo salvo da busca e dos unfollows
+- ``prepare_plan``: retoma o plano salvo ou busca as listas
+  (``fetch_targets``) e grava um novo
+- ``plan_offline``: grava um plano só com o último snapshot, sem acessar
+  o Instagram (revisão antes de executar)
+- ``execute_plan``: unfollows a partir do plano
+"""
+import importlib
+import logging
+import os
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from core.idstream import fetch_list, collect_ids, take_non_followers
+from core.idset import diff_ids, iter_ranked
+from core.pacing import load_pacer, save_pacer, is_throttle_error
+from core.priority import DEFAULT_PRIORITY, parse_priority, profile_fields, select_top
+from core.ratelimit import RateLimiter, BudgetExhausted
+from core.deadline import DeadlineReached, deadline_from_settings
+from core.eventlog import event
+from core.exclusion import load_exclusions
+from core.profiling import phase
+from core.workqueue import WorkQueue
+from core.session import SessionManager
+from core.timing import StartupTimer
+
+DEFAULT_CLIENT = "instagrapi:Client"
+
+logger = logging.getLogger(__name__)
+
+_DEFAULTS = {
+    "password": None,
+    "password_env": None,
+    "state_dir": None,
+    "session_file": None,
+    "session_ttl_hours": 6,
+    "pacing_file": None,
+    "queue_file": None,
+    "snapshot_file": None,
+    "archive": False,
+    "archive_dir": None,
+    "exclusions_file": None,
+    "enrich_fields": None,
+    "profile_cache_file": None,
+    "profile_cache_size": 50_000,
+    "profile_fetches": 100,
+    "max_unfollows": 50,
+    "plan_size": 500,
+    "priority": DEFAULT_PRIORITY,
+    "plan_max_age_hours": 24,
+    "max_attempts": 3,
+    "sleep_between_actions": 15,
+    "fetch_interval": 1,
+    "max_per_hour": None,
+    "max_wait": 900,
+    "ledger_file": None,
+    "ledger_per_minute": 10,
+    "ledger_per_hour": 150,
+    "ledger_per_day": 300,
+    "deadline_minutes": None,
+    "deadline_margin": None,
+    "incremental": False,
+    "streaming": False,
+    "concurrent": False,
+    "memory_limit_mb": 32,
+    "full_sync_days": 7,
+    "stop_after_known": 20,
+    "delay_range": None,
+    "user_agent": None,
+    "proxy": None,
+    "http_pool_size": 10,
+    "http_connect_timeout": 5.0,
+    "http_read_timeout": 30.0,
+    "http_retries": 2,
+    "metrics_file": None,
+    "record_file": None,
+    "replay_file": None,
+    "replay_speed": 1.0,
+    "client": DEFAULT_CLIENT,
+}
+
+# Variáveis de ambiente comuns a todos os scripts → (chave da configuração, conversão)
+_ENV_SETTINGS = {
+    "MAX_UNFOLLOWS": ("max_unfollows", int),
+    "SLEEP_BETWEEN_ACTIONS": ("sleep_between_actions", float),
+    "FETCH_INTERVAL": ("fetch_interval", float),
+    "PACING_MAX_PER_HOUR": ("max_per_hour", float),
+    "RATE_MAX_WAIT": ("max_wait", float),
+    "RATE_LEDGER_FILE": ("ledger_file", str),
+    "RATE_LEDGER_PER_MINUTE": ("ledger_per_minute", int),
+    "RATE_LEDGER_PER_HOUR": ("ledger_per_hour", int),
+    "RATE_LEDGER_PER_DAY": ("ledger_per_day", int),
+    "RUN_DEADLINE_MINUTES": ("deadline_minutes", float),
+    "RUN_DEADLINE_MARGIN_SECONDS": ("deadline_margin", float),
+    "STREAMING_MODE": ("streaming", lambda value: value == "1"),
+    "MEMORY_LIMIT_MB": ("memory_limit_mb", int),
+    "INCREMENTAL_MODE": ("incremental", lambda value: value == "1"),
+    "SNAPSHOT_FILE": ("snapshot_file", str),
+    "ARCHIVE_MODE": ("archive", lambda value: value == "1"),
+    "ARCHIVE_DIR": ("archive_dir", str),
+    "EXCLUSIONS_FILE": ("exclusions_file", str),
+    "ENRICH_FIELDS": ("enrich_fields", str),
+    "PROFILE_CACHE_FILE": ("profile_cache_file", str),
+    "PROFILE_CACHE_SIZE": ("profile_cache_size", int),
+    "PROFILE_FETCHES_PER_RUN": ("profile_fetches", int),
+    "FULL_SYNC_DAYS": ("full_sync_days", int),
+    "STOP_AFTER_KNOWN": ("stop_after_known", int),
+    "CONCURRENT_FETCH": ("concurrent", lambda value: value == "1"),
+    "PACING_FILE": ("pacing_file", str),
+    "QUEUE_FILE": ("queue_file", str),
+    "PLAN_SIZE": ("plan_size", int),
+    "PRIORITY": ("priority", str),
+    "PLAN_MAX_AGE_HOURS": ("plan_max_age_hours", float),
+    "MAX_RETRIES": ("max_attempts", int),
+    "SESSION_FILE": ("session_file", str),
+    "SESSION_TTL_HOURS": ("session_ttl_hours", float),
+    "METRICS_FILE": ("metrics_file", str),
+    "INSTAGRAM_CLIENT": ("client", str),
+    "INSTAGRAM_PROXY": ("proxy", str),
+    "HTTP_POOL_SIZE": ("http_pool_size", int),
+    "HTTP_CONNECT_TIMEOUT": ("http_connect_timeout", float),
+    "HTTP_READ_TIMEOUT": ("http_read_timeout", float),
+    "HTTP_RETRIES": ("http_retries", int),
+    "CASSETTE_RECORD": ("record_file", str),
+    "CASSETTE_REPLAY": ("replay_file", str),
+    "REPLAY_SPEED": ("replay_speed", float),
+}
+
+FetchResult = namedtuple("FetchResult",
+                         ["targets", "total", "followers", "following", "snapshot", "profiles"],
+                         defaults=(None,))
+Plan = namedtuple("Plan", ["queue", "snapshot", "resumed"])
+
+
+# =========================
+# ⚙️ CONFIGURAÇÃO
+# =========================
+def settings_from_env(environ=None):
+    """Lê só as variáveis definidas; o resto fica com os padrões"""
+    environ = os.environ if environ is None else environ
+    settings = {}
+    for name, (key, convert) in _ENV_SETTINGS.items():
+        value = environ.get(name)
+        if value not in (None, ""):
+            settings[key] = convert(value)
+    return settings
+
+
+def account_settings(spec, defaults=None):
+    """Completa a configuração de uma conta com os padrões"""
+    account = dict(_DEFAULTS)
+    account.update(defaults or {})
+    account.update(spec)
+    if not account.get("username"):
+        raise ValueError("Conta sem 'username' no manifesto")
+
+    if not account["password"] and account["password_env"]:
+        account["password"] = os.getenv(account["password_env"])
+
+    # Cada conta tem o seu diretório de estado (sessão, ritmo, plano, snapshot e arquivo);
+    # os scripts de uma conta só usam state_dir="." (arquivos na pasta atual)
+    state_dir = account["state_dir"] or os.path.join("state", account["username"])
+    account["state_dir"] = state_dir
+    for key, filename in (("session_file", "session.json"),
+                          ("pacing_file", "pacing_state.json"),
+                          ("ledger_file", "rate_ledger.db"),
+                          ("queue_file", "unfollow_queue.json"),
+                          ("snapshot_file", "follow_snapshot.json"),
+                          ("archive_dir", "snapshots"),
+                          ("exclusions_file", "exclusions.txt"),
+                          ("profile_cache_file", "profile_cache.db")):
+        account[key] = account[key] or os.path.join(state_dir, filename)
+    return account
+
+
+def load_factory(path):
+    """Resolve "modulo:atributo" para o callable que cria o cliente"""
+    module_name, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module_name), attr or "Client")
+
+
+def create_client(account, client_factory=None):
+    """
+    Cria o cliente (importando a biblioteca só agora) com as opções da
+    conta. Clientes com sessões HTTP (o ``instagrapi``) recebem o
+    transporte ajustado de ``core.transport`` (`http_pool_size` 0 desativa).
+    Com `replay_file`, o cliente é o cassete gravado; com `record_file`,
+    as chamadas são gravadas (ver ``core.cassette``).
+    """
+    if account["replay_file"]:
+        from core.cassette import replay_client
+        cl = replay_client(account["replay_file"], account["replay_speed"])
+        logger.info(f"📼 Reproduzindo {account['replay_file']} "
+                    f"({cl.player.remaining} chamadas, velocidade {account['replay_speed']}x).",
+                    extra=event("cassette", mode="replay", path=account["replay_file"]))
+    else:
+        factory = client_factory or load_factory(account["client"])
+        cl = factory()
+    if account["http_pool_size"] and hasattr(cl, "private"):
+        from core.transport import transport_from_settings
+        transport_from_settings(account).apply(cl)
+    if account["proxy"]:
+        cl.set_proxy(account["proxy"])
+    if account["delay_range"]:
+        cl.delay_range = list(account["delay_range"])
+    if account["user_agent"]:
+        cl.set_user_agent(account["user_agent"])
+    if account["record_file"]:
+        from core.cassette import record
+        record(cl, account["record_file"])
+        logger.info(f"📼 Gravando as chamadas em {account['record_file']}.",
+                    extra=event("cassette", mode="record", path=account["record_file"]))
+    return cl
+
+
+# =========================
+# 🔐 LOGIN
+# =========================
+def _session(cl, account):
+    return SessionManager(cl, account["username"], account["password"],
+                          account["session_file"], account["session_ttl_hours"])
+
+
+def login(cl, account, fallback_settings=None):
+    """Reaproveita a sessão salva da conta; retorna o modo usado (cache, verificada ou login)"""
+    os.makedirs(os.path.dirname(account["session_file"]) or ".", exist_ok=True)
+    return _session(cl, account).restore(fallback_settings)
+
+
+def save_session(cl, account):
+    """Grava a sessão atual mantendo o horário da última verificação"""
+    _session(cl, account).save()
+
+
+# =========================
+# 🚦 RITMO
+# =========================
+def create_deadline(account):
+    """Prazo da execução (`deadline_minutes`), contado a partir de agora; None sem prazo"""
+    return deadline_from_settings(account["deadline_minutes"], account["deadline_margin"])
+
+
+def open_ledger(account):
+    """
+    Registro de ações compartilhado entre os processos da conta (ver
+    ``core.ledger``); None se nenhuma janela tem teto
+    """
+    limits = {"minute": account["ledger_per_minute"], "hour": account["ledger_per_hour"],
+              "day": account["ledger_per_day"]}
+    if not any(limits.values()):
+        return None
+    from core.ledger import open_ledger as open_shared
+
+    os.makedirs(os.path.dirname(account["ledger_file"]) or ".", exist_ok=True)
+    ledger = open_shared(account["ledger_file"], account["username"], limits)
+    logger.info(f"📒 Ações registradas para @{account['username']}: {ledger.describe()}.",
+                extra=event("ledger", account=account["username"], **ledger.counts()))
+    return ledger
+
+
+def load_pacers(account, limiter=None, deadline=None):
+    """
+    Retorna (pacer da busca, pacer dos unfollows) com o ritmo salvo da
+    conta. Com `deadline`, nenhum dos dois dorme além do prazo. Os
+    unfollows também respeitam os tetos do registro entre processos
+    (`ledger_per_minute`, `ledger_per_hour`, `ledger_per_day`).
+    """
+    username = account["username"]
+    fetch_pacer = load_pacer(username, "fetch", account["fetch_interval"],
+                             path=account["pacing_file"])
+    limiter = limiter or RateLimiter(account["sleep_between_actions"], max_wait=account["max_wait"])
+    pacer = load_pacer(username, "unfollow", account["sleep_between_actions"],
+                       account["max_per_hour"], path=account["pacing_file"], limiter=limiter)
+    fetch_pacer.deadline = pacer.deadline = deadline
+    pacer.limiter.ledger = open_ledger(account)
+    return fetch_pacer, pacer
+
+
+def save_pacers(account, fetch_pacer, pacer):
+    os.makedirs(os.path.dirname(account["pacing_file"]) or ".", exist_ok=True)
+    save_pacer(fetch_pacer, account["username"], "fetch", account["pacing_file"])
+    save_pacer(pacer, account["username"], "unfollow", account["pacing_file"])
+
+
+# =========================
+# 📥 BUSCA E DIFERENÇA
+# =========================
+def archive_lists(account, followers, following, presorted=False):
+    """Guarda os IDs desta busca na partição do dia (ver ``core.archive``)"""
+    if not account["archive"]:
+        return
+    from core.archive import archive_lists as save_partition
+
+    try:
+        path = save_partition(account["archive_dir"], followers, following,
+                              presorted=presorted)
+    except OSError as e:
+        # O arquivo é só para análise: falhar aqui não impede os unfollows
+        logger.warning(f"⚠️ Não foi possível arquivar as listas: {e}")
+        return
+    logger.info(f"📦 Listas arquivadas em {path}")
+
+
+def snapshot_lists(account, user_id, followers, following):
+    """
+    Grava as listas completas (dicts da busca, mais recentes primeiro) no
+    snapshot da conta, base do planejamento offline (``plan_offline``)
+    """
+    from core.snapshot import FollowSnapshot
+
+    snapshot = FollowSnapshot(account["snapshot_file"])
+    snapshot.replace(user_id, followers.keys(),
+                     ((uid, user.username) for uid, user in following.items()))
+    try:
+        os.makedirs(os.path.dirname(account["snapshot_file"]) or ".", exist_ok=True)
+        snapshot.save()
+    except OSError as e:
+        logger.warning(f"⚠️ Não foi possível gravar o snapshot: {e}")
+        return None
+    return snapshot
+
+
+def open_profile_cache(account, scorers, offline=False):
+    """
+    (``ProfileCache``, campos) quando algum critério de prioridade ou
+    `enrich_fields` pede dados do perfil completo; senão (None, ()).
+    Com `offline`, o cache só responde com o que já tem.
+    """
+    fields = list(profile_fields(scorers))
+    if account["enrich_fields"]:
+        from core.profiles import parse_fields
+        fields += [field for field in parse_fields(account["enrich_fields"]) if field not in fields]
+    if not fields:
+        return None, ()
+
+    from core.profiles import ProfileCache
+
+    os.makedirs(os.path.dirname(account["profile_cache_file"]) or ".", exist_ok=True)
+    cache = ProfileCache(account["profile_cache_file"], account["profile_cache_size"],
+                         0 if offline else account["profile_fetches"])
+    return cache, tuple(fields)
+
+
+def fetch_targets(cl, account, fetch_pacer=None, history=None, profiler=None, snapshot=None):
+    """
+    Busca as listas no modo configurado (incremental, streaming, paralelo
+    ou página a página) e retorna um ``FetchResult`` com os `plan_size`
+    não-seguidores de maior prioridade (critérios em `priority`, ver
+    ``core.priority``). Com `history`, quem já foi deixado de seguir fica
+    de fora, assim como as contas protegidas por `exclusions_file` (ver
+    ``core.exclusion``). Critérios que usam dados do perfil recebem os
+    candidatos enriquecidos pelo cache de perfis (``core.profiles``).
+    Com `archive`, os IDs das listas vão para o arquivo diário. Com
+    `profiler`, busca e diferença são medidas como etapas separadas.
+    Com `snapshot` (``FollowSnapshot`` já carregado), nada é buscado: os
+    alvos saem dele e o cache de perfis não faz chamadas.
+    """
+    scorers = parse_priority(account["priority"])
+    protected = load_exclusions(account["exclusions_file"])
+    cache, fields = open_profile_cache(account, scorers, offline=snapshot is not None)
+
+    def screen(candidates):
+        # Protegidos saem antes, para não gastar consultas de perfil com eles
+        if protected is not None:
+            candidates = protected.filter(candidates)
+        if cache is not None:
+            from core.profiles import enrich
+            candidates = enrich(candidates, cache, cl, fields, fetch_pacer)
+        return candidates
+
+    try:
+        if snapshot is not None:
+            with phase(profiler, "diferença"):
+                targets, total = _snapshot_targets(snapshot, account["plan_size"], history,
+                                                   scorers, screen)
+            fetched = FetchResult(targets, total, len(snapshot.followers),
+                                  len(snapshot.following), snapshot)
+        else:
+            fetched = _fetch_targets(cl, account, fetch_pacer, history, profiler, scorers,
+                                     screen)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    if protected is not None and protected.skipped:
+        logger.info(f"🛡️ {protected.skipped} contas protegidas ficaram de fora.")
+    if cache is not None:
+        stats = dict(cache.stats)
+        logger.info(f"👤 Perfis: {stats['memo_hits'] + stats['hits']} do cache, "
+                    f"{stats['fetched']} buscados, {stats['skipped']} adiados.",
+                    extra=event("profiles", **stats))
+        fetched = fetched._replace(profiles=stats)
+    return fetched
+
+
+def _snapshot_targets(snapshot, limit, history, scorers, screen):
+    candidates = snapshot.ranked_non_followers()
+    if history is not None:
+        candidates = list(candidates)
+        excluded = history.filter_unfollowed(user.pk for user, _ in candidates)
+        candidates = (item for item in candidates if item[0].pk not in excluded)
+    return select_top(screen(candidates), limit, scorers)
+
+
+def _fetch_targets(cl, account, fetch_pacer, history, profiler, scorers, screen):
+    limit = account["plan_size"]
+    exclude = history.filter_unfollowed if history is not None else None
+
+    if account["incremental"]:
+        from core.snapshot import FollowSnapshot, refresh_snapshot
+
+        with phase(profiler, "listas"):
+            snapshot = FollowSnapshot.load(account["snapshot_file"])
+            logger.info("📥 Atualizando snapshot de seguidores/seguindo...")
+            result = refresh_snapshot(cl, snapshot, account["stop_after_known"],
+                                      account["full_sync_days"], pacer=fetch_pacer)
+        if result.full_sync:
+            logger.info(f"🔄 Resincronização completa: {result.new_followers} seguidores, "
+                        f"{result.new_following} seguindo ({result.pages} páginas).")
+        else:
+            logger.info(f"⚡ Atualização incremental: +{result.new_followers} seguidores, "
+                        f"+{result.new_following} seguindo ({result.pages} páginas).")
+        archive_lists(account, snapshot.followers, snapshot.following.keys())
+
+        with phase(profiler, "diferença"):
+            targets, total = _snapshot_targets(snapshot, limit, history, scorers, screen)
+        return FetchResult(targets, total, len(snapshot.followers),
+                           len(snapshot.following), snapshot)
+
+    if account["streaming"]:
+        # Cada lista pode usar metade do limite antes de despejar em disco
+        spool_limit = account["memory_limit_mb"] * 1024 * 1024 // 2
+        followers = following = None
+        try:
+            with phase(profiler, "listas"):
+                logger.info("📥 Obtendo lista de seguidores (streaming)...")
+                followers = collect_ids(cl, cl.user_id, "followers", spool_limit,
+                                        pacer=fetch_pacer)
+                logger.info(f"✅ {followers.added} seguidores encontrados.")
+
+                logger.info("📤 Obtendo lista de quem você segue (streaming)...")
+                following = collect_ids(cl, cl.user_id, "following", spool_limit,
+                                        with_names=True, pacer=fetch_pacer)
+                logger.info(f"✅ Você segue {following.added} contas.")
+            # Os spools já saem ordenados e sem repetição: a coluna vai em blocos
+            archive_lists(account, (uid for uid, _ in followers), (uid for uid, _ in following),
+                          presorted=True)
+
+            with phase(profiler, "diferença"):
+                targets, total = take_non_followers(followers, following, limit, exclude,
+                                                    scorers, screen)
+            return FetchResult(targets, total, followers.added, following.added, None)
+        finally:
+            for spool in (followers, following):
+                if spool is not None:
+                    spool.close()
+
+    with phase(profiler, "listas"):
+        if account["concurrent"]:
+            from core.fetch import fetch_both
+
+            logger.info("📥 Obtendo seguidores e seguindo em paralelo...")
+            followers, following = fetch_both(cl, pacer=fetch_pacer)
+        else:
+            logger.info("📥 Obtendo lista de seguidores...")
+            followers = fetch_list(cl, "followers", cl.user_id, fetch_pacer)
+            logger.info("📤 Obtendo lista de quem você segue...")
+            following = fetch_list(cl, "following", cl.user_id, fetch_pacer)
+    logger.info(f"✅ {len(followers)} seguidores; você segue {len(following)} contas.")
+    archive_lists(account, followers.keys(), following.keys())
+    snapshot = snapshot_lists(account, cl.user_id, followers, following)
+
+    with phase(profiler, "diferença"):
+        result = diff_ids(followers.keys(), following.keys(), exclude or ())
+        logger.info(f"🤝 {result.mutuals} mútuos, 👀 {result.fans} seguidores que você não segue.")
+        targets, total = select_top(screen(iter_ranked(result.candidates, following)), limit,
+                                    scorers)
+    return FetchResult(targets, total, len(followers), len(following), snapshot)
+
+
+def prepare_plan(cl, account, fetch_pacer=None, history=None, profiler=None):
+    """
+    Retoma o plano salvo (se fresco) ou busca as listas e grava um novo.
+    Retorna (``Plan``, ``FetchResult`` ou None quando o plano foi retomado).
+    """
+    queue = WorkQueue.load(account["queue_file"])
+    resumable = queue is not None and queue.is_resumable(account["username"],
+                                                         account["plan_max_age_hours"])
+    protected = load_exclusions(account["exclusions_file"]) if resumable else None
+    if protected is not None:
+        # A lista pode ter mudado depois que o plano foi gravado
+        removed = queue.discard(lambda item: protected.matches(item["user_id"], item["username"]))
+        if removed:
+            logger.info(f"🛡️ {removed} contas protegidas removidas do plano salvo.")
+            resumable = queue.remaining > 0
+    if resumable:
+        logger.info(f"♻️ Retomando plano salvo: {queue.remaining} contas pendentes.")
+        # Todos os modos (menos streaming) gravam o snapshot: quem sair do plano sai dele também
+        snapshot = None
+        if os.path.exists(account["snapshot_file"]):
+            from core.snapshot import FollowSnapshot
+            snapshot = FollowSnapshot.load(account["snapshot_file"])
+        return Plan(queue, snapshot, True), None
+
+    started = time.monotonic()
+    fetched = fetch_targets(cl, account, fetch_pacer, history, profiler)
+    logger.info(f"🔎 Encontradas {fetched.total} contas que não te seguem de volta.",
+                extra=event("fetch", followers=fetched.followers, following=fetched.following,
+                            non_followers=fetched.total, planned=len(fetched.targets),
+                            seconds=round(time.monotonic() - started, 2)))
+    with phase(profiler, "plano"):
+        os.makedirs(os.path.dirname(account["queue_file"]) or ".", exist_ok=True)
+        queue = WorkQueue.create(account["queue_file"], account["username"], fetched.targets,
+                                 account["max_attempts"])
+    return Plan(queue, fetched.snapshot, False), fetched
+
+
+def plan_offline(account, history=None, path=None, profiler=None):
+    """
+    Monta o plano só com o último snapshot salvo, sem nenhuma chamada ao
+    Instagram: mesma diferença, contas protegidas, histórico e prioridade
+    de uma execução normal. O plano vai para `path` (padrão: o
+    `queue_file`, retomado pela próxima execução) datado do snapshot, então
+    `plan_max_age_hours` conta a partir da busca que gerou as listas.
+    Retorna (``Plan``, ``FetchResult``).
+    """
+    from core.snapshot import FollowSnapshot
+
+    with phase(profiler, "listas"):
+        snapshot = FollowSnapshot.load(account["snapshot_file"])
+    if snapshot.is_empty:
+        raise ValueError(f"Nenhum snapshot em {account['snapshot_file']}: faça uma busca "
+                         f"antes (o modo streaming não grava o snapshot)")
+
+    started = time.monotonic()
+    fetched = fetch_targets(None, account, history=history, profiler=profiler, snapshot=snapshot)
+    age_hours = (datetime.now() - datetime.fromisoformat(snapshot.updated_at)).total_seconds() / 3600
+    logger.info(f"🗂️ Snapshot de {age_hours:.1f} h atrás: {fetched.total} contas não te seguem "
+                f"de volta.",
+                extra=event("dry_run", followers=fetched.followers, following=fetched.following,
+                            non_followers=fetched.total, planned=len(fetched.targets),
+                            snapshot_age_hours=round(age_hours, 2),
+                            seconds=round(time.monotonic() - started, 2)))
+    if age_hours > account["plan_max_age_hours"]:
+        logger.warning(f"⚠️ Snapshot mais antigo que {account['plan_max_age_hours']} h: a "
+                       f"próxima execução vai buscar as listas de novo em vez de usar este plano.")
+
+    path = path or account["queue_file"]
+    with phase(profiler, "plano"):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        queue = WorkQueue.create(path, account["username"], fetched.targets,
+                                 account["max_attempts"], created_at=snapshot.updated_at)
+    return Plan(queue, snapshot, False), fetched
+
+
+# =========================
+# 🚫 UNFOLLOWS
+# =========================
+def unfollow_users(cl, users, pacer, on_unfollow=None, queue=None, limit=None, timer=None,
+                   metrics=None):
+    """
+    Deixa de seguir `users` no ritmo do `pacer`.
+    Com `queue`, os alvos saem da fila (até `limit`) e cada resultado é
+    gravado nela; com `timer`, o tempo até a primeira ação é registrado;
+    com `metrics`, os resultados e as novas tentativas são contados.
+    Retorna (usuários deixados de seguir, erros).
+    """
+    if queue is not None:
+        work = [(queue.user(item), item) for item in queue.next_items(limit)]
+    else:
+        work = [(user, None) for user in users[:limit]]
+
+    unfollowed = []
+    errors = 0
+    for user, item in work:
+        try:
+            waited = pacer.wait()
+        except DeadlineReached as e:
+            logger.info(f"⏱️ Prazo da execução ({e}). Encerrando com o plano salvo.",
+                        extra=event("stop", reason="deadline", wait_s=round(e.wait_seconds, 1)))
+            break
+        except BudgetExhausted as e:
+            logger.info(f"📊 Limite de ritmo atingido ({e}). Encerrando.",
+                        extra=event("stop", reason="budget", wait_s=round(e.wait_seconds, 1)))
+            break
+
+        if timer is not None and not timer.finished:
+            logger.info(timer.finish())
+
+        started = time.perf_counter()
+        try:
+            cl.user_unfollow(user.pk)
+        except Exception as e:
+            latency_ms = round((time.perf_counter() - started) * 1000, 1)
+            result = "failed"
+            if item is not None:
+                queue.mark_failed(item, e)
+                result = item["status"]
+            fields = event("unfollow", user_id=str(user.pk), username=user.username,
+                           outcome=result, error=type(e).__name__, latency_ms=latency_ms,
+                           waited_s=round(waited, 2))
+
+            stop = None
+            if is_throttle_error(e):
+                logger.warning(f"⏳ Limitação do Instagram: {e}", extra=fields)
+                try:
+                    backoff = pacer.on_throttle()
+                except DeadlineReached as deadline_error:
+                    stop = deadline_error
+                else:
+                    logger.info(f"🕒 Pausa de {backoff / 60:.1f} min; ritmo: {pacer.rate:.0f}/h",
+                                extra=event("backoff", seconds=backoff,
+                                            rate_per_hour=round(pacer.rate, 1)))
+            else:
+                logger.error(f"⚠️ Erro ao deixar de seguir @{user.username}: {e}", extra=fields)
+            if metrics is not None:
+                metrics.inc("unfollow_actions_total", result=result)
+                if result == "retry":
+                    metrics.inc("unfollow_retries_total",
+                                help_text="Unfollows devolvidos à fila para nova tentativa")
+            errors += 1
+            if stop is not None:
+                logger.info(f"⏱️ A pausa passaria do prazo ({stop}). Encerrando com o plano salvo.",
+                            extra=event("stop", reason="deadline",
+                                        wait_s=round(stop.wait_seconds, 1)))
+                break
+            continue
+
+        latency_ms = round((time.perf_counter() - started) * 1000, 1)
+        if item is not None:
+            queue.mark_done(item)
+        if metrics is not None:
+            metrics.inc("unfollow_actions_total", help_text="Unfollows por resultado",
+                        result="done")
+        pacer.on_success()
+        unfollowed.append(user)
+        logger.info(f"❌ Deixou de seguir: @{user.username}",
+                    extra=event("unfollow", user_id=str(user.pk), username=user.username,
+                                outcome="done", latency_ms=latency_ms, waited_s=round(waited, 2)))
+        if on_unfollow is not None:
+            on_unfollow(user)
+
+    return unfollowed, errors
+
+
+def execute_plan(cl, plan, pacer, limit, timer=None, on_unfollow=None, metrics=None,
+                 profiler=None):
+    """
+    Executa o plano mantendo o snapshot (se houver) em dia; retorna
+    (deixados, erros). Se o pacer tem prazo, só agenda as ações que cabem
+    no tempo restante com o ritmo atual.
+    """
+    snapshot = plan.snapshot
+    deadline = pacer.deadline
+    if deadline is not None:
+        ready = 1 if pacer.limiter.time_until_available() <= 0 else 0
+        capacity = deadline.capacity(pacer.rate, ready)
+        logger.info(f"⏱️ Prazo: {max(deadline.available, 0) / 60:.1f} min úteis com "
+                    f"{pacer.rate:.0f}/h → até {capacity} ações.")
+        limit = min(limit, capacity)
+
+    def forget(user):
+        if snapshot is not None:
+            snapshot.remove_following([user.pk])
+        if on_unfollow is not None:
+            on_unfollow(user)
+
+    logger.info(f"🚀 Iniciando unfollow de até {min(limit, plan.queue.remaining)} contas "
+                f"(ritmo: {pacer.rate:.0f}/h)...")
+    try:
+        with phase(profiler, "unfollows"):
+            return unfollow_users(cl, None, pacer, forget, queue=plan.queue, limit=limit,
+                                  timer=timer, metrics=metrics)
+    finally:
+        if snapshot is not None:
+            snapshot.save()
+
+
+# =========================
+# 🎯 PIPELINE COMPLETO
+# =========================
+def run_account(account, client_factory=None, history=None, limiter=None, timer=None,
+                fallback_settings=None, on_unfollow=None, metrics=None, profiler=None):
+    """
+    Executa login → plano → unfollows para uma conta e retorna o
+    relatório. Erros viram ``status: "error"`` no relatório. Com
+    `metrics` (ou `metrics_file` na configuração), as chamadas ao
+    Instagram são medidas e o arquivo é gravado no fim; com `profiler`,
+    cada etapa entra no relatório do modo --profile.
+    """
+    started = time.monotonic()
+    startup = timer or StartupTimer()
+    username = account["username"]
+    if metrics is None and account["metrics_file"]:
+        from core.metrics import Metrics
+        metrics = Metrics({"account": username})
+    report = {
+        "account": username,
+        "status": "ok",
+        "followers": 0,
+        "following": 0,
+        "non_followers": 0,
+        "unfollowed": 0,
+        "errors": 0,
+        "throttles": 0,
+        "resumed": False,
+        "session": None,
+        "profiles": None,
+        "stopped": None,
+        "error": None,
+    }
+
+    fetch_pacer = pacer = None
+    try:
+        # Registro ou estado de ritmo ilegível vira erro no relatório, como o resto
+        fetch_pacer, pacer = load_pacers(account, limiter, create_deadline(account))
+        with phase(profiler, "login"):
+            cl = create_client(account, client_factory)
+            if metrics is not None:
+                from core.metrics import instrument
+                instrument(cl, metrics)
+            logger.info(f"🔐 [{username}] Efetuando login...")
+            login_started = time.perf_counter()
+            report["session"] = login(cl, account, fallback_settings)
+            logger.info(f"✅ [{username}] Sessão pronta ({report['session']}).",
+                        extra=event("login", account=username, mode=report["session"],
+                                    latency_ms=round((time.perf_counter() - login_started) * 1000, 1)))
+        startup.lap("sessão")
+
+        plan, fetched = prepare_plan(cl, account, fetch_pacer, history, profiler)
+        report["resumed"] = plan.resumed
+        if fetched is not None:
+            report["followers"] = fetched.followers
+            report["following"] = fetched.following
+            report["non_followers"] = fetched.total
+            report["profiles"] = fetched.profiles
+            if metrics is not None and fetched.profiles:
+                for result, count in fetched.profiles.items():
+                    metrics.inc("profile_cache_total", count,
+                                help_text="Consultas ao cache de perfis por resultado",
+                                result=result)
+        else:
+            report["non_followers"] = plan.queue.remaining
+        startup.lap("plano")
+
+        if plan.queue.remaining:
+            unfollowed, errors = execute_plan(cl, plan, pacer, account["max_unfollows"],
+                                              startup, on_unfollow, metrics, profiler)
+            report["unfollowed"] = len(unfollowed)
+            report["errors"] = errors
+        else:
+            logger.info(f"✅ [{username}] Nenhum unfollow necessário.")
+
+        save_session(cl, account)
+
+    except DeadlineReached as e:
+        # Parada limpa: o ritmo é salvo abaixo e a próxima execução continua dali
+        report["stopped"] = "prazo"
+        logger.info(f"⏱️ [{username}] Prazo da execução ({e}). Encerrando.")
+        save_session(cl, account)
+
+    except Exception as e:
+        report["status"] = "error"
+        report["error"] = f"{type(e).__name__}: {e}"
+        logger.error(f"❌ [{username}] {report['error']}")
+
+    finally:
+        if pacer is not None:
+            report["throttles"] = fetch_pacer.throttles + pacer.throttles
+            save_pacers(account, fetch_pacer, pacer)
+        report["startup"] = startup.as_dict()
+        report["duration"] = round(time.monotonic() - started, 3)
+        logger.info(f"📋 [{username}] Relatório: {report['status']}",
+                     extra=event("run", **{key: value for key, value in report.items()
+                                           if key != "startup"}))
+        if metrics is not None:
+            export_metrics(metrics, account, fetch_pacer, pacer, report["duration"],
+                           report["status"] == "ok")
+
+    return report
+
+
+def export_metrics(metrics, account, fetch_pacer, pacer, duration, ok):
+    """Registra o resumo da execução e grava o arquivo de métricas (se configurado)"""
+    from core.metrics import record_pacing
+
+    if pacer is not None:
+        record_pacing(metrics, fetch_pacer, pacer)
+    metrics.set("unfollow_run_duration_seconds", duration,
+                help_text="Duração da última execução")
+    metrics.set("unfollow_run_success", 1 if ok else 0,
+                help_text="1 se a última execução terminou sem erro")
+    metrics.set("unfollow_run_timestamp_seconds", round(time.time()),
+                help_text="Fim da última execução (epoch)")
+    if account["metrics_file"]:
+        try:
+            metrics.write(account["metrics_file"])
+        except OSError as e:
+            logger.warning(f"⚠️ Erro ao gravar métricas: {e}")
@@ -0,0 +1,141 @@
+"""
+Ordem de prioridade dos alvos de unfollow.
+
+Em vez de pegar os primeiros `limit` de uma lista em ordem arbitrária,
+cada não-seguidor recebe uma chave a partir de critérios ("scorers") e
+só os K melhores ficam num heap de tamanho K (``select_top``), sem
+montar a lista inteira.
+
+Os critérios usam apenas dados que já vieram na busca das listas:
+
+- ``oldest``: seguido há mais tempo primeiro (posição na lista
+  "seguindo", que o Instagram devolve do mais recente ao mais antigo);
+- ``private``: perfis privados primeiro;
+- ``unverified``: contas não verificadas primeiro;
+- ``inactive``: perfis sem foto e sem nome primeiro (sinal de conta
+  abandonada).
+
+Critérios com o atributo ``fields`` precisam de dados do perfil
+completo; o pipeline então enriquece os candidatos pelo cache de perfis
+(ver ``core.profiles``) antes de ordenar:
+
+- ``dormant``: há mais tempo sem postar primeiro (sem nenhum post antes
+  de todos).
+
+Vários critérios separados por vírgula são comparados em ordem
+(``"private,oldest"``). Um critério próprio pode ser indicado como
+``"modulo:funcao"``; a função recebe ``(user, rank)`` e retorna um
+número, maior = deixar de seguir antes. `rank` é a posição na lista
+"seguindo" (0 = seguido mais recentemente) ou None quando a ordem não é
+conhecida (modo streaming).
+"""
+import heapq
+import importlib
+import time
+
+DEFAULT_PRIORITY = "oldest"
+
+# Trecho da URL da foto padrão do Instagram (perfil sem foto)
+_DEFAULT_AVATAR = "44884218_345707102882519_2446069589734326272_n"
+
+
+def oldest_first(user, rank):
+    return rank if rank is not None else -1
+
+
+def private_first(user, rank):
+    return 1 if getattr(user, "is_private", False) else 0
+
+
+def unverified_first(user, rank):
+    return 0 if getattr(user, "is_verified", False) else 1
+
+
+def inactive_first(user, rank):
+    picture = str(getattr(user, "profile_pic_url", "") or "")
+    no_picture = not picture or _DEFAULT_AVATAR in picture
+    no_name = not getattr(user, "full_name", "")
+    return int(no_picture) + int(no_name)
+
+
+def dormant_first(user, rank):
+    if "last_post_at" not in getattr(user, "profile", {}):
+        return 0  # perfil ainda não buscado: sem opinião
+    last_post = user.last_post_at
+    return float("inf") if last_post is None else time.time() - last_post
+
+
+dormant_first.fields = ("last_post_at",)
+
+
+SCORERS = {
+    "oldest": oldest_first,
+    "private": private_first,
+    "unverified": unverified_first,
+    "inactive": inactive_first,
+    "dormant": dormant_first,
+}
+
+
+def parse_priority(spec):
+    """Converte "private,oldest" na lista de scorers; vazio = sem prioridade"""
+    scorers = []
+    for name in (spec or "").split(","):
+        name = name.strip()
+        if not name:
+            continue
+        if name in SCORERS:
+            scorers.append(SCORERS[name])
+        elif ":" in name:
+            module_name, _, attr = name.partition(":")
+            scorers.append(getattr(importlib.import_module(module_name), attr))
+        else:
+            raise ValueError(f"Critério de prioridade desconhecido: {name} "
+                             f"(use {', '.join(SCORERS)} ou modulo:funcao)")
+    return scorers
+
+
+def profile_fields(scorers):
+    """Campos de perfil pedidos pelos critérios (atributo ``fields``)"""
+    fields = []
+    for score in scorers:
+        fields.extend(field for field in getattr(score, "fields", ()) if field not in fields)
+    return tuple(fields)
+
+
+def select_top(candidates, limit, scorers):
+    """
+    Recebe (user, rank) e retorna (os `limit` de maior prioridade, total).
+    Mantém no máximo `limit` itens em memória; empates ficam na ordem de
+    chegada. Sem `scorers`, só corta nos primeiros `limit`.
+    """
+    total = 0
+    if limit is not None and limit <= 0:
+        return [], sum(1 for _ in candidates)
+    if not scorers:
+        selected = []
+        for user, _ in candidates:
+            total += 1
+            if limit is None or len(selected) < limit:
+                selected.append(user)
+        return selected, total
+
+    if len(scorers) == 1:
+        score = scorers[0]
+
+        def key(item):
+            nonlocal total
+            total += 1
+            return score(*item)
+    else:
+        def key(item):
+            nonlocal total
+            total += 1
+            return tuple(score(*item) for score in scorers)
+
+    # nlargest/sorted são estáveis: empates mantêm a ordem de chegada
+    if limit is None:
+        top = sorted(candidates, key=key, reverse=True)
+    else:
+        top = heapq.nlargest(limit, candidates, key=key)
+    return [user for user, _ in top], total
@@ -0,0 +1,257 @@
+"""
+Cache em disco de perfis completos para enriquecer os candidatos.
+
+As listas trazem só ``UserShort`` (pk, username, nome, foto). Critérios
+mais espertos precisam de dados do perfil — número de seguidores, data
+do último post, conta verificada ou comercial — e buscar ``user_info``
+de cada candidato a cada execução gastaria o orçamento de requisições.
+
+``ProfileCache`` guarda esses campos num SQLite, cada um com a sua
+validade (``FIELDS``): contadores vencem em um dia, a data do último
+post em dois e as marcas da conta (verificada, comercial) em trinta. As
+consultas são em lote (um ``SELECT ... IN`` por lote de candidatos) e só
+os campos vencidos ou ausentes vão ao Instagram, até `max_fetches`
+chamadas por execução; o resto usa o valor antigo (ou fica sem o campo)
+e é atualizado nas próximas execuções. Um memo em memória evita repetir
+a consulta ao disco na mesma execução.
+
+Cada perfil guarda quando foi usado pela última vez: acima de
+`max_entries` perfis, os usados há mais tempo são apagados (LRU).
+
+Os contadores de acerto/falha ficam em ``ProfileCache.stats`` e vão para
+o log da execução (evento ``profiles``).
+"""
+import json
+import logging
+import sqlite3
+import time
+from itertools import islice
+
+from core.pacing import is_throttle_error
+
+PROFILE_CACHE_DB = "profile_cache.db"
+DEFAULT_MAX_ENTRIES = 50_000
+DEFAULT_MAX_FETCHES = 100
+LOOKUP_BATCH = 500
+
+# Limite de parâmetros por consulta "IN (...)" (o SQLite aceita 999 por padrão)
+_QUERY_CHUNK = 500
+
+_HOUR = 3600
+_DAY = 24 * _HOUR
+
+# Campo → (chamada que o traz, validade em segundos)
+FIELDS = {
+    "follower_count": ("info", _DAY),
+    "following_count": ("info", _DAY),
+    "media_count": ("info", _DAY),
+    "is_private": ("info", 7 * _DAY),
+    "is_verified": ("info", 30 * _DAY),
+    "is_business": ("info", 30 * _DAY),
+    "last_post_at": ("medias", 2 * _DAY),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    user_id TEXT PRIMARY KEY,
+    fields TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_profiles_last_used ON profiles(last_used);
+"""
+
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# 🌐 CHAMADAS AO INSTAGRAM
+# =========================
+def _fetch_info(cl, user_id):
+    info = cl.user_info(user_id)
+    return {field: getattr(info, field, None)
+            for field, (source, _) in FIELDS.items() if source == "info"}
+
+
+def _fetch_medias(cl, user_id):
+    medias = cl.user_medias(user_id, amount=1)
+    taken_at = getattr(medias[0], "taken_at", None) if medias else None
+    return {"last_post_at": taken_at.timestamp() if taken_at is not None else None}
+
+
+_SOURCES = {"info": _fetch_info, "medias": _fetch_medias}
+
+
+def parse_fields(spec):
+    """Converte "follower_count,last_post_at" na tupla de campos"""
+    fields = tuple(name.strip() for name in (spec or "").split(",") if name.strip())
+    unknown = [name for name in fields if name not in FIELDS]
+    if unknown:
+        raise ValueError(f"Campo de perfil desconhecido: {', '.join(unknown)} "
+                         f"(use {', '.join(FIELDS)})")
+    return fields
+
+
+# =========================
+# 💾 CACHE
+# =========================
+class ProfileCache:
+    """Campos de perfil com validade por campo, LRU em disco e memo da execução"""
+
+    def __init__(self, path=PROFILE_CACHE_DB, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_fetches=DEFAULT_MAX_FETCHES, clock=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.budget = max_fetches
+        self._clock = clock or time.time
+        self._memo = {}
+        self.stats = dict.fromkeys(
+            ("memo_hits", "hits", "misses", "stale", "fetched", "skipped", "errors", "evicted"), 0)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def _read(self, user_ids):
+        """{user_id: {campo: [valor, obtido_em]}} para os IDs guardados"""
+        stored = {}
+        for start in range(0, len(user_ids), _QUERY_CHUNK):
+            chunk = user_ids[start:start + _QUERY_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT user_id, fields FROM profiles WHERE user_id IN ({placeholders})", chunk)
+            stored.update((user_id, json.loads(fields)) for user_id, fields in rows)
+        return stored
+
+    def _fetch(self, cl, user_id, missing, entry, now, pacer):
+        """Busca os campos vencidos; False se a execução deve parar de buscar"""
+        for source in {FIELDS[field][0] for field in missing}:
+            if self.budget <= 0:
+                self.stats["skipped"] += 1
+                return True
+            self.budget -= 1
+            if pacer is not None:
+                pacer.wait()
+            try:
+                values = _SOURCES[source](cl, user_id)
+            except Exception as e:
+                self.stats["errors"] += 1
+                if is_throttle_error(e):
+                    logger.warning(f"⏳ Limitação ao buscar perfis; usando o cache: {e}")
+                    self.budget = 0
+                    return False
+                logger.debug(f"Perfil {user_id} indisponível: {e}")
+                continue
+            if pacer is not None:
+                pacer.on_success()
+            self.stats["fetched"] += 1
+            for field, value in values.items():
+                entry[field] = [value, now]
+        return True
+
+    def lookup(self, cl, user_ids, fields=None, pacer=None):
+        """
+        {user_id: {campo: valor}} para `user_ids` (str), buscando no
+        Instagram (com o ritmo do `pacer`) só os campos vencidos, dentro
+        do orçamento da execução.
+        """
+        fields = tuple(fields or FIELDS)
+        now = self._clock()
+        result = {}
+        pending = []
+        for user_id in dict.fromkeys(user_ids):
+            memo = self._memo.get(user_id)
+            if memo is not None and all(field in memo for field in fields):
+                self.stats["memo_hits"] += 1
+                result[user_id] = memo
+            else:
+                pending.append(user_id)
+
+        stored = self._read(pending)
+        changed = {}
+        fetching = True
+        for user_id in pending:
+            entry = stored.get(user_id, {})
+            missing = [field for field in fields
+                       if field not in entry or now - entry[field][1] > FIELDS[field][1]]
+            if not missing:
+                self.stats["hits"] += 1
+            else:
+                self.stats["misses"] += 1
+                if entry:
+                    self.stats["stale"] += 1
+                if fetching and self.budget > 0:
+                    fetching = self._fetch(cl, user_id, missing, entry, now, pacer)
+                    changed[user_id] = entry
+                else:
+                    self.stats["skipped"] += 1
+            values = {field: value for field, (value, _) in entry.items()}
+            self._memo[user_id] = values
+            result[user_id] = values
+
+        self._store(pending, changed, stored, now)
+        return result
+
+    def _store(self, used, changed, stored, now):
+        """Grava os perfis buscados e a data de uso, numa transação, e aplica o LRU"""
+        if not used:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO profiles (user_id, fields, last_used) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET fields = excluded.fields, "
+                "last_used = excluded.last_used",
+                [(user_id, json.dumps(entry), now) for user_id, entry in changed.items()
+                 if entry],
+            )
+            self.conn.executemany(
+                "UPDATE profiles SET last_used = ? WHERE user_id = ?",
+                [(now, user_id) for user_id in used
+                 if user_id in stored and user_id not in changed],
+            )
+            self._evict()
+
+    def _evict(self):
+        count = self.conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self.conn.execute(
+                "DELETE FROM profiles WHERE user_id IN "
+                "(SELECT user_id FROM profiles ORDER BY last_used LIMIT ?)", (excess,))
+            self.stats["evicted"] += excess
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+
+# =========================
+# ✨ ENRIQUECIMENTO
+# =========================
+class ProfiledUser:
+    """Usuário da lista com os campos do perfil como atributos extras"""
+
+    def __init__(self, user, profile):
+        self.user = user
+        self.profile = profile
+
+    def __getattr__(self, name):
+        profile = self.__dict__.get("profile") or {}
+        if name in profile:
+            return profile[name]
+        return getattr(self.__dict__["user"], name)
+
+    def __repr__(self):
+        return f"ProfiledUser({self.user!r}, {self.profile!r})"
+
+
+def enrich(candidates, cache, cl, fields=None, pacer=None, batch=LOOKUP_BATCH):
+    """Acrescenta os campos de perfil a (usuário, posição), consultando em lotes"""
+    candidates = iter(candidates)
+    while True:
+        chunk = list(islice(candidates, batch))
+        if not chunk:
+            break
+        profiles = cache.lookup(cl, [str(user.pk) for user, _ in chunk], fields, pacer)
+        for user, rank in chunk:
+            yield ProfiledUser(user, profiles.get(str(user.pk), {})), rank
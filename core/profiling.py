@@ -0,0 +1,160 @@
+"""
+Modo de perfil (``--profile`` ou ``PROFILE=1``) por etapa da execução.
+
+Cada etapa (login, listas, diferença, plano, unfollows, histórico) é
+envolvida por ``PhaseProfiler.phase`` e recebe:
+
+- tempo real e tempo de CPU;
+- as funções mais caras segundo o ``cProfile`` (tempo acumulado);
+- pico de memória do ``tracemalloc`` e os locais que mais alocaram.
+
+O relatório JSON vai para ``PROFILE_FILE`` ou para o padrão de cada
+script (ao lado do log). Para perfis reproduzíveis, rode contra o
+cliente falso: ``INSTAGRAM_CLIENT=benchmarks.fake_instagram:Client`` ou
+``python -m benchmarks --profile perfis/``.
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+PROFILE_FILE = "profile_report.json"
+TOP_ENTRIES = 15
+
+
+def profiling_requested(argv=None, environ=None):
+    argv = sys.argv[1:] if argv is None else argv
+    environ = os.environ if environ is None else environ
+    return "--profile" in argv or environ.get("PROFILE") == "1"
+
+
+def start_profiler(default_path=PROFILE_FILE, argv=None, environ=None):
+    """PhaseProfiler já iniciado se o perfil foi pedido; senão None"""
+    if not profiling_requested(argv, environ):
+        return None
+    environ = os.environ if environ is None else environ
+    profiler = PhaseProfiler(environ.get("PROFILE_FILE") or default_path)
+    profiler.start()
+    return profiler
+
+
+def phase(profiler, name):
+    """Etapa medida quando há `profiler`; sem ele, não faz nada"""
+    return profiler.phase(name) if profiler is not None else nullcontext()
+
+
+class PhaseProfiler:
+    """Mede cada etapa em separado; etapas aninhadas contam na etapa de fora"""
+
+    def __init__(self, path=PROFILE_FILE, cpu_profile=True, trace_memory=True, top=TOP_ENTRIES):
+        self.path = path
+        self.cpu_profile = cpu_profile
+        self.trace_memory = trace_memory
+        self.top = top
+        self.phases = []
+        self._active = None
+        self._owns_tracing = False
+        self._started = None
+
+    def start(self):
+        self._started = (time.perf_counter(), time.process_time())
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracing = True
+
+    @contextmanager
+    def phase(self, name):
+        if self._active is not None:
+            yield
+            return
+
+        self._active = name
+        tracing = tracemalloc.is_tracing()
+        before = tracemalloc.take_snapshot() if tracing else None
+        if tracing:
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+        profile = None
+        if self.cpu_profile:
+            import cProfile
+            profile = cProfile.Profile()
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            entry = {
+                "phase": name,
+                "wall_seconds": round(time.perf_counter() - wall_started, 4),
+                "cpu_seconds": round(time.process_time() - cpu_started, 4),
+            }
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                entry["memory_delta_mb"] = round((current - start_memory) / 1024 / 1024, 3)
+                entry["peak_memory_mb"] = round(peak / 1024 / 1024, 3)
+                entry["top_allocations"] = self._top_allocations(before)
+            if profile is not None:
+                entry["top_functions"] = self._top_functions(profile)
+            self.phases.append(entry)
+            self._active = None
+
+    def _top_functions(self, profile):
+        import pstats
+
+        stats = pstats.Stats(profile).stats
+        rows = sorted(stats.items(), key=lambda row: row[1][3], reverse=True)[:self.top]
+        return [
+            {
+                "function": f"{filename}:{line}({func})",
+                "calls": calls,
+                "own_seconds": round(own, 5),
+                "cumulative_seconds": round(cumulative, 5),
+            }
+            for (filename, line, func), (_, calls, own, cumulative, _) in rows
+        ]
+
+    def _top_allocations(self, before):
+        after = tracemalloc.take_snapshot()
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        diffs = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+        return [
+            {
+                "site": f"{diff.traceback[0].filename}:{diff.traceback[0].lineno}",
+                "size_kb": round(diff.size_diff / 1024, 1),
+                "count": diff.count_diff,
+            }
+            for diff in diffs[:self.top]
+            if diff.size_diff > 0
+        ]
+
+    def report(self):
+        report = {"created_at": datetime.now().isoformat(), "phases": self.phases}
+        if self._started is not None:
+            report["total_wall_seconds"] = round(time.perf_counter() - self._started[0], 4)
+            report["total_cpu_seconds"] = round(time.process_time() - self._started[1], 4)
+        return report
+
+    def finish(self):
+        """Para o tracemalloc e grava o relatório; retorna o caminho"""
+        path = self.save()
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+        return path
+
+    def save(self):
+        """Grava o relatório até aqui (escrita atômica) sem parar a coleta"""
+        report = self.report()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+        return self.path
@@ -0,0 +1,240 @@
+"""
+Limitador de ritmo com semântica de token bucket.
+
+Substitui o ``time.sleep(SLEEP_BETWEEN_ACTIONS)`` depois de cada ação:
+a espera acontece *antes* da ação e só quando necessária, então não há
+sono depois do último unfollow nem depois de erros. Vários buckets são
+combinados (ritmo base com burst, teto por hora e teto por dia) e um
+jitter opcional é somado a cada espera. Com um ``ledger``
+(``core.ledger.RateLedger``), cada ação também precisa de vaga no
+registro compartilhado com os outros processos da conta.
+
+O relógio é injetável: ``FakeClock`` avança o tempo sem dormir de
+verdade, para simulações e benchmarks.
+"""
+import math
+import os
+import random
+import time
+
+
+class BudgetExhausted(Exception):
+    """A próxima ação só seria liberada depois do tempo máximo de espera"""
+
+    def __init__(self, wait_seconds):
+        super().__init__(f"próxima ação liberada em {wait_seconds:.0f}s")
+        self.wait_seconds = wait_seconds
+
+
+# =========================
+# ⏱️ RELÓGIOS
+# =========================
+class MonotonicClock:
+    """Relógio real"""
+
+    def now(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class FakeClock:
+    """Relógio simulado: `sleep` só avança o tempo"""
+
+    def __init__(self, start=0.0):
+        self._now = start
+        self.slept = 0.0
+
+    def now(self):
+        return self._now
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            self._now += seconds
+            self.slept += seconds
+
+    def advance(self, seconds):
+        self._now += seconds
+
+
+# =========================
+# 🪣 TOKEN BUCKET
+# =========================
+class TokenBucket:
+    """`capacity` fichas, repostas a `rate` fichas por segundo"""
+
+    def __init__(self, rate, capacity, clock):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._clock = clock
+        self._last = clock.now()
+
+    def _refill(self):
+        now = self._clock.now()
+        elapsed = now - self._last
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self._last = now
+
+    def time_until_available(self, amount=1):
+        self._refill()
+        missing = amount - self.tokens
+        if missing <= 0:
+            return 0.0
+        if self.rate <= 0:
+            return math.inf
+        return missing / self.rate
+
+    def consume(self, amount=1):
+        self._refill()
+        self.tokens -= amount
+
+
+# =========================
+# 🎲 JITTER
+# =========================
+def _jitter_uniform(scale, rng):
+    return rng.uniform(0, scale)
+
+
+def _jitter_gauss(scale, rng):
+    # Meia-normal com ~95% dos valores abaixo de `scale`
+    return min(abs(rng.gauss(0, scale / 2)), scale * 2)
+
+
+def _jitter_exponential(scale, rng):
+    return min(rng.expovariate(1 / scale), scale * 4)
+
+
+JITTER_DISTRIBUTIONS = {
+    "uniform": _jitter_uniform,
+    "gauss": _jitter_gauss,
+    "exponential": _jitter_exponential,
+}
+
+
+# =========================
+# 🚦 LIMITADOR
+# =========================
+class RateLimiter:
+    """
+    Libera ações respeitando todos os buckets configurados.
+
+    - `interval`: segundos entre ações no ritmo base
+    - `burst`: quantas ações podem sair seguidas antes do ritmo base valer
+    - `per_hour` / `per_day`: tetos (None = sem teto)
+    - `jitter`: escala do atraso aleatório somado a cada espera
+    - `max_wait`: espera máxima padrão de `acquire` (None = sem limite)
+    - `ledger`: registro entre processos (``core.ledger``), atribuído depois
+    """
+
+    def __init__(self, interval, burst=1, per_hour=None, per_day=None, jitter=0.0,
+                 distribution="uniform", max_wait=None, clock=None, rng=None):
+        if distribution not in JITTER_DISTRIBUTIONS:
+            raise ValueError(f"Distribuição de jitter desconhecida: {distribution}")
+
+        self.clock = clock or MonotonicClock()
+        self.jitter = jitter
+        self.max_wait = max_wait
+        self._jitter_fn = JITTER_DISTRIBUTIONS[distribution]
+        self._rng = rng or random.Random()
+        self.total_wait = 0.0
+        self.acquired = 0
+        self.ledger = None
+
+        self.base = TokenBucket(1 / interval if interval > 0 else math.inf, burst, self.clock)
+        self.buckets = [self.base]
+        if per_hour:
+            self.buckets.append(TokenBucket(per_hour / 3600, per_hour, self.clock))
+        if per_day:
+            self.buckets.append(TokenBucket(per_day / 86400, per_day, self.clock))
+
+    def set_interval(self, interval):
+        """Muda o ritmo base (usado pelo controle adaptativo)"""
+        self.base.time_until_available()  # repõe as fichas com o ritmo antigo
+        self.base.rate = 1 / interval if interval > 0 else math.inf
+
+    def time_until_available(self):
+        wait = max(bucket.time_until_available() for bucket in self.buckets)
+        if self.ledger is not None:
+            wait = max(wait, self.ledger.time_until_available())
+        return wait
+
+    def try_acquire(self):
+        """Consome uma ficha se houver; nunca dorme"""
+        if self.time_until_available() > 0:
+            return False
+        if self.ledger is not None and self.ledger.try_acquire() > 0:
+            return False
+        self._consume()
+        return True
+
+    def _next_wait(self, max_wait):
+        if max_wait is None:
+            max_wait = self.max_wait
+        wait = self.time_until_available()
+        if wait > 0 and self.jitter > 0:
+            wait += self._jitter_fn(self.jitter, self._rng)
+        if max_wait is not None and wait > max_wait:
+            raise BudgetExhausted(wait)
+        return wait, max_wait
+
+    def acquire(self, max_wait=None):
+        """Espera até a próxima ação ser liberada; retorna os segundos esperados"""
+        wait, max_wait = self._next_wait(max_wait)
+
+        self.clock.sleep(wait)
+        self.total_wait += wait
+        if self.ledger is not None:
+            # Outro processo pode ter usado a vaga durante a espera
+            while True:
+                extra = self.ledger.try_acquire()
+                if extra <= 0:
+                    break
+                if max_wait is not None and wait + extra > max_wait:
+                    raise BudgetExhausted(wait + extra)
+                self.clock.sleep(extra)
+                self.total_wait += extra
+                wait += extra
+        self._consume()
+        return wait
+
+    def reserve(self, max_wait=None):
+        """
+        Como ``acquire``, mas sem dormir: consome a vez agora e retorna os
+        segundos que quem chamou deve esperar antes da ação (a próxima
+        reserva já espera depois desta). Só sem ``ledger``, que registra a
+        ação na hora em que ela é liberada.
+        """
+        if self.ledger is not None:
+            raise ValueError("reserve não funciona com ledger; use acquire")
+        wait, _ = self._next_wait(max_wait)
+        self.total_wait += wait
+        self._consume()
+        return wait
+
+    def _consume(self):
+        for bucket in self.buckets:
+            bucket.consume()
+        self.acquired += 1
+
+
+def limiter_from_env(interval, environ=None):
+    """
+    Monta um RateLimiter a partir das variáveis de ambiente:
+    RATE_BURST, RATE_MAX_PER_HOUR, RATE_MAX_PER_DAY, RATE_JITTER,
+    RATE_JITTER_DISTRIBUTION e RATE_MAX_WAIT (segundos).
+    """
+    environ = os.environ if environ is None else environ
+    return RateLimiter(
+        interval,
+        burst=int(environ.get("RATE_BURST", 1)),
+        per_hour=int(environ.get("RATE_MAX_PER_HOUR", 0)) or None,
+        per_day=int(environ.get("RATE_MAX_PER_DAY", 0)) or None,
+        jitter=float(environ.get("RATE_JITTER", 0)),
+        distribution=environ.get("RATE_JITTER_DISTRIBUTION", "uniform"),
+        max_wait=float(environ.get("RATE_MAX_WAIT", 900)),
+    )
@@ -0,0 +1,204 @@
+"""
+Restauração rápida de sessão.
+
+A sessão do instagrapi é gravada em disco junto com o horário da última
+verificação (``last_verified_at``; o restante do arquivo continua no
+formato do ``dump_settings``, então o ``session.json`` do
+``save_session.py`` e o segredo ``IG_SESSION`` seguem válidos). Ao
+restaurar:
+
+- verificada há menos de ``ttl_hours``: usa direto, sem requisição;
+- senão: confirma com a chamada autenticada mais barata
+  (``account_info``) e atualiza o horário;
+- login completo só se não houver sessão ou se a verificação der
+  ``LoginRequired``.
+
+Uma sessão reaproveitada (cache ou verificada) ainda pode ser recusada
+no meio da execução: as chamadas do cliente ficam envolvidas e o
+primeiro ``LoginRequired`` invalida o arquivo, faz login completo e
+repete a chamada uma vez. Os clones da busca paralela
+(``core.fetch.clone_client``) recebem o mesmo tratamento: o login é feito
+uma vez só, no cliente original, e a sessão nova é copiada para o clone.
+"""
+import functools
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+
+SESSION_FILE = "session.json"
+DEFAULT_TTL_HOURS = 6
+VERIFIED_KEY = "last_verified_at"
+
+CACHED = "cache"
+PROBED = "verificada"
+LOGGED_IN = "login"
+
+# Chamadas autenticadas que renovam a sessão se ela for recusada
+RENEWABLE_METHODS = (
+    "user_followers",
+    "user_following",
+    "user_followers_v1_chunk",
+    "user_following_v1_chunk",
+    "user_info",
+    "user_medias",
+    "user_unfollow",
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _is_error(exc, name):
+    return any(cls.__name__ == name for cls in type(exc).__mro__)
+
+
+def is_login_required(exc):
+    """Reconhece ``LoginRequired`` sem importar o instagrapi"""
+    return _is_error(exc, "LoginRequired")
+
+
+def is_challenge_required(exc):
+    """Reconhece ``ChallengeRequired`` (verificação de segurança pendente)"""
+    return _is_error(exc, "ChallengeRequired")
+
+
+def read_session(path):
+    """Retorna (configurações, horário da última verificação) ou (None, None)"""
+    if not path or not os.path.exists(path):
+        return None, None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            settings = json.load(f)
+    except (OSError, ValueError):
+        return None, None
+    verified_at = settings.pop(VERIFIED_KEY, None)
+    return settings, verified_at
+
+
+class SessionManager:
+    """Restaura a sessão de `cl` gastando o mínimo de requisições"""
+
+    def __init__(self, cl, username, password, path=SESSION_FILE, ttl_hours=DEFAULT_TTL_HOURS):
+        self.cl = cl
+        self.username = username
+        self.password = password
+        self.path = path
+        self.ttl = timedelta(hours=ttl_hours)
+        self.mode = None
+        self.renewals = 0
+        self._renew_lock = threading.Lock()
+
+    def restore(self, fallback_settings=None):
+        """
+        Deixa o cliente autenticado e retorna como: "cache", "verificada"
+        ou "login". `fallback_settings` (ex.: o segredo IG_SESSION) é usado
+        quando não há arquivo de sessão.
+        """
+        settings, verified_at = read_session(self.path)
+        if settings is None and fallback_settings:
+            settings = dict(fallback_settings)
+            verified_at = settings.pop(VERIFIED_KEY, None)
+
+        if settings:
+            self.cl.set_settings(settings)
+            if self._is_fresh(verified_at):
+                self.mode = CACHED
+                self._renew_on_login_required()
+                return self.mode
+            try:
+                self.cl.account_info()
+            except Exception as e:
+                if not is_login_required(e):
+                    raise
+            else:
+                self.save(verified=True)
+                self.mode = PROBED
+                self._renew_on_login_required()
+                return self.mode
+
+        self.login(settings)
+        return self.mode
+
+    def login(self, settings=None):
+        """Login completo, mantendo os identificadores do aparelho da sessão antiga"""
+        if settings and "uuids" in settings:
+            self.cl.set_settings({})
+            self.cl.set_uuids(settings["uuids"])
+        self.cl.login(self.username, self.password)
+        self.save(verified=True)
+        self.mode = LOGGED_IN
+
+    def invalidate(self):
+        """Força nova verificação na próxima restauração (ex.: LoginRequired no meio do uso)"""
+        self._write(self.cl.get_settings(), None)
+
+    def renew(self):
+        """Sessão recusada: invalida a salva e faz login completo com o mesmo aparelho"""
+        logger.warning(f"🔑 Sessão de @{self.username} recusada (LoginRequired); "
+                       f"fazendo login de novo...")
+        self.invalidate()
+        self.login(self.cl.get_settings())
+        self.renewals += 1
+
+    def _renew_on_login_required(self, client=None):
+        """
+        Envolve as chamadas do cliente (na instância) para renovar a sessão
+        uma vez; sem `client`, o cliente da sessão, e os clones dele também
+        """
+        if client is None:
+            from core.fetch import on_clone
+
+            client = on_clone(self.cl, self._renew_on_login_required)
+        for method in RENEWABLE_METHODS:
+            call = getattr(client, method, None)
+            if call is not None:
+                setattr(client, method, self._renewing(client, call))
+
+    def _renewing(self, client, call):
+        @functools.wraps(call)
+        def wrapper(*args, **kwargs):
+            renewals = self.renewals
+            try:
+                return call(*args, **kwargs)
+            except Exception as e:
+                if not is_login_required(e):
+                    raise
+                with self._renew_lock:
+                    if self.renewals == renewals:
+                        # Depois de um login completo nesta execução, o erro segue adiante
+                        if self.mode == LOGGED_IN:
+                            raise
+                        self.renew()
+                    # Outra thread pode ter renovado enquanto esta chamada estava no ar
+                    if client is not self.cl:
+                        client.set_settings(self.cl.get_settings())
+            return call(*args, **kwargs)
+        return wrapper
+
+    def save(self, verified=False):
+        """Grava a sessão atual; sem `verified`, mantém o horário da última verificação"""
+        if verified:
+            verified_at = datetime.now().isoformat()
+        else:
+            verified_at = read_session(self.path)[1]
+        self._write(self.cl.get_settings(), verified_at)
+
+    def _is_fresh(self, verified_at):
+        if not verified_at:
+            return False
+        try:
+            age = datetime.now() - datetime.fromisoformat(verified_at)
+        except ValueError:
+            return False
+        return age < self.ttl
+
+    def _write(self, settings, verified_at):
+        data = dict(settings)
+        if verified_at:
+            data[VERIFIED_KEY] = verified_at
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,209 @@
+"""
+Snapshot persistido de seguidores/seguindo com atualização incremental.
+
+As listas do Instagram vêm das contas mais recentes para as mais antigas.
+A atualização incremental percorre as páginas nessa ordem e para assim que
+encontra `stop_after_known` IDs seguidos que já estão no snapshot, então
+numa conta estável basta uma ou duas páginas por lista. Remoções (quem
+deixou de te seguir) só aparecem numa resincronização completa, feita a
+cada `full_sync_days` dias.
+
+O conjunto de não-seguidores também é mantido de forma incremental: só o
+delta (novos seguidores e novas contas seguidas) é aplicado sobre ele.
+"""
+import json
+import os
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from core.idstream import iter_pages, UserRef, DEFAULT_PAGE_SIZE
+
+SNAPSHOT_FILE = "follow_snapshot.json"
+DEFAULT_STOP_AFTER_KNOWN = 20
+DEFAULT_FULL_SYNC_DAYS = 7
+
+RefreshResult = namedtuple(
+    "RefreshResult", ["full_sync", "new_followers", "new_following", "pages"]
+)
+
+
+# =========================
+# 📁 SNAPSHOT EM DISCO
+# =========================
+class FollowSnapshot:
+    """Última visão conhecida das listas, em ordem do mais recente"""
+
+    def __init__(self, path=SNAPSHOT_FILE):
+        self.path = path
+        self.user_id = None
+        self.last_full_sync = None
+        self.updated_at = None
+        self.followers = []        # IDs, mais recentes primeiro
+        self.following = {}        # ID -> username (ordem de inserção = recência)
+        self._followers_set = set()
+        self._non_followers = {}   # ID -> username
+
+    @classmethod
+    def load(cls, path=SNAPSHOT_FILE):
+        """Carrega o snapshot; retorna um snapshot vazio se não existir"""
+        snapshot = cls(path)
+        if not os.path.exists(path):
+            return snapshot
+
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        snapshot.user_id = data.get("user_id")
+        snapshot.last_full_sync = data.get("last_full_sync")
+        snapshot.updated_at = data.get("updated_at")
+        snapshot.followers = [str(uid) for uid in data.get("followers", [])]
+        snapshot.following = {str(uid): name for uid, name in data.get("following", [])}
+        snapshot._rebuild()
+        return snapshot
+
+    def save(self):
+        """Grava o snapshot de forma atômica"""
+        self.updated_at = datetime.now().isoformat()
+        data = {
+            "user_id": self.user_id,
+            "last_full_sync": self.last_full_sync,
+            "updated_at": self.updated_at,
+            "followers": self.followers,
+            "following": [[uid, name] for uid, name in self.following.items()],
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def _rebuild(self):
+        self._followers_set = set(self.followers)
+        self._non_followers = {
+            uid: name for uid, name in self.following.items()
+            if uid not in self._followers_set
+        }
+
+    @property
+    def is_empty(self):
+        return self.last_full_sync is None
+
+    def needs_full_sync(self, user_id, full_sync_days=DEFAULT_FULL_SYNC_DAYS):
+        """Verifica se é hora de uma resincronização completa"""
+        if self.is_empty or str(self.user_id) != str(user_id):
+            return True
+        last = datetime.fromisoformat(self.last_full_sync)
+        return datetime.now() - last >= timedelta(days=full_sync_days)
+
+    # =========================
+    # 🔄 APLICAR DELTAS
+    # =========================
+    def replace(self, user_id, followers, following):
+        """Substitui o snapshot inteiro (resincronização completa)"""
+        self.user_id = str(user_id)
+        self.followers = [str(uid) for uid in followers]
+        self.following = {str(uid): name for uid, name in following}
+        self.last_full_sync = datetime.now().isoformat()
+        self._rebuild()
+
+    def add_followers(self, user_ids):
+        """Adiciona novos seguidores (mais recentes primeiro)"""
+        new = [str(uid) for uid in user_ids if str(uid) not in self._followers_set]
+        self.followers = new + self.followers
+        for uid in new:
+            self._followers_set.add(uid)
+            self._non_followers.pop(uid, None)
+        return new
+
+    def add_following(self, users):
+        """Adiciona novas contas seguidas: lista de (id, username)"""
+        new = [(str(uid), name) for uid, name in users if str(uid) not in self.following]
+        following = dict(new)
+        following.update(self.following)
+        self.following = following
+        for uid, name in new:
+            if uid not in self._followers_set:
+                self._non_followers[uid] = name
+        return new
+
+    def remove_following(self, user_ids):
+        """Remove contas que deixamos de seguir"""
+        for uid in user_ids:
+            uid = str(uid)
+            self.following.pop(uid, None)
+            self._non_followers.pop(uid, None)
+
+    def is_known(self, kind, user_id):
+        if kind == "followers":
+            return str(user_id) in self._followers_set
+        return str(user_id) in self.following
+
+    def ranked_non_followers(self):
+        """(UserRef, posição em "seguindo") dos não-seguidores, mais recentes primeiro"""
+        for rank, (uid, name) in enumerate(self.following.items()):
+            if uid in self._non_followers:
+                yield UserRef(uid, name), rank
+
+# =========================
+# 📥 ATUALIZAÇÃO
+# =========================
+def fetch_new(cl, snapshot, kind, user_id, stop_after_known=DEFAULT_STOP_AFTER_KNOWN,
+              page_size=DEFAULT_PAGE_SIZE, pacer=None):
+    """Pagina do mais recente até achar `stop_after_known` IDs conhecidos seguidos"""
+    new_users = []
+    pages = 0
+    known_streak = 0
+
+    for page in iter_pages(cl, kind, user_id, page_size, pacer):
+        pages += 1
+        for user in page:
+            if snapshot.is_known(kind, user.pk):
+                known_streak += 1
+            else:
+                known_streak = 0
+                new_users.append(user)
+        if known_streak >= stop_after_known:
+            break
+
+    return new_users, pages
+
+
+def fetch_all(cl, kind, user_id, page_size=DEFAULT_PAGE_SIZE, pacer=None):
+    """Baixa a lista inteira como (id, username), mais recentes primeiro"""
+    users = []
+    pages = 0
+    for page in iter_pages(cl, kind, user_id, page_size, pacer):
+        pages += 1
+        users.extend((str(user.pk), user.username) for user in page)
+    return users, pages
+
+
+def refresh_snapshot(cl, snapshot, stop_after_known=DEFAULT_STOP_AFTER_KNOWN,
+                     full_sync_days=DEFAULT_FULL_SYNC_DAYS, page_size=DEFAULT_PAGE_SIZE,
+                     pacer=None):
+    """
+    Atualiza o snapshot (incremental ou completo) e grava em disco; o
+    `pacer` de busca espaça as páginas e absorve limitações (``iter_pages``)
+    """
+    user_id = cl.user_id
+
+    if snapshot.needs_full_sync(user_id, full_sync_days):
+        followers, followers_pages = fetch_all(cl, "followers", user_id, page_size, pacer)
+        following, following_pages = fetch_all(cl, "following", user_id, page_size, pacer)
+        snapshot.replace(user_id, [uid for uid, _ in followers], following)
+        snapshot.save()
+        return RefreshResult(True, len(followers), len(following),
+                             followers_pages + following_pages)
+
+    new_followers, followers_pages = fetch_new(
+        cl, snapshot, "followers", user_id, stop_after_known, page_size, pacer
+    )
+    new_following, following_pages = fetch_new(
+        cl, snapshot, "following", user_id, stop_after_known, page_size, pacer
+    )
+
+    added_followers = snapshot.add_followers(user.pk for user in new_followers)
+    added_following = snapshot.add_following((user.pk, user.username) for user in new_following)
+    snapshot.save()
+
+    return RefreshResult(False, len(added_followers), len(added_following),
+                         followers_pages + following_pages)
@@ -0,0 +1,45 @@
+"""
+Cronômetro da partida: quanto tempo cada etapa (imports, sessão, busca
+das listas...) leva até a primeira ação de unfollow.
+"""
+import time
+
+
+class StartupTimer:
+    """Marca etapas em sequência; `finish` fecha a contagem uma única vez"""
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self.started = clock()
+        self._last = self.started
+        self.stages = []
+        self.finished = False
+
+    def lap(self, name):
+        """Encerra a etapa `name` (desde a marca anterior); retorna a duração"""
+        now = self._clock()
+        elapsed = now - self._last
+        self._last = now
+        self.stages.append((name, elapsed))
+        return elapsed
+
+    @property
+    def total(self):
+        return self._last - self.started
+
+    def as_dict(self):
+        stages = {name: round(elapsed, 4) for name, elapsed in self.stages}
+        stages["total"] = round(self.total, 4)
+        return stages
+
+    def summary(self):
+        parts = [f"{name} {elapsed:.2f}s" for name, elapsed in self.stages]
+        return f"⏱️ Até a primeira ação: {self.total:.2f}s ({' · '.join(parts)})"
+
+    def finish(self, name="espera"):
+        """Fecha a última etapa e retorna o resumo; None se já foi fechado"""
+        if self.finished:
+            return None
+        self.finished = True
+        self.lap(name)
+        return self.summary()
@@ -0,0 +1,236 @@
+"""
+Transporte HTTP ajustado para o cliente do Instagram.
+
+O ``instagrapi.Client`` guarda duas ``requests.Session`` (``private`` e
+``public``) com o adaptador padrão: pool pequeno, sem tempo limite e sem
+nenhuma nova tentativa. ``Transport.apply`` monta nelas um único
+``TunedAdapter`` que:
+
+- mantém um pool de conexões keep-alive do tamanho pedido, compartilhado
+  pelas sessões e pelos clientes clonados da busca paralela (ver
+  ``core.fetch.clone_client``), então busca e unfollows reaproveitam as
+  mesmas conexões;
+- aplica os tempos limite de conexão e de leitura da configuração em
+  todas as requisições;
+- tenta de novo só quando a conexão falha antes de haver resposta
+  (recusada, resetada ou fechada pelo servidor no keep-alive). Tempo
+  limite de leitura e respostas HTTP nunca são repetidos: o servidor
+  pode ter processado a ação;
+- mede cada requisição (DNS, conexão, tempo até o primeiro byte) e
+  entrega um ``RequestTiming`` aos observadores (``core.metrics``
+  registra os histogramas; com o log em DEBUG cada requisição vira um
+  evento ``http``).
+
+Importa ``requests``/``urllib3``: o pipeline só carrega este módulo ao
+criar um cliente real.
+"""
+import http.client
+import logging
+import socket
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ProtocolError
+from urllib3.util.retry import Retry
+
+from core.eventlog import event
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+DEFAULT_RETRIES = 2
+
+RequestTiming = namedtuple(
+    "RequestTiming",
+    ["method", "host", "path", "status", "reused", "dns", "connect", "ttfb", "total",
+     "retries", "error"],
+)
+
+_RESET_ERRORS = (ConnectionResetError, BrokenPipeError, ConnectionAbortedError,
+                 http.client.RemoteDisconnected)
+
+# Tempos da conexão aberta pela requisição em andamento nesta thread
+_local = threading.local()
+
+logger = logging.getLogger(__name__)
+
+
+# =========================
+# ⏱️ CONEXÕES MEDIDAS
+# =========================
+class _TimedConnectionMixin:
+    """Separa a resolução de DNS do connect ao abrir uma conexão nova"""
+
+    def _new_conn(self):
+        host = self._dns_host
+        started = time.perf_counter()
+        try:
+            address = socket.getaddrinfo(host, self.port, 0, socket.SOCK_STREAM)[0][4][0]
+        except OSError:
+            address = host  # o urllib3 repete a resolução e gera o erro dele
+        resolved = time.perf_counter()
+
+        self._dns_host = address  # Host/SNI continuam com o nome original
+        try:
+            conn = super()._new_conn()
+        finally:
+            self._dns_host = host
+        _local.connect = (resolved - started, time.perf_counter() - resolved)
+        return conn
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+_POOL_CLASSES = {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
+
+
+# =========================
+# 🔁 NOVAS TENTATIVAS
+# =========================
+def is_connection_reset(error):
+    """Conexão resetada/fechada antes da resposta (inclusive keep-alive vencido)"""
+    if isinstance(error, _RESET_ERRORS):
+        return True
+    return isinstance(error, ProtocolError) and any(
+        isinstance(arg, _RESET_ERRORS) for arg in error.args)
+
+
+class ResetRetry(Retry):
+    """Conta reset de conexão como falha de conexão; leitura nunca é repetida"""
+
+    def _is_connection_error(self, err):
+        return is_connection_reset(err) or super()._is_connection_error(err)
+
+
+def reset_retry(retries=DEFAULT_RETRIES, backoff=0.2):
+    return ResetRetry(total=retries, connect=retries, read=0, status=0, other=0,
+                      redirect=False, backoff_factor=backoff, raise_on_status=False)
+
+
+# =========================
+# 🔌 ADAPTADOR
+# =========================
+class TunedAdapter(HTTPAdapter):
+    """HTTPAdapter com pool dimensionado, tempos limite fixos e medição por requisição"""
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT, retries=DEFAULT_RETRIES):
+        self.timeout = (connect_timeout, read_timeout)
+        self.observers = []
+        super().__init__(pool_connections=pool_size, pool_maxsize=pool_size,
+                         max_retries=reset_retry(retries))
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _POOL_CLASSES
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        if proxy.lower().startswith("http"):  # SOCKS tem as suas próprias conexões
+            manager.pool_classes_by_scheme = _POOL_CLASSES
+        return manager
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        # O tempo limite da configuração vale para todas as chamadas do cliente
+        _local.connect = None
+        started = time.perf_counter()
+        response = error = None
+        try:
+            response = super().send(request, stream, self.timeout, verify, cert, proxies)
+            return response
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            if self.observers:
+                self._notify(request, response, error, time.perf_counter() - started)
+
+    def _notify(self, request, response, error, total):
+        connect = _local.connect
+        dns, connect_time = connect if connect is not None else (None, None)
+        raw = getattr(response, "raw", None)
+        retries = getattr(raw, "retries", None)
+        url = urlsplit(request.url)
+        timing = RequestTiming(
+            method=request.method,
+            host=url.hostname,
+            path=url.path,
+            status=response.status_code if response is not None else None,
+            reused=connect is None,
+            dns=dns,
+            connect=connect_time,
+            # Cabeçalhos recebidos; o corpo é lido depois, fora do adaptador
+            ttfb=total - (dns or 0) - (connect_time or 0),
+            total=total,
+            retries=len(retries.history) if retries is not None else 0,
+            error=error,
+        )
+        for observer in self.observers:
+            observer(timing)
+
+
+def _log_timing(timing):
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"🌐 {timing.method} {timing.path} → {timing.status or timing.error} "
+                     f"({timing.total * 1000:.0f} ms)",
+                     extra=event("http", **{key: value for key, value in timing._asdict().items()
+                                            if value is not None}))
+
+
+# =========================
+# 🤖 CLIENTE
+# =========================
+class Transport:
+    """Um adaptador compartilhado por todas as sessões HTTP de um ou mais clientes"""
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT, retries=DEFAULT_RETRIES):
+        self.adapter = TunedAdapter(pool_size, connect_timeout, read_timeout, retries)
+        self.observers = self.adapter.observers
+        self.observers.append(_log_timing)
+
+    def mount(self, session):
+        session.mount("https://", self.adapter)
+        session.mount("http://", self.adapter)
+        return session
+
+    def session(self):
+        """``requests.Session`` nova já com o adaptador"""
+        return self.mount(requests.Session())
+
+    def apply(self, cl):
+        """Monta o adaptador nas sessões do cliente; guarda o transporte em ``cl.transport``"""
+        for value in vars(cl).values():
+            if isinstance(value, requests.Session):
+                self.mount(value)
+        cl.transport = self
+        return cl
+
+    def close(self):
+        self.adapter.close()
+
+
+def transport_from_settings(account):
+    """Transporte com as opções http_* da configuração da conta"""
+    return Transport(account["http_pool_size"], account["http_connect_timeout"],
+                     account["http_read_timeout"], account["http_retries"])
@@ -0,0 +1,156 @@
+"""
+Fila de trabalho persistida para unfollows retomáveis.
+
+O plano (lista de alvos) é gravado em disco junto com o status e o número
+de tentativas de cada item, e o arquivo é regravado (de forma atômica)
+depois de cada ação. Se a execução for interrompida — timeout do workflow,
+crash, Ctrl+C — a próxima execução retoma do ponto em que parou: itens
+concluídos são pulados, falhas temporárias são tentadas de novo e a busca
+das listas não é repetida enquanto o plano estiver fresco.
+"""
+import json
+import os
+from datetime import datetime, timedelta
+
+from core.idstream import UserRef
+from core.pacing import is_throttle_error
+
+QUEUE_FILE = "unfollow_queue.json"
+DEFAULT_MAX_AGE_HOURS = 24
+DEFAULT_MAX_ATTEMPTS = 3
+
+PENDING = "pending"
+RETRY = "retry"
+DONE = "done"
+FAILED = "failed"
+
+_TRANSIENT_ERRORS = {
+    "ClientConnectionError", "ClientRequestTimeout", "ConnectionError", "Timeout",
+    "ReadTimeout", "ConnectTimeout", "ChunkedEncodingError",
+}
+
+
+def is_transient_error(exc):
+    """Limitações e falhas de rede valem nova tentativa"""
+    if is_throttle_error(exc):
+        return True
+    return bool({cls.__name__ for cls in type(exc).__mro__} & _TRANSIENT_ERRORS)
+
+
+class WorkQueue:
+    """Plano de unfollows com status por item, gravado após cada ação"""
+
+    def __init__(self, path=QUEUE_FILE, account=None, items=None, created_at=None,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.path = path
+        self.account = account
+        self.items = items or []
+        self.created_at = created_at or datetime.now().isoformat()
+        self.max_attempts = max_attempts
+
+    # =========================
+    # 📁 ARQUIVO
+    # =========================
+    @classmethod
+    def create(cls, path, account, users, max_attempts=DEFAULT_MAX_ATTEMPTS, created_at=None):
+        """
+        Grava um plano novo com os usuários na ordem em que serão processados;
+        `created_at` data o plano pelas listas que o geraram (padrão: agora)
+        """
+        items = [
+            {"user_id": str(user.pk), "username": user.username, "status": PENDING,
+             "attempts": 0, "last_error": None}
+            for user in users
+        ]
+        queue = cls(path, account, items, created_at, max_attempts)
+        queue.flush()
+        return queue
+
+    @classmethod
+    def load(cls, path=QUEUE_FILE):
+        """Carrega o plano salvo; None se não existir ou estiver corrompido"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return cls(path, data.get("account"), data["items"], data.get("created_at"),
+                       data.get("max_attempts", DEFAULT_MAX_ATTEMPTS))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def flush(self):
+        """Grava o estado atual de forma atômica"""
+        data = {
+            "account": self.account,
+            "created_at": self.created_at,
+            "max_attempts": self.max_attempts,
+            "items": self.items,
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    # =========================
+    # 🔎 CONSULTAS
+    # =========================
+    def is_resumable(self, account=None, max_age_hours=DEFAULT_MAX_AGE_HOURS):
+        """Plano da mesma conta, ainda fresco e com trabalho pendente"""
+        if account is not None and self.account is not None and self.account != account:
+            return False
+        age = datetime.now() - datetime.fromisoformat(self.created_at)
+        if age > timedelta(hours=max_age_hours):
+            return False
+        return self.remaining > 0
+
+    @property
+    def remaining(self):
+        return sum(1 for item in self.items if item["status"] in (PENDING, RETRY))
+
+    def counts(self):
+        result = {PENDING: 0, RETRY: 0, DONE: 0, FAILED: 0}
+        for item in self.items:
+            result[item["status"]] += 1
+        return result
+
+    def next_items(self, limit=None):
+        """Itens a processar: pendentes primeiro, depois as novas tentativas"""
+        selected = [item for item in self.items if item["status"] == PENDING]
+        selected += [item for item in self.items if item["status"] == RETRY]
+        return selected if limit is None else selected[:limit]
+
+    @staticmethod
+    def user(item):
+        return UserRef(item["user_id"], item["username"])
+
+    # =========================
+    # ✍️ ATUALIZAÇÕES
+    # =========================
+    def mark_done(self, item):
+        item["attempts"] += 1
+        item["status"] = DONE
+        item["last_error"] = None
+        item["updated_at"] = datetime.now().isoformat()
+        self.flush()
+
+    def discard(self, predicate):
+        """Tira da fila os itens a processar para os quais `predicate(item)` é verdadeiro"""
+        kept = [item for item in self.items
+                if item["status"] not in (PENDING, RETRY) or not predicate(item)]
+        removed = len(self.items) - len(kept)
+        if removed:
+            self.items = kept
+            self.flush()
+        return removed
+
+    def mark_failed(self, item, error):
+        """Falha temporária volta para a fila até `max_attempts`; as demais são finais"""
+        item["attempts"] += 1
+        item["last_error"] = f"{type(error).__name__}: {error}"
+        item["updated_at"] = datetime.now().isoformat()
+        if is_transient_error(error) and item["attempts"] < self.max_attempts:
+            item["status"] = RETRY
+        else:
+            item["status"] = FAILED
+        self.flush()
@@ -1,122 +1,98 @@
 import os
-import time
 import sys
 import logging
-from instagrapi import Client
-from instagrapi.exceptions import (
-    LoginRequired, ChallengeRequired, FeedbackRequired, PleaseWaitFewMinutes
-)
+from core.timing import StartupTimer
+
+startup = StartupTimer()
 
-# Configuração de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+from core.pipeline import (
+    account_settings, settings_from_env, load_factory, run_account
 )
+from core.eventlog import logging_from_env
+from core.profiling import start_profiler
+from core.ratelimit import limiter_from_env
+
+startup.lap('imports')
 
 # Configurações
-USERNAME = os.getenv('INSTA_USERNAME')
-PASSWORD = os.getenv('INSTA_PASSWORD')
-MAX_UNFOLLOWS = int(os.getenv('MAX_UNFOLLOWS', 100))
-SLEEP_BETWEEN_ACTIONS = int(os.getenv('SLEEP_BETWEEN_ACTIONS', 10))
 SESSION_FILE = "instagram_session.json"
+MAX_UNFOLLOWS = 100
+SLEEP_BETWEEN_ACTIONS = 10
+PROFILE_FILE = "profile_report.json"   # Relatório do modo --profile
+EVENTS_FILE = "unfollow_events.jsonl"  # Eventos estruturados (LOG_FILE substitui)
+
+def load_config():
+    """
+    Configuração da execução a partir das variáveis de ambiente
+    """
+    return account_settings({
+        'max_unfollows': MAX_UNFOLLOWS,
+        'sleep_between_actions': SLEEP_BETWEEN_ACTIONS,
+        'session_file': SESSION_FILE,
+        'state_dir': '.',
+        **settings_from_env(),
+        'username': os.getenv('INSTA_USERNAME'),
+        'password': os.getenv('INSTA_PASSWORD'),
+    })
 
 def challenge_code_handler(username, choice):
     """
     Handler para receber o código de verificação
     """
-    if choice == ChallengeRequired.EMAIL:
+    method = getattr(choice, 'name', str(choice)).upper()
+    if method == 'EMAIL':
         print(f"Verificação por email enviada para {username}")
-    elif choice == ChallengeRequired.SMS:
+    elif method == 'SMS':
         print(f"Verificação por SMS enviada para {username}")
-    
+
     while True:
         code = input("Digite o código de 6 dígitos recebido: ").strip()
         if code and code.isdigit() and len(code) == 6:
             return code
         print("Código inválido. Digite exatamente 6 dígitos.")
 
-def setup_client():
+def setup_client(config):
     """
-    Configura o cliente Instagram com session management
+    Configura o cliente Instagram (a biblioteca de config['client'], por
+    padrão o instagrapi, só é importada aqui)
     """
-    cl = Client()
-    
-    # Tentar carregar sessão existente
-    if os.path.exists(SESSION_FILE):
-        try:
-            cl.load_settings(SESSION_FILE)
-            logging.info('Sessão anterior carregada.')
-        except Exception as e:
-            logging.warning(f'Erro ao carregar sessão: {e}')
-    
+    cl = load_factory(config['client'])()
+
     # Configurar handler de challenge
     cl.challenge_code_handler = challenge_code_handler
-    
+
     return cl
 
 def main():
-    if not USERNAME or not PASSWORD:
+    # Configuração de logging
+    logging_from_env(
+        EVENTS_FILE,
+        console_format='%(asctime)s - %(levelname)s - %(message)s',
+        stream=sys.stderr,
+    )
+
+    if not os.getenv('INSTA_USERNAME') or not os.getenv('INSTA_PASSWORD'):
         logging.error('Usuário ou senha não configurados nas variáveis de ambiente.')
         sys.exit(1)
 
-    cl = setup_client()
-
+    config = load_config()
+    profiler = start_profiler(PROFILE_FILE)
     try:
-        logging.info('Efetuando login...')
-        cl.login(USERNAME, PASSWORD)
-        
-        # Salvar sessão para uso futuro
-        cl.dump_settings(SESSION_FILE)
-        logging.info('Login bem-sucedido e sessão salva!')
-        
-    except (LoginRequired, ChallengeRequired, FeedbackRequired) as e:
-        logging.error(f'Erro no login: {e}')
+        report = run_account(
+            config,
+            client_factory=lambda: setup_client(config),
+            limiter=limiter_from_env(config['sleep_between_actions']),
+            timer=startup,
+            profiler=profiler,
+        )
+    finally:
+        if profiler is not None:
+            logging.info(f"Perfil salvo em {profiler.finish()}")
+    if report['status'] != 'ok':
+        logging.error(f"Erro: {report['error']}")
         sys.exit(1)
 
-    # Resto do código permanece igual...
-    try:
-        logging.info('Obtendo lista de seguidores...')
-        followers = cl.user_followers(cl.user_id)
-        logging.info(f'{len(followers)} seguidores encontrados.')
-
-        logging.info('Obtendo lista de quem você segue...')
-        following = cl.user_following(cl.user_id)
-        logging.info(f'Você segue {len(following)} contas.')
-
-    except PleaseWaitFewMinutes as e:
-        logging.warning(f'O Instagram solicitou pausa: {e}')
-        sys.exit(1)
-
-    followers_ids = set(followers.keys())
-    following_ids = set(following.keys())
-
-    non_followers_ids = following_ids - followers_ids
-    non_followers = [following[uid] for uid in non_followers_ids]
-
-    logging.info(f'Encontradas {len(non_followers)} contas que não te seguem de volta.')
-
-    if not non_followers:
-        logging.info('Nenhum unfollow necessário.')
-        sys.exit(0)
-
-    count = 0
-    logging.info(f'Iniciando unfollow de até {MAX_UNFOLLOWS} contas...')
-
-    for user in non_followers[:MAX_UNFOLLOWS]:
-        try:
-            cl.user_unfollow(user.pk)
-            logging.info(f'Deixou de seguir: @{user.username}')
-            count += 1
-            time.sleep(SLEEP_BETWEEN_ACTIONS)
-        except PleaseWaitFewMinutes as e:
-            logging.warning(f'Aguardando devido a limitação: {e}')
-            time.sleep(600)
-            continue
-        except Exception as e:
-            logging.error(f'Erro ao deixar de seguir @{user.username}: {e}')
-            time.sleep(10)
-
-    logging.info(f'Processo concluído! {count} contas deixadas de seguir.')
+    logging.info(f"Processo concluído! {report['unfollowed']} contas deixadas de seguir.")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -1,91 +1,87 @@
 import os
 import json
-import time
 import sys
-from instagrapi import Client
-from instagrapi.exceptions import (
-    LoginRequired, ChallengeRequired, FeedbackRequired, PleaseWaitFewMinutes
-)
+from core.timing import StartupTimer
+
+startup = StartupTimer()
+
+from core.pipeline import account_settings, settings_from_env, run_account, plan_offline
+from core.eventlog import logging_from_env
+from core.profiling import start_profiler
+from core.ratelimit import limiter_from_env
+
+startup.lap("imports")
 
 # =========================
 # ⚙️ CONFIGURAÇÕES
 # =========================
-USERNAME = os.getenv("IG_USERNAME")
-PASSWORD = os.getenv("IG_PASSWORD")
-SESSION = os.getenv("IG_SESSION")
 MAX_UNFOLLOWS = 100
 SLEEP_BETWEEN_ACTIONS = 10
+PROFILE_FILE = "profile_report.json"   # Relatório do modo --profile
+EVENTS_FILE = "unfollow_events.jsonl"  # Eventos estruturados (LOG_FILE substitui)
 
-# =========================
-# 🚀 LOGIN VIA SESSÃO
-# =========================
-cl = Client()
-
-try:
-    if SESSION:
-        print("🔐 Restaurando sessão salva...")
-        cl.set_settings(json.loads(SESSION))
-        cl.login(USERNAME, PASSWORD)
-        print("✅ Sessão restaurada com sucesso!\n")
-    else:
-        print("⚠️ Nenhuma sessão encontrada. Faça login localmente com save_session.py.")
-        sys.exit(1)
-
-except (LoginRequired, ChallengeRequired, FeedbackRequired) as e:
-    print(f"❌ Erro no login: {e}")
-    sys.exit(1)
-
-# =========================
-# 👥 OBTENDO DADOS
-# =========================
-try:
-    print("📥 Obtendo lista de seguidores...")
-    followers = cl.user_followers(cl.user_id)
-    print(f"✅ {len(followers)} seguidores encontrados.")
 
-    print("📤 Obtendo lista de quem você segue...")
-    following = cl.user_following(cl.user_id)
-    print(f"✅ Você segue {len(following)} contas.\n")
+def load_config():
+    """Configuração da execução a partir do ambiente"""
+    return account_settings({
+        # Padrões deste script; as variáveis de ambiente comuns têm prioridade
+        "max_unfollows": MAX_UNFOLLOWS,
+        "sleep_between_actions": SLEEP_BETWEEN_ACTIONS,
+        "state_dir": ".",
+        **settings_from_env(),
+        "username": os.getenv("IG_USERNAME"),
+        "password": os.getenv("IG_PASSWORD"),
+    })
 
-except PleaseWaitFewMinutes as e:
-    print(f"⚠️ O Instagram solicitou pausa: {e}")
-    sys.exit(1)
 
 # =========================
-# 🔍 IDENTIFICANDO NÃO-SEGUIDORES
+# 🚀 EXECUÇÃO
 # =========================
-followers_ids = set(followers.keys())
-following_ids = set(following.keys())
+def dry_run(config):
+    """`--dry-run`: grava o plano a partir do último snapshot, sem acessar o Instagram"""
+    try:
+        plan, fetched = plan_offline(config)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
 
-non_followers_ids = following_ids - followers_ids
-non_followers = [following[uid] for uid in non_followers_ids]
+    print(f"\n📋 {fetched.total} não-seguidores no snapshot; plano com "
+          f"{plan.queue.remaining} contas gravado em {plan.queue.path}:")
+    for i, user in enumerate(fetched.targets[:10]):
+        print(f"  {i+1}. @{user.username}")
 
-print(f"🔎 Encontradas {len(non_followers)} contas que não te seguem de volta.\n")
 
-if not non_followers:
-    print("✅ Nenhum unfollow necessário.")
-    sys.exit(0)
+def main():
+    logging_from_env(EVENTS_FILE)
+    config = load_config()
+    if "--dry-run" in sys.argv[1:]:
+        dry_run(config)
+        return
+    session = os.getenv("IG_SESSION")
 
-# =========================
-# 🚫 EXECUTANDO UNFOLLOWS
-# =========================
-count = 0
-print(f"🚀 Iniciando unfollow de até {MAX_UNFOLLOWS} contas...\n")
+    # Login via sessão: o segredo IG_SESSION (ou o session.json local) é obrigatório
+    if not session and not os.path.exists(config["session_file"]):
+        print("⚠️ Nenhuma sessão encontrada. Faça login localmente com save_session.py.")
+        sys.exit(1)
 
-for user in non_followers[:MAX_UNFOLLOWS]:
+    profiler = start_profiler(PROFILE_FILE)
     try:
-        cl.user_unfollow(user.pk)
-        print(f"❌ Deixou de seguir: @{user.username}")
-        count += 1
-        time.sleep(SLEEP_BETWEEN_ACTIONS)
+        report = run_account(
+            config,
+            limiter=limiter_from_env(config["sleep_between_actions"]),
+            timer=startup,
+            fallback_settings=json.loads(session) if session else None,
+            profiler=profiler,
+        )
+    finally:
+        if profiler is not None:
+            print(f"🔬 Perfil salvo em {profiler.finish()}")
+    if report["status"] != "ok":
+        print(f"❌ Erro: {report['error']}")
+        sys.exit(1)
 
-    except PleaseWaitFewMinutes as e:
-        print(f"⏳ Aguardando devido a limitação: {e}")
-        time.sleep(600)
-        continue
+    print(f"\n✅ Processo concluído! {report['unfollowed']} contas deixadas de seguir.")
 
-    except Exception as e:
-        print(f"⚠️ Erro ao deixar de seguir @{user.username}: {e}")
-        time.sleep(10)
 
-print(f"\n✅ Processo concluído! {count} contas deixadas de seguir.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
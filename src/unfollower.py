@@ -1,198 +1,183 @@
-
-from instagrapi import Client
-from instagrapi.exceptions import (
-    LoginRequired, ChallengeRequired, FeedbackRequired, PleaseWaitFewMinutes
-)
 import os
-import time
 import sys
-from dotenv import load_dotenv
+import time
 import logging
 
-# =========================
-# ⚙️ CONFIGURAÇÕES E LOGGING
-# =========================
-load_dotenv()
-
-# Configuração de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('unfollower.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-logger = logging.getLogger(__name__)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.timing import StartupTimer
+
+startup = StartupTimer()
 
-# Configurações da aplicação
-USERNAME = os.getenv('INSTAGRAM_USERNAME')
-PASSWORD = os.getenv('INSTAGRAM_PASSWORD')
+from core.pipeline import (
+    account_settings, settings_from_env, create_client, login, load_pacers, save_pacers,
+    prepare_plan, execute_plan, save_session, export_metrics, create_deadline
+)
+from core.deadline import DeadlineReached
+from core.metrics import Metrics, instrument
+from core.profiling import start_profiler, phase
+from core.eventlog import logging_from_env
+from core.pacing import is_throttle_error
+from core.ratelimit import limiter_from_env
+from core.session import is_challenge_required
 
-# Validação das credenciais
-if not USERNAME or not PASSWORD:
-    logger.error("❌ Credenciais não encontradas. Configure as variáveis de ambiente.")
-    sys.exit(1)
+startup.lap("imports")
 
-MAX_UNFOLLOWS = int(os.getenv('MAX_UNFOLLOWS', 100))
-SLEEP_BETWEEN_ACTIONS = int(os.getenv('SLEEP_BETWEEN_ACTIONS', 10))
-MAX_RETRIES = int(os.getenv('MAX_RETRIES', 3))
+logger = logging.getLogger(__name__)
 
 # =========================
-# 🚀 CLIENTE INSTAGRAM
+# ⚙️ CONFIGURAÇÕES
 # =========================
-def create_client():
-    """Cria e configura o cliente do Instagram"""
-    client = Client()
-    
-    # Configurações para evitar detecção
-    client.set_user_agent("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-    client.delay_range = [1, 3]
-    
-    return client
+# Importar este módulo não tem efeito colateral: o .env, o logging e a
+# validação das credenciais só acontecem em main().
+MAX_UNFOLLOWS = 100
+SLEEP_BETWEEN_ACTIONS = 10
+MAX_RETRIES = 3
+PROFILE_FILE = "unfollower.profile.json"   # Ao lado do unfollower.log (modo --profile)
+LOG_FILE = "unfollower.log"
+EVENTS_FILE = "unfollower.jsonl"           # Eventos estruturados (LOG_FILE no ambiente substitui)
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+
+
+def setup_logging():
+    """Log na saída padrão, no unfollower.log e em JSONL, escritos em segundo plano"""
+    logging_from_env(
+        EVENTS_FILE,
+        text_file=LOG_FILE,
+        console_format='%(asctime)s - %(levelname)s - %(message)s',
+    )
+
+
+def load_config(environ=None):
+    """Monta a configuração da conta a partir do ambiente (já com o .env carregado)"""
+    environ = os.environ if environ is None else environ
+    return account_settings({
+        "max_unfollows": MAX_UNFOLLOWS,
+        "sleep_between_actions": SLEEP_BETWEEN_ACTIONS,
+        "state_dir": ".",
+        # Configurações para evitar detecção
+        "delay_range": [1, 3],
+        "user_agent": USER_AGENT,
+        **settings_from_env(environ),
+        "username": environ.get('INSTAGRAM_USERNAME'),
+        "password": environ.get('INSTAGRAM_PASSWORD'),
+    })
 
 # =========================
 # 🔐 LOGIN SEGURO
 # =========================
-def login_with_retry(client, username, password, max_retries=3):
-    """Tenta login com múltiplas tentativas"""
+def wait_before_retry(seconds, deadline=None):
+    """Espera entre tentativas de login; com prazo, levanta DeadlineReached se não couber"""
+    if deadline is not None:
+        deadline.check(seconds)
+    time.sleep(seconds)
+
+def login_with_retry(client, config, max_retries=3, metrics=None, deadline=None):
+    """Restaura a sessão salva (ou faz login) com múltiplas tentativas, dentro do prazo"""
     for attempt in range(max_retries):
+        if attempt and metrics is not None:
+            metrics.inc("login_retries_total", help_text="Novas tentativas de login")
         try:
             logger.info(f"🔐 Tentativa de login {attempt + 1}/{max_retries}...")
-            client.login(username, password)
-            logger.info("✅ Login bem-sucedido!")
+            mode = login(client, config)
+            logger.info(f"✅ Login bem-sucedido ({mode})!")
             return True
-            
-        except ChallengeRequired:
-            logger.warning("⚠️ Verificação de segurança necessária. Verifique o app do Instagram.")
-            if attempt == max_retries - 1:
-                logger.error("❌ Falha no login após múltiplas tentativas")
-                return False
-            time.sleep(30)
-            
-        except FeedbackRequired as e:
-            logger.error(f"❌ Limitação temporária: {e}")
-            logger.info("⏳ Aguardando 10 minutos antes de tentar novamente...")
-            time.sleep(600)
-            
-        except PleaseWaitFewMinutes as e:
-            logger.warning(f"⏳ Instagram solicitou pausa: {e}")
-            wait_time = 600  # 10 minutos
-            logger.info(f"🕒 Aguardando {wait_time/60} minutos...")
-            time.sleep(wait_time)
-            
+
         except Exception as e:
-            logger.error(f"❌ Erro inesperado no login: {e}")
-            if attempt == max_retries - 1:
-                return False
-            time.sleep(30)
-    
+            if is_challenge_required(e):
+                logger.warning("⚠️ Verificação de segurança necessária. Verifique o app do Instagram.")
+                if attempt == max_retries - 1:
+                    logger.error("❌ Falha no login após múltiplas tentativas")
+                    return False
+                wait_before_retry(30, deadline)
+
+            elif is_throttle_error(e):
+                logger.warning(f"⏳ Instagram solicitou pausa: {e}")
+                wait_time = 600  # 10 minutos
+                logger.info(f"🕒 Aguardando {wait_time/60} minutos...")
+                wait_before_retry(wait_time, deadline)
+
+            else:
+                logger.error(f"❌ Erro inesperado no login: {e}")
+                if attempt == max_retries - 1:
+                    return False
+                wait_before_retry(30, deadline)
+
     return False
 
 # =========================
-# 📊 OBTER DADOS
+# 🎯 FUNÇÃO PRINCIPAL
 # =========================
-def get_user_data(client):
-    """Obtém lista de seguidores e seguindo"""
-    try:
-        logger.info("📥 Obtendo lista de seguidores...")
-        followers = client.user_followers(client.user_id)
-        logger.info(f"✅ {len(followers)} seguidores encontrados.")
-
-        logger.info("📤 Obtendo lista de quem você segue...")
-        following = client.user_following(client.user_id)
-        logger.info(f"✅ Você segue {len(following)} contas.\n")
-        
-        return followers, following
-        
-    except PleaseWaitFewMinutes as e:
-        logger.error(f"⏳ Limitação do Instagram: {e}")
-        raise
-    except Exception as e:
-        logger.error(f"❌ Erro ao obter dados: {e}")
-        raise
+def main():
+    """Função principal do script"""
+    from dotenv import load_dotenv
 
-# =========================
-# 🔍 IDENTIFICAR NÃO-SEGUIDORES
-# =========================
-def find_non_followers(followers, following):
-    """Encontra contas que não seguem de volta"""
-    followers_ids = set(followers.keys())
-    following_ids = set(following.keys())
+    load_dotenv()
+    setup_logging()
 
-    non_followers_ids = following_ids - followers_ids
-    non_followers = [following[uid] for uid in non_followers_ids]
+    # Validação das credenciais
+    config = load_config()
+    if not config["username"] or not config["password"]:
+        logger.error("❌ Credenciais não encontradas. Configure as variáveis de ambiente.")
+        sys.exit(1)
+    max_retries = int(os.getenv('MAX_RETRIES', MAX_RETRIES))
+    # Prazo (RUN_DEADLINE_MINUTES) contado desde o início do processo
+    deadline = create_deadline(config)
 
-    logger.info(f"🔎 Encontradas {len(non_followers)} contas que não te seguem de volta.\n")
-    
-    return non_followers
+    # Métricas no formato do Prometheus (só com METRICS_FILE definido)
+    metrics = Metrics({"account": config["username"]}) if config["metrics_file"] else None
+    profiler = start_profiler(PROFILE_FILE)
+    started = time.monotonic()
+    ok = False
 
-# =========================
-# 🚫 EXECUTAR UNFOLLOWS
-# =========================
-def execute_unfollows(client, non_followers, max_unfollows, sleep_time):
-    """Executa o processo de unfollow"""
-    count = 0
-    logger.info(f"🚀 Iniciando unfollow de até {max_unfollows} contas...\n")
+    try:
+        # Criar cliente e fazer login
+        with phase(profiler, "login"):
+            cl = create_client(config)
+            if metrics is not None:
+                instrument(cl, metrics)
+            logged_in = login_with_retry(cl, config, max_retries, metrics, deadline)
+        if not logged_in:
+            sys.exit(1)
+        startup.lap("sessão")
 
-    for user in non_followers[:max_unfollows]:
+        # Ritmo adaptativo salvo da última execução
+        fetch_pacer, pacer = load_pacers(
+            config, limiter_from_env(config["sleep_between_actions"]), deadline
+        )
         try:
-            client.user_unfollow(user.pk)
-            logger.info(f"❌ Deixou de seguir: @{user.username}")
-            count += 1
-            
-            # Progresso
-            if count % 10 == 0:
-                logger.info(f"📊 Progresso: {count}/{min(len(non_followers), max_unfollows)}")
-            
-            time.sleep(sleep_time)
-
-        except PleaseWaitFewMinutes as e:
-            logger.warning(f"⏳ Aguardando devido a limitação: {e}")
-            logger.info("🕒 Aguardando 10 minutos...")
-            time.sleep(600)
-            continue
-
-        except Exception as e:
-            logger.error(f"⚠️ Erro ao deixar de seguir @{user.username}: {e}")
-            time.sleep(30)  # Espera mais tempo em caso de erro
-            continue
+            # Retomar o plano salvo ou obter dados e encontrar não-seguidores
+            plan, _ = prepare_plan(cl, config, fetch_pacer, profiler=profiler)
+            startup.lap("plano e busca")
+
+            if not plan.queue.remaining:
+                logger.info("✅ Nenhum unfollow necessário.")
+                ok = True
+                return
+
+            # Executar unfollows
+            unfollowed, _ = execute_plan(cl, plan, pacer, config["max_unfollows"], startup,
+                                         metrics=metrics, profiler=profiler)
+            ok = True
+        finally:
+            save_pacers(config, fetch_pacer, pacer)
+            save_session(cl, config)
+            if metrics is not None:
+                export_metrics(metrics, config, fetch_pacer, pacer,
+                               round(time.monotonic() - started, 3), ok)
+
+        logger.info(f"✅ Processo concluído! {len(unfollowed)} contas deixadas de seguir.")
 
-    return count
-
-# =========================
-# 🎯 FUNÇÃO PRINCIPAL
-# =========================
-def main():
-    """Função principal do script"""
-    try:
-        # Criar cliente
-        cl = create_client()
-        
-        # Fazer login
-        if not login_with_retry(cl, USERNAME, PASSWORD, MAX_RETRIES):
-            sys.exit(1)
-        
-        # Obter dados
-        followers, following = get_user_data(cl)
-        
-        # Encontrar não-seguidores
-        non_followers = find_non_followers(followers, following)
-        
-        if not non_followers:
-            logger.info("✅ Nenhum unfollow necessário.")
-            return
-        
-        # Executar unfollows
-        count = execute_unfollows(cl, non_followers, MAX_UNFOLLOWS, SLEEP_BETWEEN_ACTIONS)
-        
-        logger.info(f"✅ Processo concluído! {count} contas deixadas de seguir.")
-        
     except KeyboardInterrupt:
         logger.info("⏹️ Processo interrompido pelo usuário.")
+    except DeadlineReached as e:
+        logger.info(f"⏱️ Prazo da execução ({e}). Estado salvo; a próxima execução continua.")
     except Exception as e:
         logger.error(f"❌ Erro fatal: {e}")
         sys.exit(1)
+    finally:
+        if profiler is not None:
+            logger.info(f"🔬 Perfil salvo em {profiler.finish()}")
 
 if __name__ == "__main__":
     main()
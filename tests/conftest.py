@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from core.ratelimit import FakeClock  # noqa: E402
+
+
+@pytest.fixture
+def clock():
+    return FakeClock(1000.0)
@@ -0,0 +1,67 @@
+import pytest
+
+from core import idset
+from core.archive import SnapshotArchive, archive_lists
+from core.idstream import IdSpool
+
+
+@pytest.fixture(autouse=True)
+def without_numpy(monkeypatch):
+    # O caminho do requirements.txt: colunas em array("q")
+    monkeypatch.setattr(idset, "_np", None)
+
+
+def test_round_trip(tmp_path):
+    archive = SnapshotArchive(str(tmp_path))
+    archive.save(["30", "10", "20", "10"], [5, 2**40], day="2026-10-01")
+    snapshot = archive.load("2026-10-01")
+    assert list(snapshot.followers) == [10, 20, 30]
+    assert list(snapshot.following) == [5, 2**40]
+
+    only = archive.load("2026-10-01", ("following",))
+    assert only.followers is None
+    assert list(only.following) == [5, 2**40]
+
+
+def test_presorted_stream_matches_regular_save(tmp_path):
+    spool = IdSpool(memory_limit=800)  # vários runs em disco
+    for uid in range(300_000, 0, -3):
+        spool.add(uid)
+    followers = list(range(3, 300_001, 3))
+    archive = SnapshotArchive(str(tmp_path))
+    try:
+        archive_lists(str(tmp_path), (uid for uid, _ in spool), iter(()), "2026-10-02",
+                      presorted=True)
+    finally:
+        spool.close()
+    archive.save(followers, [], day="2026-10-03")
+
+    streamed = archive.load("2026-10-02")
+    assert list(streamed.followers) == followers
+    assert len(streamed.following) == 0
+    assert (tmp_path / "2026-10-02.ids").read_bytes().split(b"\n", 2)[2] == \
+        (tmp_path / "2026-10-03.ids").read_bytes().split(b"\n", 2)[2]
+
+
+def test_presorted_rejects_unsorted_ids(tmp_path):
+    with pytest.raises(ValueError):
+        archive_lists(str(tmp_path), [1, 3, 2], [], "2026-10-04", presorted=True)
+    assert not (tmp_path / "2026-10-04.ids").exists()
+
+
+def test_churn_and_retention(tmp_path):
+    archive = SnapshotArchive(str(tmp_path))
+    archive.save([1, 2, 3, 4], [1, 2, 9], day="2026-10-01")
+    archive.save([2, 3, 4, 5, 6], [2, 9], day="2026-10-02")
+
+    (row,) = archive.churn()
+    assert (row.day, row.followers, row.gained, row.lost) == ("2026-10-02", 5, 2, 1)
+    assert row.churn_rate == pytest.approx(0.25)
+
+    gained, lost = archive.changes()
+    assert list(gained) == [5, 6]
+    assert list(lost) == [1]
+
+    curve = archive.retention()
+    assert [(point.retained, point.rate) for point in curve] == [(2, 1.0), (1, 0.5)]
+    assert list(archive.followed_back(["6", "7", "1"])) == [6]
@@ -0,0 +1,76 @@
+from core.bloom import BloomFilter, open_or_build
+
+
+# =========================
+# 🌸 FILTRO DE BLOOM
+# =========================
+def test_bloom_membership(tmp_path):
+    bloom = BloomFilter.create(str(tmp_path / "h.bloom"), capacity=1000)
+    for pk in range(500):
+        bloom.add(str(pk))
+    assert all(str(pk) in bloom for pk in range(500))
+    false_positives = sum(str(pk) in bloom for pk in range(10_000, 20_000))
+    assert false_positives < 50
+    bloom.close()
+
+
+def test_bloom_persists_bits_and_count(tmp_path):
+    path = str(tmp_path / "h.bloom")
+    bloom = BloomFilter.create(path, capacity=100)
+    bloom.add("42")
+    bloom.close()
+
+    reopened = BloomFilter.open(path)
+    assert "42" in reopened
+    assert reopened.count == 1
+    reopened.close()
+
+
+def test_bloom_count_merges_across_instances(tmp_path):
+    path = str(tmp_path / "h.bloom")
+    BloomFilter.create(path, capacity=100).close()
+    first = BloomFilter.open(path)
+    second = BloomFilter.open(path)
+    for pk in range(5):
+        first.add(f"a{pk}")
+        second.add(f"b{pk}")
+    first.close()
+    second.close()
+    assert BloomFilter.open(path).count == 10
+
+
+def test_open_or_build_rebuilds_saturated_filter(tmp_path):
+    path = str(tmp_path / "h.bloom")
+    ids = [str(pk) for pk in range(30)]
+    bloom = open_or_build(path, lambda: ids[:5], capacity=10)
+    for user_id in ids:
+        bloom.add(user_id)
+    bloom.close()
+    assert BloomFilter.open(path).is_saturated
+
+    rebuilt = open_or_build(path, lambda: ids, capacity=10)
+    assert rebuilt.capacity == 20
+    assert rebuilt.count == 30
+    rebuilt.close()
+
+
+def test_synced_mark_and_source_swap(tmp_path):
+    path = str(tmp_path / "h.bloom")
+    bloom = BloomFilter.create(path, capacity=100)
+    bloom.add("1")
+    bloom.mark_synced(7)
+    bloom.close()
+
+    assert open_or_build(path, max_synced=7).synced == 7
+    rebuilt = open_or_build(path, max_synced=3)
+    assert rebuilt.synced == 0
+    assert "1" not in rebuilt
+    rebuilt.close()
+
+
+def test_old_format_is_rebuilt(tmp_path):
+    path = tmp_path / "h.bloom"
+    path.write_bytes(b"UFBLOOM1" + bytes(64))
+    bloom = open_or_build(str(path), lambda: ["1"], capacity=10)
+    assert "1" in bloom
+    bloom.close()
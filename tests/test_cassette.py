@@ -0,0 +1,86 @@
+import gzip
+
+import pytest
+
+from benchmarks import fake_instagram
+from benchmarks.fake_instagram import FIRST_PK, Client
+from core.cassette import CassetteExhausted, read_cassette, record, replay_client
+from core.idstream import fetch_list
+from core.pacing import is_throttle_error
+
+
+@pytest.fixture
+def cassette(tmp_path):
+    """Grava um dia com listas paginadas, perfis, um unfollow e uma limitação"""
+    backend = fake_instagram.configure(following=120, followers=90, mutual=0.5)
+    path = str(tmp_path / "day.jsonl.gz")
+    cl = record(Client(), path)
+    cl.login("conta", "segredo")
+    recorded = {
+        "followers": fetch_list(cl, "followers", cl.user_id, page_size=50),
+        "following": fetch_list(cl, "following", cl.user_id, page_size=50),
+        "info": cl.user_info(str(FIRST_PK + 7)),
+        "unfollow": cl.user_unfollow(str(FIRST_PK + 100)),
+    }
+    backend.throttle_rate = 1.0
+    with pytest.raises(fake_instagram.PleaseWaitFewMinutes):
+        cl.user_unfollow(str(FIRST_PK + 101))
+    cl.cassette.close()
+    return path, recorded
+
+
+def test_recording_keeps_no_credentials(cassette):
+    path, _ = cassette
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert "segredo" not in f.read()
+    header, entries = read_cassette(path)
+    assert header["cassette"] == 1
+    assert [entry["m"] for entry in entries].count("user_following_v1_chunk") == 3
+    login = entries[0]
+    assert login["m"] == "login" and "a" not in login and "r" not in login
+
+
+def test_replay_returns_recorded_responses(cassette):
+    path, recorded = cassette
+    fake_instagram.configure(following=0)  # nada vem do servidor falso
+    cl = replay_client(path, speed=0)
+
+    assert cl.login("conta", "outra senha")
+    assert cl.user_id == str(fake_instagram.OWNER_PK)
+    following = fetch_list(cl, "following", cl.user_id, page_size=50)
+    assert list(following) == list(recorded["following"])
+    assert following[str(FIRST_PK)].username == recorded["following"][str(FIRST_PK)].username
+
+    # Fora de ordem: os argumentos escolhem a resposta certa
+    info = cl.user_info(str(FIRST_PK + 7))
+    assert (info.pk, info.follower_count) == (recorded["info"].pk, recorded["info"].follower_count)
+    followers = fetch_list(cl, "followers", cl.user_id, page_size=50)
+    assert list(followers) == list(recorded["followers"])
+
+    # Outro alvo recebe a próxima resposta gravada, inclusive a limitação
+    assert cl.user_unfollow(str(FIRST_PK + 5)) == recorded["unfollow"]
+    with pytest.raises(Exception) as info:
+        cl.user_unfollow(str(FIRST_PK + 6))
+    assert type(info.value).__name__ == "PleaseWaitFewMinutes"
+    assert is_throttle_error(info.value)
+
+    with pytest.raises(CassetteExhausted):
+        cl.user_unfollow(str(FIRST_PK + 8))
+    assert cl.player.remaining == 0
+    assert cl.player.stats["throttled"] == 1
+    assert cl.player.stats["missed"] == 1
+
+
+def test_truncated_recording_is_readable(cassette, tmp_path):
+    path, _ = cassette
+    with gzip.open(path, "rb") as f:
+        data = f.read()
+    cut = str(tmp_path / "cut.jsonl.gz")
+    with gzip.open(cut, "wb") as f:
+        f.write(data[:-20])
+    _, entries = read_cassette(cut)
+    assert 0 < len(entries) < len(read_cassette(path)[1])
+
+    (tmp_path / "not.gz").write_bytes(gzip.compress(b'{"other": 1}\n'))
+    with pytest.raises(ValueError):
+        read_cassette(str(tmp_path / "not.gz"))
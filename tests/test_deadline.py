@@ -0,0 +1,24 @@
+import pytest
+
+from core.deadline import Deadline, DeadlineReached
+from core.ratelimit import BudgetExhausted
+
+
+# =========================
+# ⏳ PRAZO
+# =========================
+def test_deadline_available_and_capacity(clock):
+    deadline = Deadline(3600, margin=60, clock=clock.now)
+    assert deadline.available == 3540
+    assert deadline.capacity(rate_per_hour=60) == 1 + 59
+    clock.advance(3540)
+    assert deadline.capacity(rate_per_hour=60) == 0
+
+
+def test_deadline_check(clock):
+    deadline = Deadline(100, margin=10, clock=clock.now)
+    deadline.check(90)
+    with pytest.raises(DeadlineReached) as info:
+        deadline.check(91)
+    assert info.value.available == 90
+    assert isinstance(info.value, BudgetExhausted)
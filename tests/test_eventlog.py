@@ -0,0 +1,69 @@
+import io
+import logging
+
+import pytest
+
+from core.eventlog import (CompressedRotatingFileHandler, JsonlFormatter, configure_logging,
+                           event, read_events, stop_logging)
+
+
+@pytest.fixture
+def root_logger():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield root
+    stop_logging()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_events_reach_console_and_jsonl(tmp_path, root_logger):
+    path = str(tmp_path / "logs" / "events.jsonl")
+    console = io.StringIO()
+    configure_logging(jsonl_file=path, stream=console)
+
+    logger = logging.getLogger("unfollow")
+    logger.info("❌ Deixou de seguir: @fulano",
+                extra=event("unfollow", user_id="123", outcome="done", latency_ms=None))
+    logger.warning("⚠️ Pausa")
+    stop_logging()
+
+    assert console.getvalue() == "❌ Deixou de seguir: @fulano\n⚠️ Pausa\n"
+    first, second = read_events(path)
+    assert first["message"] == "❌ Deixou de seguir: @fulano"
+    assert (first["action"], first["user_id"], first["outcome"]) == ("unfollow", "123", "done")
+    assert "latency_ms" not in first
+    assert (second["level"], second["logger"]) == ("WARNING", "unfollow")
+    assert [data["user_id"] for data in read_events(path, action="unfollow")] == ["123"]
+
+
+def test_rotation_by_size_keeps_compressed_backups(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    handler = CompressedRotatingFileHandler(path, max_bytes=300, rotate_hours=0, backup_count=2)
+    handler.setFormatter(JsonlFormatter())
+    logger = logging.getLogger("test_eventlog.rotation")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        for i in range(20):
+            logger.warning("linha", extra=event("tick", index=i))
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+    assert (tmp_path / "events.jsonl.1.gz").exists()
+    assert (tmp_path / "events.jsonl.2.gz").exists()
+    assert not (tmp_path / "events.jsonl.3.gz").exists()
+    indexes = [data["index"] for data in read_events(path)]
+    assert indexes == list(range(indexes[0], 20))
+    assert indexes[0] > 0
+
+
+def test_read_events_skips_truncated_lines(tmp_path):
+    path = tmp_path / "events.jsonl"
+    path.write_text('{"action": "unfollow"}\n\n{"action": "unf', encoding="utf-8")
+    assert list(read_events(str(path))) == [{"action": "unfollow"}]
+    assert list(read_events(str(tmp_path / "missing.jsonl"))) == []
@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from core.exclusion import ExclusionFile, ExclusionList, load_exclusions
+from core.idstream import UserRef
+
+RULES = """
+# contas protegidas
+123456789
+id:42            # outro ID
+@Amigo
+marca*
+*_official
+*loja*
+user_??
+re:^team_\\d+$
+"""
+
+
+@pytest.fixture
+def rules():
+    return ExclusionList(RULES.splitlines())
+
+
+@pytest.mark.parametrize("user_id, username", [
+    ("123456789", "qualquer"),
+    (42, None),
+    ("1", "amigo"),
+    ("1", "AMIGO"),
+    ("1", "marcaoficial"),
+    ("1", "brand_official"),
+    ("1", "minhaloja1"),
+    ("1", "user_ab"),
+    ("1", "Team_7"),
+])
+def test_protected(rules, user_id, username):
+    assert rules.matches(user_id, username)
+
+
+@pytest.mark.parametrize("user_id, username", [
+    ("987", "amigos"),
+    ("987", "amarca"),
+    ("987", "official_brand"),
+    ("987", "user_abc"),
+    ("987", "team_x"),
+    ("987", None),
+])
+def test_not_protected(rules, user_id, username):
+    assert not rules.matches(user_id, username)
+
+
+def test_rules_are_compiled_by_kind(rules):
+    assert rules.ids == {"123456789", "42"}
+    assert rules.usernames == {"amigo"}
+    assert len(rules) == 8
+
+
+def test_filter_counts_skipped(rules):
+    candidates = [(UserRef("1", "amigo"), 0), (UserRef("2", "fulano"), 1),
+                  (UserRef("42", "outro"), 2)]
+    assert list(rules.filter(candidates)) == [(UserRef("2", "fulano"), 1)]
+    assert rules.skipped == 2
+
+
+def test_invalid_regex_names_the_rule():
+    with pytest.raises(ValueError, match="Regra 2"):
+        ExclusionList(["@amigo", "re:team_("])
+
+
+def test_file_is_reloaded_when_it_changes(tmp_path):
+    path = tmp_path / "exclusions.txt"
+    excluded = ExclusionFile(str(path))
+    assert not excluded.refresh()
+    assert len(excluded.rules) == 0
+
+    path.write_text("@amigo\n", encoding="utf-8")
+    assert excluded.refresh()
+    assert excluded.rules.matches("1", "amigo")
+
+    # Um erro depois da primeira leitura mantém as regras anteriores
+    path.write_text("re:(\n", encoding="utf-8")
+    os.utime(path, ns=(1, 1))
+    assert not excluded.refresh()
+    assert excluded.rules.matches("1", "amigo")
+
+
+def test_load_exclusions(tmp_path):
+    assert load_exclusions(None) is None
+    path = tmp_path / "exclusions.txt"
+    assert load_exclusions(str(path)) is None
+    path.write_text("marca*\n", encoding="utf-8")
+    assert load_exclusions(str(path)).matches("1", "marca_x")
@@ -0,0 +1,104 @@
+import threading
+import time
+
+import pytest
+
+from benchmarks import fake_instagram
+from benchmarks.fake_instagram import Client
+from core.fetch import SharedPacer, clone_client, fetch_both, on_clone
+from core.metrics import Metrics, instrument
+from core.pacing import AdaptivePacer
+from core.ratelimit import MonotonicClock, RateLimiter
+from core.session import CACHED, LOGGED_IN, SessionManager
+
+
+@pytest.fixture
+def backend():
+    return fake_instagram.configure(following=300, followers=250, mutual=0.5)
+
+
+def _client(tmp_path, metrics=None):
+    seed = Client()
+    SessionManager(seed, "conta", "senha", str(tmp_path / "session.json")).login()
+    cl = Client()
+    if metrics is not None:
+        instrument(cl, metrics)
+    manager = SessionManager(cl, "conta", "senha", str(tmp_path / "session.json"))
+    assert manager.restore() == CACHED
+    return cl, manager
+
+
+def test_fetch_both_matches_sequential_lists(tmp_path, backend):
+    cl, _ = _client(tmp_path)
+    followers, following = fetch_both(cl, page_size=50)
+    assert set(followers) == set(backend.all_users("followers"))
+    assert set(following) == set(backend.all_users("following"))
+
+
+def test_clone_keeps_metrics_and_session_renewal(tmp_path, backend):
+    metrics = Metrics()
+    cl, manager = _client(tmp_path, metrics)
+    # O Instagram recusa a sessão do clone na primeira página de "seguindo"
+    cl.clone_hooks.insert(0, lambda clone: setattr(clone, "logged_in", False))
+
+    followers, following = fetch_both(cl, page_size=100)
+
+    assert len(following) == 300
+    assert manager.mode == LOGGED_IN
+    assert manager.renewals == 1
+    assert backend.calls["login"] == 2
+    assert metrics.value("instagram_request_seconds", method="user_following_v1_chunk") == 4
+    assert metrics.value("instagram_request_errors_total", method="user_following_v1_chunk",
+                         error="LoginRequired") == 1
+    assert metrics.value("instagram_request_seconds", method="user_followers_v1_chunk") == 3
+
+
+def test_clone_hooks_run_in_order(backend):
+    cl = Client()
+    calls = []
+    on_clone(cl, lambda clone: calls.append("primeiro"))
+    on_clone(cl, lambda clone: calls.append("segundo"))
+    clone = clone_client(cl)
+    assert calls == ["primeiro", "segundo"]
+    assert clone is not cl
+
+
+def _shared(interval=0.2):
+    limiter = RateLimiter(interval, clock=MonotonicClock())
+    return SharedPacer(AdaptivePacer(limiter, 3600 / interval, 1, 36000, base_backoff=0.3))
+
+
+def test_shared_pacer_sleeps_outside_the_lock():
+    pacer = _shared()
+    pacer.wait()  # primeira vez: liberada na hora
+    finished = []
+
+    def take_turn():
+        pacer.wait()
+        finished.append(time.monotonic())
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=take_turn) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Vezes reservadas em sequência (0,2 s e 0,4 s), esperadas em paralelo
+    assert max(finished) - started < 0.55
+    assert pacer.pacer.limiter.acquired == 3
+
+
+def test_shared_pacer_throttle_pauses_both_threads():
+    pacer = _shared(interval=0.01)
+    pacer.wait()
+    assert pacer.on_throttle() == pytest.approx(0.3)
+    waits = []
+    threads = [threading.Thread(target=lambda: waits.append(pacer.wait())) for _ in range(2)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert min(waits) > 0.25
+    assert time.monotonic() - started < 0.5
+    assert pacer.pacer.backoff_total == pytest.approx(0.3)
@@ -0,0 +1,183 @@
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+from core.history_store import HistoryStore
+from core.idstream import UserRef
+
+from conftest import REPO_ROOT
+
+
+# =========================
+# 🗃️ HISTÓRICO
+# =========================
+def _store(tmp_path):
+    return HistoryStore(str(tmp_path / "h.db"), bloom_path=str(tmp_path / "h.bloom"))
+
+
+def test_filter_unfollowed(tmp_path):
+    store = _store(tmp_path)
+    store.add_unfollowed([UserRef("1", "um"), UserRef("2", "dois")])
+    assert store.filter_unfollowed(["1", 2, "3"]) == {"1", "2"}
+    assert store.history_size == 2
+    store.close()
+
+    # Sem filtro de Bloom a resposta é a mesma
+    plain = HistoryStore(str(tmp_path / "h.db"))
+    assert plain.filter_unfollowed([str(pk) for pk in range(1200)]) == {"1", "2"}
+    plain.close()
+
+
+def test_daily_counts(tmp_path):
+    store = _store(tmp_path)
+    store.add_daily_count(3, day="2026-01-01")
+    store.add_daily_count(2, day="2026-01-01")
+    store.add_daily_count(1)
+    assert store.daily_count("2026-01-01") == 5
+    assert store.daily_count() == 1
+    assert store.total_unfollowed == 6
+    assert store.last_check is not None
+    store.close()
+
+
+def test_unfollowed_ids_by_day(tmp_path):
+    store = _store(tmp_path)
+    store.add_unfollowed([UserRef("1", "um")], when=datetime(2026, 1, 1, 12))
+    store.add_unfollowed([UserRef("2", "dois")], when=datetime(2026, 1, 3, 12))
+    assert set(store.unfollowed_ids()) == {"1", "2"}
+    assert set(store.unfollowed_ids("2026-01-02")) == {"2"}
+    assert set(store.unfollowed_ids(end="2026-01-01")) == {"1"}
+    store.close()
+
+
+def test_migrate_from_json_once(tmp_path):
+    json_path = tmp_path / "unfollow_history.json"
+    json_path.write_text(json.dumps({
+        "unfollowed_users": [{"user_id": 7, "username": "sete",
+                              "unfollowed_at": "2026-01-01T10:00:00"}],
+        "daily_unfollows": {"2026-01-01": 1},
+        "total_unfollowed": 1,
+        "last_check": "2026-01-01T10:00:00",
+    }), encoding="utf-8")
+
+    store = _store(tmp_path)
+    assert store.migrate_from_json(str(json_path))
+    assert not json_path.exists()
+    assert store.filter_unfollowed(["7"]) == {"7"}
+    assert store.daily_count("2026-01-01") == 1
+    assert store.total_unfollowed == 1
+    assert not store.migrate_from_json(str(json_path))
+    store.close()
+
+
+def test_bloom_rebuilt_from_history(tmp_path):
+    store = _store(tmp_path)
+    store.add_unfollowed([UserRef("1", "um")])
+    store.close()
+    (tmp_path / "h.bloom").unlink()
+
+    store = _store(tmp_path)
+    assert "1" in store.bloom
+    assert store.filter_unfollowed(["1"]) == {"1"}
+    store.close()
+
+
+def test_rows_written_without_filter_are_caught_up(tmp_path):
+    store = _store(tmp_path)
+    plain = HistoryStore(str(tmp_path / "h.db"))
+    plain.add_unfollowed([UserRef("5", "cinco")])
+    plain.close()
+    # Aberto antes da escrita: completa na consulta
+    assert "5" not in store.bloom
+    assert store.filter_unfollowed(["5"]) == {"5"}
+    assert store.bloom.synced == 1
+    store.close()
+
+    reopened = _store(tmp_path)
+    assert "5" in reopened.bloom
+    reopened.close()
+
+
+def test_filter_ahead_of_history_is_rebuilt(tmp_path):
+    store = _store(tmp_path)
+    store.add_unfollowed([UserRef(str(pk), None) for pk in range(3)])
+    store.close()
+    (tmp_path / "h.db").unlink()
+
+    store = _store(tmp_path)
+    store.add_unfollowed([UserRef("9", "nove")])
+    assert store.bloom.synced == 1
+    assert "0" not in store.bloom
+    assert store.filter_unfollowed(["0", "9"]) == {"9"}
+    store.close()
+
+
+_WRITE_SCRIPT = """
+import sys
+from core.history_store import HistoryStore
+from core.idstream import UserRef
+store = HistoryStore("h.db", bloom_path="h.bloom" if sys.argv[2] == "1" else None)
+for pk in range(int(sys.argv[1]), int(sys.argv[1]) + 40):
+    store.add_unfollowed([UserRef(str(pk), None)])
+store.close()
+"""
+
+
+def test_concurrent_writers_never_lose_ids(tmp_path):
+    _store(tmp_path).close()
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    # Metade dos processos escreve sem o filtro aberto
+    procs = [
+        subprocess.Popen([sys.executable, "-c", _WRITE_SCRIPT, str(index * 40), str(index % 2)],
+                         cwd=str(tmp_path), env=env)
+        for index in range(6)
+    ]
+    assert all(proc.wait(timeout=60) == 0 for proc in procs)
+
+    store = _store(tmp_path)
+    assert store.bloom.synced == 240
+    assert all(str(pk) in store.bloom for pk in range(240))
+    store.close()
+
+
+def test_readonly_store_creates_nothing(tmp_path):
+    store = HistoryStore(str(tmp_path / "h.db"), bloom_path=str(tmp_path / "h.bloom"),
+                         readonly=True)
+    assert store.history_size == 0
+    assert store.daily_count() == 0
+    assert store.bloom is None
+    store.close()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_readonly_store_reads_existing_history(tmp_path):
+    store = _store(tmp_path)
+    store.add_unfollowed([UserRef("1", "um")])
+    store.add_daily_count(1)
+    store.close()
+
+    readonly = HistoryStore(str(tmp_path / "h.db"), readonly=True)
+    assert readonly.history_size == 1
+    assert readonly.total_unfollowed == 1
+    assert set(readonly.unfollowed_ids()) == {"1"}
+    readonly.close()
+
+
+_STATS_SCRIPT = """
+import runpy, sys
+sys.argv = ["Insta.py", "stats"]
+runpy.run_path({path!r}, run_name="__main__")
+assert "core.pipeline" not in sys.modules and "core.bloom" not in sys.modules, sorted(sys.modules)
+"""
+
+
+def test_insta_stats_is_read_only(tmp_path):
+    script = _STATS_SCRIPT.format(path=os.path.join(REPO_ROOT, "Insta.py"))
+    proc = subprocess.run([sys.executable, "-c", script], cwd=str(tmp_path),
+                          env=dict(os.environ, PYTHONPATH=REPO_ROOT),
+                          capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    assert "Total de unfollows: 0" in proc.stdout
+    assert list(tmp_path.iterdir()) == []
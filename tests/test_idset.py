@@ -0,0 +1,67 @@
+import pytest
+
+from core import idset
+from core.idset import diff_ids, from_deltas, intersect, iter_ranked, subtract, to_deltas, to_id_array
+
+
+@pytest.fixture(params=["sem numpy", "com numpy"])
+def engine(request, monkeypatch):
+    if request.param == "com numpy":
+        monkeypatch.setattr(idset, "_np", pytest.importorskip("numpy"))
+    else:
+        monkeypatch.setattr(idset, "_np", None)
+    return request.param
+
+
+def _ints(ids):
+    return sorted(int(uid) for uid in ids)
+
+
+FOLLOWERS = {"1": "a", "2": "b", "5": "e", "8": "h"}
+FOLLOWING = {"1": "a", "3": "c", "4": "d", "5": "e", "9": "i"}
+
+
+def test_diff_ids(engine):
+    result = diff_ids(FOLLOWERS.keys(), FOLLOWING.keys(), exclude_ids={"4"})
+    assert _ints(result.non_followers) == [3, 4, 9]
+    assert _ints(result.candidates) == [3, 9]
+    assert (result.mutuals, result.fans) == (2, 2)
+
+
+def test_diff_ids_with_exclude_function(engine):
+    seen = []
+
+    def exclude(ids):
+        seen.extend(_ints(ids))
+        return [uid for uid in ids if int(uid) > 3]
+
+    result = diff_ids(FOLLOWERS.keys(), FOLLOWING.keys(), exclude_ids=exclude)
+    assert seen == [3, 4, 9]
+    assert _ints(result.candidates) == [3]
+
+
+def test_diff_ids_without_exclusion_or_overlap(engine):
+    result = diff_ids([], ["7", "6"])
+    assert _ints(result.non_followers) == _ints(result.candidates) == [6, 7]
+    assert (result.mutuals, result.fans) == (0, 0)
+
+
+def test_iter_ranked_follows_following_order(engine):
+    result = diff_ids(FOLLOWERS.keys(), FOLLOWING.keys())
+    assert list(iter_ranked(result.candidates, FOLLOWING)) == [("c", 1), ("d", 2), ("i", 4)]
+
+
+def test_sorted_array_operations(engine):
+    ids = to_id_array(["30", "10", "20", "10", "40"])
+    assert list(ids) == [10, 20, 30, 40]
+    assert list(subtract(ids, ["20", 40, 99])) == [10, 30]
+    assert list(intersect(ids, [40, "10", 5])) == [10, 40]
+    assert list(subtract(ids, ())) == [10, 20, 30, 40]
+
+
+def test_deltas_round_trip(engine):
+    ids = [5, 2**40, 7, 2**62]
+    raw = to_deltas(ids)
+    assert len(raw) == 8 * len(ids)
+    assert list(from_deltas(raw)) == sorted(ids)
+    assert list(from_deltas(to_deltas(()))) == []
@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+from benchmarks import fake_instagram
+from benchmarks.fake_instagram import FIRST_PK, Client
+from core.idstream import IdSpool, UserRef, collect_ids, merge_difference, take_non_followers
+
+
+def _spool(ids, memory_limit=64, with_names=False):
+    spool = IdSpool(memory_limit, with_names=with_names)
+    for uid in ids:
+        spool.add(uid, f"user{uid}" if with_names else None)
+    return spool
+
+
+def test_spool_merges_runs_in_order_without_duplicates():
+    with _spool([9, 3, 7, 3, 1, 9, 5, 2, 8, 1], memory_limit=24) as spool:
+        assert spool.spilled_runs >= 2
+        assert [uid for uid, _ in spool] == [1, 2, 3, 5, 7, 8, 9]
+        assert spool.added == 10
+        runs = list(spool._runs)
+    assert runs and not any(os.path.exists(path) for path in runs)
+
+
+def test_spool_keeps_names_through_disk_runs():
+    with _spool([30, 10, 20], memory_limit=80, with_names=True) as spool:
+        assert spool.spilled_runs >= 1
+        assert list(spool) == [(10, "user10"), (20, "user20"), (30, "user30")]
+
+
+def test_merge_difference():
+    left = [(1, "a"), (2, "b"), (4, "d"), (6, "f"), (9, "i")]
+    right = [(2, None), (3, None), (6, None)]
+    assert list(merge_difference(left, right)) == [(1, "a"), (4, "d"), (9, "i")]
+    assert list(merge_difference(left, [])) == left
+    assert list(merge_difference([], right)) == []
+
+
+def test_take_non_followers_with_exclusion():
+    following = _spool(range(1, 21), with_names=True)
+    followers = _spool(range(2, 21, 2))
+    excluded = []
+
+    def exclude(ids):
+        ids = list(ids)
+        excluded.append(len(ids))
+        return {str(uid) for uid in ids if uid in (5, 7)}
+
+    with following, followers:
+        targets, total = take_non_followers(followers, following, limit=3, exclude=exclude)
+    assert targets == [UserRef("1", "user1"), UserRef("3", "user3"), UserRef("9", "user9")]
+    assert total == 8
+    assert excluded == [10]
+
+
+def test_take_non_followers_uses_priority():
+    following = _spool(range(1, 7), with_names=True)
+    followers = _spool([2])
+    with following, followers:
+        targets, total = take_non_followers(followers, following, limit=2,
+                                            scorers=[_highest_id])
+    assert [user.pk for user in targets] == ["6", "5"]
+    assert total == 5
+
+
+def _highest_id(user, rank):
+    assert rank is None
+    return int(user.pk)
+
+
+@pytest.fixture
+def backend():
+    return fake_instagram.configure(following=450, followers=300, mutual=0.4)
+
+
+def test_collect_ids_matches_full_lists(backend):
+    cl = Client()
+    cl.login("conta", "senha")
+    with collect_ids(cl, cl.user_id, "followers", memory_limit=512, page_size=100) as followers, \
+            collect_ids(cl, cl.user_id, "following", memory_limit=2048, page_size=100,
+                        with_names=True) as following:
+        assert followers.spilled_runs > 0
+        assert [uid for uid, _ in followers] == sorted(int(pk) for pk in backend.all_users("followers"))
+        targets, total = take_non_followers(followers, following)
+    assert total == 450 - 180
+    assert targets[0] == UserRef(str(FIRST_PK + 180), f"user{FIRST_PK + 180}")
+    assert backend.calls["user_followers_v1_chunk"] == 3
@@ -0,0 +1,107 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from core.ledger import RateLedger
+from core.ratelimit import FakeClock, RateLimiter
+
+from conftest import REPO_ROOT
+
+
+@pytest.fixture
+def wall():
+    # Início alinhado aos baldes de todas as janelas
+    return FakeClock(1_800_000.0)
+
+
+def _ledger(tmp_path, wall, limits, account="conta"):
+    return RateLedger(str(tmp_path / "ledger.db"), account, limits, clock=wall.now)
+
+
+def test_minute_window(tmp_path, wall):
+    ledger = _ledger(tmp_path, wall, {"minute": 3})
+    assert [ledger.try_acquire() for _ in range(3)] == [0, 0, 0]
+    wait = ledger.try_acquire()
+    # O balde mais antigo sai da janela inteiro: espera até 65 s
+    assert 60 < wait <= 65
+    assert ledger.counts()["minute"] == 3
+
+    wall.advance(wait)
+    assert ledger.time_until_available() == 0
+    assert ledger.try_acquire() == 0
+    assert ledger.describe() == "1/3 no minuto"
+
+
+def test_all_windows_checked(tmp_path, wall):
+    ledger = _ledger(tmp_path, wall, {"minute": 10, "hour": 2, "day": 100})
+    ledger.try_acquire()
+    ledger.try_acquire()
+    assert ledger.time_until_available() > 3000
+    assert ledger.counts() == {"minute": 2, "hour": 2, "day": 2}
+
+
+def test_accounts_are_independent(tmp_path, wall):
+    first = _ledger(tmp_path, wall, {"minute": 1})
+    second = _ledger(tmp_path, wall, {"minute": 1}, account="outra")
+    assert first.try_acquire() == 0
+    assert second.try_acquire() == 0
+    assert first.try_acquire() > 0
+
+
+def test_shared_between_instances(tmp_path, wall):
+    first = _ledger(tmp_path, wall, {"hour": 2})
+    second = _ledger(tmp_path, wall, {"hour": 2})
+    assert first.try_acquire() == 0
+    assert second.try_acquire() == 0
+    assert first.try_acquire() > 0
+    assert second.try_acquire() > 0
+
+
+def test_prune_drops_old_buckets(tmp_path, wall):
+    ledger = _ledger(tmp_path, wall, {"day": 5})
+    ledger.try_acquire()
+    wall.advance(2 * 86400)
+    ledger.prune()
+    assert ledger.counts() == {"minute": 0, "hour": 0, "day": 0}
+
+
+def test_unknown_window():
+    with pytest.raises(ValueError):
+        RateLedger(":memory:", "conta", {"week": 10})
+
+
+def test_limiter_waits_for_ledger(tmp_path, wall):
+    limiter = RateLimiter(interval=1, burst=10, clock=wall)
+    limiter.ledger = _ledger(tmp_path, wall, {"minute": 2})
+    waits = [limiter.acquire() for _ in range(3)]
+    assert waits[:2] == [0, 0]
+    assert 60 < waits[2] <= 65
+    assert wall.slept == waits[2]
+    # As duas primeiras saíram da janela: resta uma vaga neste minuto
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+
+
+_CLAIM_SCRIPT = """
+import sys
+from core.ledger import RateLedger
+ledger = RateLedger(sys.argv[1], "conta", {"hour": int(sys.argv[2])})
+print(sum(ledger.try_acquire() == 0 for _ in range(int(sys.argv[3]))))
+"""
+
+
+def test_processes_never_share_a_slot(tmp_path):
+    path = str(tmp_path / "ledger.db")
+    RateLedger(path, "conta").close()  # cria o arquivo antes da disputa
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    procs = [
+        subprocess.Popen([sys.executable, "-c", _CLAIM_SCRIPT, path, "25", "20"],
+                         cwd=str(tmp_path), env=env, stdout=subprocess.PIPE, text=True)
+        for _ in range(6)
+    ]
+    claimed = [int(proc.communicate(timeout=60)[0]) for proc in procs]
+    assert all(proc.returncode == 0 for proc in procs)
+    assert sum(claimed) == 25
+    assert RateLedger(path, "conta").counts()["hour"] == 25
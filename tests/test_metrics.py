@@ -0,0 +1,95 @@
+import urllib.request
+
+import pytest
+
+from benchmarks import fake_instagram
+from benchmarks.fake_instagram import Client, PleaseWaitFewMinutes
+from core.metrics import COUNTER, Metrics, instrument, record_pacing
+from core.pacing import AdaptivePacer
+from core.ratelimit import RateLimiter
+
+
+def test_render_counters_gauges_and_histograms():
+    metrics = Metrics(labels={"account": "conta"}, buckets=(0.1, 1))
+    metrics.inc("runs_total", help_text="Execuções")
+    metrics.inc("runs_total", 2)
+    metrics.set("rate", 12.5, note='diz "oi"\n')
+    metrics.observe("latency_seconds", 0.05)
+    metrics.observe("latency_seconds", 0.5)
+    metrics.observe("latency_seconds", 5)
+
+    assert metrics.value("runs_total") == 3
+    assert metrics.value("latency_seconds") == 3
+    assert metrics.value("missing") == 0
+    assert metrics.render().splitlines() == [
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{account="conta",le="0.1"} 1',
+        'latency_seconds_bucket{account="conta",le="1"} 2',
+        'latency_seconds_bucket{account="conta",le="+Inf"} 3',
+        'latency_seconds_sum{account="conta"} 5.55',
+        'latency_seconds_count{account="conta"} 3',
+        "# TYPE rate gauge",
+        'rate{account="conta",note="diz \\"oi\\"\\n"} 12.5',
+        "# HELP runs_total Execuções",
+        "# TYPE runs_total counter",
+        'runs_total{account="conta"} 3',
+    ]
+
+
+def test_kind_is_fixed_per_name():
+    metrics = Metrics()
+    metrics.inc("total")
+    with pytest.raises(ValueError):
+        metrics.observe("total", 1)
+    metrics.set("total", 7, kind=COUNTER)
+    assert metrics.value("total") == 7
+
+
+def test_write_and_serve(tmp_path):
+    metrics = Metrics()
+    metrics.inc("runs_total")
+    path = tmp_path / "textfile" / "unfollow.prom"
+    metrics.write(str(path))
+    assert path.read_text(encoding="utf-8") == metrics.render()
+    assert not (tmp_path / "textfile" / "unfollow.prom.tmp").exists()
+
+    server = metrics.serve(0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            assert response.read().decode("utf-8") == metrics.render()
+    finally:
+        metrics.close()
+
+
+def test_instrument_counts_errors_and_throttles():
+    fake_instagram.configure(following=10, throttle_rate=1.0)
+    metrics = Metrics()
+    cl = Client()
+    instrument(cl, metrics)
+    cl.login("conta", "senha")
+
+    with pytest.raises(PleaseWaitFewMinutes):
+        cl.user_unfollow(str(fake_instagram.FIRST_PK))
+
+    assert metrics.value("instagram_request_seconds", method="login") == 1
+    assert metrics.value("instagram_request_seconds", method="user_unfollow") == 1
+    assert metrics.value("instagram_request_errors_total", method="user_unfollow",
+                         error="PleaseWaitFewMinutes") == 1
+    assert metrics.value("instagram_throttles_total", method="user_unfollow") == 1
+
+
+def test_record_pacing(clock):
+    metrics = Metrics()
+    fetch = AdaptivePacer(RateLimiter(10, clock=clock), 360, 1, 3600)
+    unfollow = AdaptivePacer(RateLimiter(60, clock=clock), 60, 1, 3600, base_backoff=30)
+    fetch.wait()
+    fetch.wait()
+    unfollow.on_throttle()
+
+    record_pacing(metrics, fetch, unfollow)
+    assert metrics.value("unfollow_sleep_seconds_total", pacer="fetch",
+                         reason="ritmo") == pytest.approx(10)
+    assert metrics.value("unfollow_sleep_seconds_total", pacer="unfollow",
+                         reason="limitacao") == pytest.approx(30)
+    assert metrics.value("unfollow_pacing_rate_per_hour", pacer="unfollow") < 60
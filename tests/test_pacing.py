@@ -0,0 +1,105 @@
+import json
+import math
+
+import pytest
+
+from benchmarks.fake_instagram import ClientError, FeedbackRequired, PleaseWaitFewMinutes
+from core.deadline import Deadline, DeadlineReached
+from core.pacing import AdaptivePacer, is_throttle_error, load_pacer, save_pacer
+from core.ratelimit import RateLimiter
+
+
+# =========================
+# 📈 RITMO ADAPTATIVO
+# =========================
+def _pacer(clock, **kwargs):
+    limiter = RateLimiter(interval=36, clock=clock)
+    return AdaptivePacer(limiter, rate=100, min_rate=10, max_rate=200, **kwargs)
+
+
+def test_pacer_additive_increase_up_to_max(clock):
+    pacer = _pacer(clock, increase=50)
+    pacer.on_success()
+    assert pacer.rate == 150
+    assert pacer.limiter.base.rate == pytest.approx(150 / 3600)
+    pacer.on_success()
+    pacer.on_success()
+    assert pacer.rate == 200
+
+
+def test_pacer_multiplicative_decrease_and_doubling_backoff(clock):
+    pacer = _pacer(clock, base_backoff=60, max_backoff=200)
+    assert pacer.on_throttle() == 60
+    assert pacer.rate == 50
+    assert pacer.on_throttle() == 120
+    assert pacer.on_throttle() == 200
+    assert pacer.rate == 12.5
+    assert pacer.on_throttle() == 200
+    assert pacer.rate == 10
+    assert clock.slept == 580
+    assert pacer.throttles == 4
+    assert pacer.backoff_total == 580
+
+
+def test_pacer_success_resets_backoff_streak(clock):
+    pacer = _pacer(clock, base_backoff=60)
+    pacer.on_throttle()
+    pacer.on_throttle()
+    pacer.on_success()
+    assert pacer.next_backoff() == 60
+
+
+def test_pacer_throttle_without_sleep(clock):
+    pacer = _pacer(clock)
+    assert pacer.on_throttle(sleep=False) == 60
+    assert clock.slept == 0
+    assert pacer.backoff_total == 0
+
+
+def test_pacer_respects_deadline(clock):
+    pacer = _pacer(clock, base_backoff=600)
+    pacer.deadline = Deadline(300, margin=0, clock=clock.now)
+    with pytest.raises(DeadlineReached):
+        pacer.on_throttle()
+    # O ritmo reduzido fica registrado, sem dormir
+    assert pacer.rate == 50
+    assert clock.slept == 0
+
+    # 50 ações/hora = uma a cada 72 s: cabem cinco nos 300 s do prazo
+    for _ in range(5):
+        pacer.wait()
+    assert clock.slept == pytest.approx(4 * 72)
+    with pytest.raises(DeadlineReached):
+        pacer.wait()
+    assert clock.slept == pytest.approx(4 * 72)
+
+
+def test_throttle_errors_from_fake_client():
+    assert is_throttle_error(PleaseWaitFewMinutes("wait"))
+    assert is_throttle_error(FeedbackRequired("feedback_required"))
+    assert is_throttle_error(ClientError("Please wait a few minutes before you try again."))
+    assert not is_throttle_error(ClientError("user not found"))
+
+
+def test_zero_interval_is_uncapped(tmp_path, clock):
+    path = str(tmp_path / "pacing.json")
+    pacer = load_pacer("conta", "unfollow", 0, path=path,
+                       limiter=RateLimiter(0, clock=clock), base_backoff=60)
+    assert [pacer.wait() for _ in range(5)] == [0] * 5
+    assert pacer.on_throttle() == 60
+    assert pacer.wait() == 0
+    pacer.deadline = Deadline(600, margin=0, clock=clock.now)
+    assert pacer.deadline.capacity(pacer.rate) == math.inf
+
+    save_pacer(pacer, "conta", "unfollow", path)
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["conta"]["unfollow"]["rate_per_hour"] is None
+    assert load_pacer("conta", "unfollow", 36, path=path).rate == 100
+
+
+def test_saved_rate_is_resumed(tmp_path, clock):
+    path = str(tmp_path / "pacing.json")
+    pacer = load_pacer("conta", "fetch", 36, path=path, limiter=RateLimiter(36, clock=clock))
+    pacer.on_throttle(sleep=False)
+    save_pacer(pacer, "conta", "fetch", path)
+    assert load_pacer("conta", "fetch", 36, path=path).rate == 50
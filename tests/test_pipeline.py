@@ -0,0 +1,41 @@
+import pytest
+
+from benchmarks import fake_instagram
+from benchmarks.fake_instagram import Client
+from core.pipeline import account_settings, run_account
+
+
+@pytest.fixture
+def backend():
+    return fake_instagram.configure(following=60, mutual=0.5)
+
+
+def _account(tmp_path, **overrides):
+    return account_settings({
+        "username": "conta",
+        "password": "senha",
+        "state_dir": str(tmp_path),
+        "sleep_between_actions": 0,
+        "fetch_interval": 0,
+        "max_unfollows": 5,
+        "metrics_file": str(tmp_path / "unfollow.prom"),
+        **overrides,
+    })
+
+
+def test_run_account_report(tmp_path, backend):
+    report = run_account(_account(tmp_path), Client)
+    assert report["status"] == "ok"
+    assert report["following"] == 60
+    assert report["non_followers"] == 30
+    assert report["unfollowed"] == 5
+    assert len(backend.unfollowed) == 5
+
+
+def test_unreadable_ledger_becomes_error_report(tmp_path, backend):
+    (tmp_path / "rate_ledger.db").write_bytes(b"isto nao e um banco SQLite" * 100)
+    report = run_account(_account(tmp_path), Client)
+    assert report["status"] == "error"
+    assert "DatabaseError" in report["error"]
+    assert report["unfollowed"] == 0
+    assert "unfollow_run_success" in (tmp_path / "unfollow.prom").read_text(encoding="utf-8")
@@ -0,0 +1,60 @@
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from core.priority import (dormant_first, inactive_first, parse_priority, profile_fields,
+                           select_top)
+
+
+def _user(pk, **fields):
+    return SimpleNamespace(pk=pk, **fields)
+
+
+def test_parse_priority():
+    scorers = parse_priority(" private , oldest,")
+    assert [score.__name__ for score in scorers] == ["private_first", "oldest_first"]
+    assert parse_priority("") == []
+    assert parse_priority("os.path:getsize") == [os.path.getsize]
+    with pytest.raises(ValueError):
+        parse_priority("famous")
+
+
+def test_oldest_keeps_only_top_k():
+    candidates = ((_user(str(rank)), rank) for rank in range(1000))
+    top, total = select_top(candidates, 3, parse_priority("oldest"))
+    assert [user.pk for user in top] == ["999", "998", "997"]
+    assert total == 1000
+
+
+def test_combined_criteria_and_stable_ties():
+    candidates = [
+        (_user("a", is_private=False), 0),
+        (_user("b", is_private=True), 1),
+        (_user("c", is_private=True), 1),
+        (_user("d", is_private=False), 5),
+    ]
+    top, total = select_top(iter(candidates), None, parse_priority("private,oldest"))
+    assert [user.pk for user in top] == ["b", "c", "d", "a"]
+    assert total == 4
+
+
+def test_without_scorers_or_limit():
+    candidates = [(_user(str(i)), i) for i in range(5)]
+    top, total = select_top(iter(candidates), 2, [])
+    assert [user.pk for user in top] == ["0", "1"]
+    assert total == 5
+    assert select_top(iter(candidates), 0, parse_priority("oldest")) == ([], 5)
+
+
+def test_profile_scorers():
+    assert inactive_first(_user("1", profile_pic_url="", full_name=""), 0) == 2
+    assert inactive_first(_user("1", profile_pic_url="https://x/me.jpg", full_name="Ana"), 0) == 0
+
+    assert profile_fields(parse_priority("dormant,oldest,dormant")) == ("last_post_at",)
+    assert dormant_first(_user("1", profile={}), 0) == 0
+    never = _user("1", profile={"last_post_at": None}, last_post_at=None)
+    assert dormant_first(never, 0) == float("inf")
+    recent = _user("1", profile={"last_post_at": time.time() - 60}, last_post_at=time.time() - 60)
+    assert 50 < dormant_first(recent, 0) < 120
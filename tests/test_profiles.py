@@ -0,0 +1,111 @@
+import pytest
+
+from benchmarks import fake_instagram
+from benchmarks.fake_instagram import FIRST_PK, Client
+from core.idstream import UserRef
+from core.profiles import ProfileCache, enrich, parse_fields
+from core.ratelimit import FakeClock
+
+DAY = 24 * 3600
+
+
+@pytest.fixture
+def backend():
+    return fake_instagram.configure(following=100, throttle_rate=0)
+
+
+@pytest.fixture
+def cl(backend):
+    client = Client()
+    client.login("conta", "senha")
+    return client
+
+
+@pytest.fixture
+def wall():
+    return FakeClock(1_800_000_000.0)
+
+
+def _cache(tmp_path, wall, **kwargs):
+    return ProfileCache(str(tmp_path / "profiles.db"), clock=wall.now, **kwargs)
+
+
+def _ids(count, start=0):
+    return [str(FIRST_PK + i) for i in range(start, start + count)]
+
+
+def test_lookup_fetches_once_then_hits_disk(tmp_path, wall, backend, cl):
+    cache = _cache(tmp_path, wall)
+    profiles = cache.lookup(cl, _ids(3), ("follower_count", "is_verified"))
+    assert profiles[str(FIRST_PK)]["follower_count"] == FIRST_PK % 5000
+    assert backend.calls["user_info"] == 3
+    assert cache.stats["fetched"] == 3
+
+    # Memo da execução e, em outra instância, o SQLite
+    cache.lookup(cl, _ids(3), ("follower_count",))
+    assert cache.stats["memo_hits"] == 3
+    cache.close()
+    again = _cache(tmp_path, wall)
+    assert again.lookup(cl, _ids(3), ("follower_count",)) == profiles
+    assert again.stats["hits"] == 3
+    assert backend.calls["user_info"] == 3
+
+
+def test_each_field_expires_on_its_own(tmp_path, wall, backend, cl):
+    _cache(tmp_path, wall).lookup(cl, _ids(2), ("follower_count", "is_verified"))
+    wall.advance(2 * DAY)
+    cache = _cache(tmp_path, wall)
+    cache.lookup(cl, _ids(2), ("is_verified",))
+    assert cache.stats["hits"] == 2
+    cache = _cache(tmp_path, wall)
+    cache.lookup(cl, _ids(2), ("follower_count",))
+    assert cache.stats["stale"] == 2
+    assert backend.calls["user_info"] == 4
+
+
+def test_budget_limits_fetches(tmp_path, wall, backend, cl):
+    cache = _cache(tmp_path, wall, max_fetches=2)
+    profiles = cache.lookup(cl, _ids(5), ("follower_count", "last_post_at"))
+    assert backend.calls["user_info"] == 1
+    assert backend.calls["user_medias"] == 1
+    assert cache.stats["skipped"] == 4
+    assert profiles[_ids(1, start=4)[0]] == {}
+
+
+def test_least_recently_used_are_evicted(tmp_path, wall, cl):
+    cache = _cache(tmp_path, wall, max_entries=3)
+    cache.lookup(cl, _ids(2), ("follower_count",))
+    wall.advance(60)
+    cache.lookup(cl, _ids(2, start=2), ("follower_count",))
+    assert len(cache) == 3
+    assert cache.stats["evicted"] == 1
+    assert cache._read(_ids(1)) == {}
+
+
+def test_throttle_stops_fetching(tmp_path, wall, backend, cl):
+    backend.throttle_rate = 1.0
+    cache = _cache(tmp_path, wall)
+    cache.lookup(cl, _ids(4), ("follower_count",))
+    assert backend.calls["user_info"] == 1
+    assert cache.stats["errors"] == 1
+    assert cache.budget == 0
+
+
+def test_enrich_adds_profile_attributes(tmp_path, wall, cl):
+    cache = _cache(tmp_path, wall)
+    candidates = [(UserRef(pk, f"user{pk}"), rank) for rank, pk in enumerate(_ids(5))]
+    enriched = list(enrich(candidates, cache, cl, ("media_count",), batch=2))
+    assert [rank for _, rank in enriched] == [0, 1, 2, 3, 4]
+    user = enriched[1][0]
+    assert user.username == f"user{FIRST_PK + 1}"
+    assert user.media_count == (FIRST_PK + 1) % 40
+    assert user.follower_count == (FIRST_PK + 1) % 5000  # mesma chamada user_info
+    with pytest.raises(AttributeError):
+        user.last_post_at
+
+
+def test_parse_fields():
+    assert parse_fields(" follower_count, last_post_at ") == ("follower_count", "last_post_at")
+    assert parse_fields("") == ()
+    with pytest.raises(ValueError):
+        parse_fields("karma")
@@ -0,0 +1,100 @@
+import math
+import random
+
+import pytest
+
+from core.ratelimit import BudgetExhausted, RateLimiter, TokenBucket
+
+
+# =========================
+# 🪣 TOKEN BUCKET
+# =========================
+def test_bucket_starts_full_and_refills_at_rate(clock):
+    bucket = TokenBucket(rate=0.5, capacity=2, clock=clock)
+    assert bucket.time_until_available() == 0
+    bucket.consume()
+    bucket.consume()
+    assert bucket.time_until_available() == pytest.approx(2.0)
+
+    clock.advance(1.0)
+    assert bucket.time_until_available() == pytest.approx(1.0)
+    clock.advance(1.0)
+    assert bucket.time_until_available() == 0
+
+
+def test_bucket_never_exceeds_capacity(clock):
+    bucket = TokenBucket(rate=1, capacity=3, clock=clock)
+    clock.advance(100)
+    bucket.time_until_available()
+    assert bucket.tokens == 3
+
+
+def test_bucket_without_rate_never_refills(clock):
+    bucket = TokenBucket(rate=0, capacity=1, clock=clock)
+    bucket.consume()
+    assert bucket.time_until_available() == math.inf
+
+
+# =========================
+# 🚦 LIMITADOR
+# =========================
+def test_limiter_burst_then_base_interval(clock):
+    limiter = RateLimiter(interval=10, burst=3, clock=clock)
+    waits = [limiter.acquire() for _ in range(5)]
+    assert waits[:3] == [0, 0, 0]
+    assert waits[3:] == [pytest.approx(10), pytest.approx(10)]
+    assert clock.slept == pytest.approx(20)
+    assert limiter.acquired == 5
+
+
+def test_limiter_no_sleep_after_idle_time(clock):
+    limiter = RateLimiter(interval=10, clock=clock)
+    limiter.acquire()
+    clock.advance(15)
+    assert limiter.acquire() == 0
+
+
+def test_limiter_hourly_cap(clock):
+    limiter = RateLimiter(interval=1, burst=10, per_hour=3, clock=clock)
+    for _ in range(3):
+        limiter.acquire()
+    assert limiter.time_until_available() == pytest.approx(1200)
+
+
+def test_limiter_try_acquire_never_sleeps(clock):
+    limiter = RateLimiter(interval=10, clock=clock)
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+    assert clock.slept == 0
+    clock.advance(10)
+    assert limiter.try_acquire()
+
+
+def test_limiter_max_wait_raises_without_sleeping(clock):
+    limiter = RateLimiter(interval=60, max_wait=30, clock=clock)
+    limiter.acquire()
+    with pytest.raises(BudgetExhausted) as info:
+        limiter.acquire()
+    assert info.value.wait_seconds == pytest.approx(60)
+    assert clock.slept == 0
+
+
+def test_limiter_jitter_only_on_real_waits(clock):
+    limiter = RateLimiter(interval=10, jitter=5, clock=clock, rng=random.Random(1))
+    assert limiter.acquire() == 0
+    wait = limiter.acquire()
+    assert 10 <= wait <= 15
+
+
+def test_limiter_set_interval_keeps_refilled_tokens(clock):
+    limiter = RateLimiter(interval=10, clock=clock)
+    limiter.acquire()
+    clock.advance(5)
+    limiter.set_interval(20)
+    # Meia ficha reposta no ritmo antigo; a outra metade leva 10 s no novo
+    assert limiter.time_until_available() == pytest.approx(10)
+
+
+def test_limiter_rejects_unknown_distribution():
+    with pytest.raises(ValueError):
+        RateLimiter(interval=1, distribution="cauchy")
@@ -0,0 +1,60 @@
+import pytest
+
+from benchmarks import fake_instagram
+from benchmarks.fake_instagram import Client, LoginRequired
+from core.session import CACHED, LOGGED_IN, PROBED, SessionManager, read_session
+
+
+@pytest.fixture
+def backend():
+    return fake_instagram.configure(following=10)
+
+
+def _saved_session(tmp_path, verified=True):
+    cl = Client()
+    manager = SessionManager(cl, "conta", "senha", str(tmp_path / "session.json"))
+    manager.login()
+    if not verified:
+        manager.invalidate()
+    return manager.path
+
+
+def test_fresh_session_needs_no_request(tmp_path, backend):
+    path = _saved_session(tmp_path)
+    requests = backend.requests
+    manager = SessionManager(Client(), "conta", "senha", path)
+    assert manager.restore() == CACHED
+    assert backend.requests == requests
+
+
+def test_stale_session_is_probed(tmp_path, backend):
+    path = _saved_session(tmp_path, verified=False)
+    manager = SessionManager(Client(), "conta", "senha", path)
+    assert manager.restore() == PROBED
+    assert backend.calls["account_info"] == 1
+    assert read_session(path)[1] is not None
+
+
+def test_without_session_logs_in(tmp_path, backend):
+    manager = SessionManager(Client(), "conta", "senha", str(tmp_path / "session.json"))
+    assert manager.restore() == LOGGED_IN
+    assert backend.calls["login"] == 1
+
+
+def test_refused_session_renews_once_mid_run(tmp_path, backend):
+    path = _saved_session(tmp_path)
+    cl = Client()
+    manager = SessionManager(cl, "conta", "senha", path)
+    assert manager.restore() == CACHED
+
+    # O Instagram derruba a sessão no meio da execução
+    cl.logged_in = False
+    assert cl.user_unfollow(str(fake_instagram.FIRST_PK))
+    assert manager.mode == LOGGED_IN
+    assert backend.calls["login"] == 2
+    assert backend.unfollowed == {fake_instagram.FIRST_PK}
+
+    # Depois do login completo o erro segue adiante
+    cl.logged_in = False
+    with pytest.raises(LoginRequired):
+        cl.user_unfollow(str(fake_instagram.FIRST_PK + 1))
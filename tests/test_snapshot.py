@@ -0,0 +1,69 @@
+import pytest
+
+from benchmarks import fake_instagram
+from benchmarks.fake_instagram import FIRST_PK, Client
+from core.idstream import UserRef
+from core.snapshot import FollowSnapshot, refresh_snapshot
+
+
+@pytest.fixture
+def backend():
+    return fake_instagram.configure(following=200, followers=150, mutual=0.5)
+
+
+def _client():
+    cl = Client()
+    cl.login("conta", "senha")
+    return cl
+
+
+def test_deltas_keep_non_followers_in_sync(tmp_path):
+    snapshot = FollowSnapshot(str(tmp_path / "snapshot.json"))
+    snapshot.replace("1", ["a", "b"], [("b", "bee"), ("c", "cee"), ("d", "dee")])
+    assert [user.pk for user, _ in snapshot.ranked_non_followers()] == ["c", "d"]
+
+    assert snapshot.add_followers(["c", "a"]) == ["c"]
+    assert snapshot.add_following([("e", "eee"), ("b", "bee")]) == [("e", "eee")]
+    snapshot.remove_following(["d"])
+    assert list(snapshot.ranked_non_followers()) == [(UserRef("e", "eee"), 0)]
+    assert snapshot.followers == ["c", "a", "b"]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "snapshot.json")
+    snapshot = FollowSnapshot(path)
+    snapshot.replace(42, [7, 8], [(9, "nove"), (7, "sete")])
+    snapshot.save()
+
+    loaded = FollowSnapshot.load(path)
+    assert loaded.user_id == "42"
+    assert loaded.followers == ["7", "8"]
+    assert loaded.following == {"9": "nove", "7": "sete"}
+    assert list(loaded.ranked_non_followers()) == [(UserRef("9", "nove"), 0)]
+    assert not loaded.needs_full_sync(42)
+    assert loaded.needs_full_sync(43)
+    assert FollowSnapshot.load(str(tmp_path / "missing.json")).is_empty
+
+
+def test_refresh_full_then_incremental(tmp_path, backend):
+    cl = _client()
+    path = str(tmp_path / "snapshot.json")
+    snapshot = FollowSnapshot(path)
+
+    result = refresh_snapshot(cl, snapshot, page_size=50)
+    assert result.full_sync
+    assert (result.new_followers, result.new_following, result.pages) == (150, 200, 7)
+    assert len(list(snapshot.ranked_non_followers())) == 100
+
+    # Três contas novas no topo de cada lista
+    snapshot = FollowSnapshot.load(path)
+    snapshot.remove_following([FIRST_PK, FIRST_PK + 1, FIRST_PK + 2])
+    snapshot.followers = snapshot.followers[3:]
+    snapshot._rebuild()
+    requests = backend.requests
+
+    result = refresh_snapshot(cl, snapshot, stop_after_known=20, page_size=50)
+    assert not result.full_sync
+    assert (result.new_followers, result.new_following, result.pages) == (3, 3, 2)
+    assert backend.requests - requests == 2
+    assert len(FollowSnapshot.load(path).following) == 200
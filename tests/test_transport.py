@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from benchmarks.http_standin import HttpStandIn  # noqa: E402
+from core.metrics import Metrics, record_http  # noqa: E402
+from core.transport import Transport  # noqa: E402
+
+
+@pytest.fixture
+def standin():
+    with HttpStandIn() as server:
+        yield server
+
+
+@pytest.fixture
+def transport():
+    transport = Transport(pool_size=2, connect_timeout=1, read_timeout=0.3, retries=2)
+    transport.timings = []
+    transport.observers.append(transport.timings.append)
+    yield transport
+    transport.close()
+
+
+def test_keep_alive_reuses_one_connection(standin, transport):
+    session = transport.session()
+    for _ in range(5):
+        session.get(f"{standin.url}/api/v1/feed").raise_for_status()
+    assert standin.connections == 1
+    assert [timing.reused for timing in transport.timings] == [False] + [True] * 4
+    first = transport.timings[0]
+    assert first.dns is not None and first.connect is not None
+    assert (first.method, first.path, first.status) == ("GET", "/api/v1/feed", 200)
+
+
+def test_connection_reset_is_retried(standin, transport):
+    metrics = Metrics()
+    transport.observers.append(lambda timing: record_http(metrics, timing))
+    response = transport.session().post(f"{standin.url}/flaky/unfollow", data={"a": "b"})
+
+    assert response.ok
+    assert standin.hits["/flaky/unfollow"] == 2
+    assert transport.timings[-1].retries == 1
+    assert metrics.value("http_retries_total", host="127.0.0.1") == 1
+    assert metrics.value("http_requests_total", host="127.0.0.1", reused="nao") == 1
+
+
+def test_read_timeout_and_http_errors_are_not_retried(standin, transport):
+    session = transport.session()
+    # Com read=0 o urllib3 desiste na hora e o requests entrega um ConnectionError
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.get(f"{standin.url}/slow?delay=1")
+    assert standin.hits["/slow"] == 1
+    assert transport.timings[-1].error == "ConnectionError"
+
+    assert session.get(f"{standin.url}/status/503").status_code == 503
+    assert standin.hits["/status/503"] == 1
+
+
+def test_apply_mounts_on_every_client_session(standin, transport):
+    cl = SimpleNamespace(private=requests.Session(), public=requests.Session(), name="x")
+    transport.apply(cl)
+    assert cl.transport is transport
+    cl.private.get(f"{standin.url}/a")
+    cl.public.get(f"{standin.url}/b")
+    assert standin.connections == 1
+    assert len(transport.timings) == 2
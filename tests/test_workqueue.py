@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+from benchmarks.fake_instagram import ClientError, ClientConnectionError, PleaseWaitFewMinutes
+from core.idstream import UserRef
+from core.workqueue import DONE, FAILED, PENDING, RETRY, WorkQueue, is_transient_error
+
+
+def _users(count):
+    return [UserRef(str(pk), f"user{pk}") for pk in range(1, count + 1)]
+
+
+def test_create_persists_plan(tmp_path):
+    path = str(tmp_path / "queue.json")
+    WorkQueue.create(path, "conta", _users(3))
+    queue = WorkQueue.load(path)
+    assert queue.account == "conta"
+    assert [item["user_id"] for item in queue.items] == ["1", "2", "3"]
+    assert queue.counts() == {PENDING: 3, RETRY: 0, DONE: 0, FAILED: 0}
+
+
+def test_load_missing_or_corrupt(tmp_path):
+    path = tmp_path / "queue.json"
+    assert WorkQueue.load(str(path)) is None
+    path.write_text("{corrompido", encoding="utf-8")
+    assert WorkQueue.load(str(path)) is None
+
+
+def test_resume_after_interruption(tmp_path):
+    path = str(tmp_path / "queue.json")
+    queue = WorkQueue.create(path, "conta", _users(4))
+    first, second = queue.next_items(2)
+    queue.mark_done(first)
+    queue.mark_failed(second, PleaseWaitFewMinutes("wait"))
+
+    # Nova execução: concluídos pulados, pendentes antes das novas tentativas
+    resumed = WorkQueue.load(path)
+    assert resumed.is_resumable("conta")
+    assert resumed.remaining == 3
+    assert [item["user_id"] for item in resumed.next_items()] == ["3", "4", "2"]
+    assert resumed.items[1]["last_error"] == "PleaseWaitFewMinutes: wait"
+
+
+def test_transient_failures_stop_at_max_attempts(tmp_path):
+    queue = WorkQueue.create(str(tmp_path / "queue.json"), "conta", _users(1), max_attempts=2)
+    item = queue.items[0]
+    queue.mark_failed(item, ClientConnectionError("reset"))
+    assert item["status"] == RETRY
+    queue.mark_failed(item, ClientConnectionError("reset"))
+    assert item["status"] == FAILED
+    assert queue.remaining == 0
+
+
+def test_permanent_failure_is_final(tmp_path):
+    queue = WorkQueue.create(str(tmp_path / "queue.json"), "conta", _users(1))
+    queue.mark_failed(queue.items[0], ClientError("user not found"))
+    assert queue.items[0]["status"] == FAILED
+
+
+def test_is_transient_error():
+    assert is_transient_error(PleaseWaitFewMinutes("wait"))
+    assert is_transient_error(ClientConnectionError("reset"))
+    assert not is_transient_error(ClientError("user not found"))
+
+
+def test_not_resumable(tmp_path):
+    path = str(tmp_path / "queue.json")
+    old = (datetime.now() - timedelta(hours=30)).isoformat()
+    queue = WorkQueue.create(path, "conta", _users(1), created_at=old)
+    assert not queue.is_resumable("conta")
+    assert not queue.is_resumable("conta", max_age_hours=24)
+    assert queue.is_resumable("conta", max_age_hours=48)
+    assert not queue.is_resumable("outra", max_age_hours=48)
+
+    queue.mark_done(queue.items[0])
+    assert not queue.is_resumable("conta", max_age_hours=48)
+
+
+def test_discard_only_touches_pending(tmp_path):
+    path = str(tmp_path / "queue.json")
+    queue = WorkQueue.create(path, "conta", _users(4))
+    queue.mark_done(queue.items[0])
+    removed = queue.discard(lambda item: item["user_id"] in {"1", "2"})
+    assert removed == 1
+    assert [item["user_id"] for item in WorkQueue.load(path).items] == ["1", "3", "4"]